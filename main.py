@@ -1,26 +1,16 @@
 import pandas as pd
 from city_parse.core import Parse, ModelSource
-from typing import List, Dict
 
 # 提取raw_data.example.csv文件的ID列
 df = pd.read_csv('raw_data.example.csv')
-title_list: List[str] = df['id'].tolist()
-
-title_city_mapping: Dict[str, str] = {}
-city_list: List[str] = []
 
 # 通过调整系统提示词或对话记录，更小的0.6b模型也能胜任工作
 parser = Parse(model_id="qwen3:0.6b", source=ModelSource.OLLAMA)
 
-for title in title_list:
-    city_name = parser.parse(title)
-    title_city_mapping[title] = city_name
-    city_list.append(city_name)
-
+# 每个不同的标题只调用一次模型，结果按行回填
+df['city'] = df['id'].city_parse.parse(parser)
 
-print(title_city_mapping)
-print(city_list)
+print(df[['id', 'city']])
 
 # if you want to save it to a new csv file, run:
-df['city'] = df['id'].map(title_city_mapping)
 df.to_csv('output.example.csv', index=False)
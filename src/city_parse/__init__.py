@@ -1,12 +1,64 @@
 __version__ = "0.1.0"
 __author__ = "Song Tan <sepinetam@gmail.com>"
 
-from .core import Classify, Model, ModelConfig, ModelSource, Parse
+from ._cli import main
+from .core import (DEFAULT_RULES, Benchmark, BenchmarkResult, BudgetExceeded,
+                   CityCandidate, CityParseAccessor, Classify, CodedResults,
+                   CompiledPrompt, Coordinator, Division, DivisionTable,
+                   EmbeddingClassify, Example, FewShotSelector, HistoryPolicy,
+                   InferenceServer, MicroBatcher, Model, ModelConfig,
+                   ModelSource, Parse, ParseResult, RateLimiter, RedisQueue,
+                   ResultWriter, Rule, RuleEngine, RuleMatch, RunResult,
+                   SQLiteQueue, StreamingExtractor, StructuredResult,
+                   Vocabulary, WarmupReport, WorkQueue, Worker, classify_expr,
+                   compile_prompt, default_vocabulary, find_spans, parse_arrow,
+                   parse_expr, read_results, write_results)
 
 __all__ = [
     "Parse",
     "Classify",
+    "EmbeddingClassify",
     "ModelSource",
     "Model",
-    "ModelConfig"
+    "ModelConfig",
+    "Division",
+    "DivisionTable",
+    "ParseResult",
+    "StructuredResult",
+    "CityCandidate",
+    "WarmupReport",
+    "HistoryPolicy",
+    "CompiledPrompt",
+    "compile_prompt",
+    "RateLimiter",
+    "BudgetExceeded",
+    "RunResult",
+    "Coordinator",
+    "Worker",
+    "WorkQueue",
+    "SQLiteQueue",
+    "RedisQueue",
+    "MicroBatcher",
+    "InferenceServer",
+    "CityParseAccessor",
+    "parse_arrow",
+    "StreamingExtractor",
+    "parse_expr",
+    "classify_expr",
+    "ResultWriter",
+    "write_results",
+    "read_results",
+    "Vocabulary",
+    "CodedResults",
+    "default_vocabulary",
+    "Example",
+    "FewShotSelector",
+    "Benchmark",
+    "BenchmarkResult",
+    "Rule",
+    "RuleMatch",
+    "RuleEngine",
+    "DEFAULT_RULES",
+    "find_spans",
+    "main"
 ]
@@ -0,0 +1,141 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _cli.py
+
+import argparse
+import asyncio
+from typing import Dict, List, Optional, Union
+
+from .core import Benchmark, Classify, InferenceServer, ModelSource, Parse
+
+
+def _keep_alive(value: str) -> Union[str, float]:
+    """Parse --keep-alive: plain numbers are seconds, anything else a duration such as 30m."""
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(prog="city-parse", description="利用小参数LLM从文章标题里提取城市名称")
+    commands = parser.add_subparsers(dest="command")
+
+    serve = commands.add_parser("serve", help="Serve Parse/Classify over HTTP/JSON")
+    serve.add_argument("--model", required=True, help="Model identifier, e.g. qwen3:0.6b")
+    serve.add_argument("--source", default=ModelSource.OLLAMA.value,
+                       choices=[source.value for source in ModelSource], help="Model source")
+    serve.add_argument("--categories", help="Comma separated categories; enables POST /classify")
+    serve.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    serve.add_argument("--port", type=int, default=8000, help="Port to bind")
+    serve.add_argument("--max-queue", type=int, default=1024, help="Texts waiting before answering 429")
+    serve.add_argument("--cache-size", type=int, default=10000, help="Results kept in the LRU cache")
+    serve.add_argument("--max-batch-size", type=int, default=16, help="Texts per backend call")
+    serve.add_argument("--max-wait-ms", type=float, default=10.0, help="Maximum batching delay")
+    serve.add_argument("--workers", type=int, default=4, help="Concurrent backend calls")
+    serve.add_argument("--packed", action="store_true", help="Pack each batch into one chat request")
+    serve.add_argument("--keep-alive", type=_keep_alive, help="Keep the Ollama model loaded this long, e.g. 30m (warm-up pins it by default)")
+    serve.add_argument("--no-warmup", dest="warmup", action="store_false",
+                       help="Skip loading the model and the dummy generation before serving")
+
+    bench = commands.add_parser("bench", help="Compare accuracy, prompt tokens and speed of models and prompts")
+    bench.add_argument("--data", required=True, help="Labeled CSV file, e.g. output.example.csv")
+    bench.add_argument("--text-column", default="id", help="Column holding the input texts")
+    bench.add_argument("--label-column", default="city", help="Column holding the expected outputs")
+    bench.add_argument("--models", required=True, help="Comma separated model identifiers")
+    bench.add_argument("--source", default=ModelSource.OLLAMA.value,
+                       choices=[source.value for source in ModelSource], help="Model source")
+    bench.add_argument("--quantization", action="append", choices=["none", "int8", "int4"],
+                       help="Weight quantization of local models; repeatable to compare variants")
+    bench.add_argument("--gguf-file", help="GGUF file inside the repo for the llama_cpp source")
+    bench.add_argument("--prompt", action="append", default=[], metavar="NAME=FILE",
+                       help="Prompt variant read from a file; repeatable (the default prompt is always included)")
+    bench.add_argument("--workers", type=int, default=1, help="Concurrent requests")
+    bench.add_argument("--warmup", action="store_true", help="Warm each combination up before measuring it")
+    bench.add_argument("--min-accuracy", type=float, help="Report the cheapest combination meeting this accuracy")
+    bench.add_argument("--output", help="Write the results table to this CSV file")
+    return parser
+
+
+def _serve(args: argparse.Namespace) -> None:
+    """Run the HTTP server until interrupted."""
+    source = ModelSource(args.source)
+    settings = {"keep_alive": args.keep_alive} if args.keep_alive is not None else {}
+    parser = Parse(model_id=args.model, source=source, **settings)
+    if args.warmup:
+        report = parser.warmup()
+        print(f"Warmed up {args.model}: load={report.load_ms:.0f}ms first={report.first_ms:.0f}ms "
+              f"warm={report.warm_ms:.0f}ms")
+    classifier = None
+    if args.categories:
+        categories = [category for category in args.categories.split(",") if category.strip()]
+        classifier = Classify(model_id=args.model, categories=categories, source=source)
+
+    server = InferenceServer(
+        parser=parser,
+        classifier=classifier,
+        max_queue=args.max_queue,
+        cache_size=args.cache_size,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        workers=args.workers,
+        packed=args.packed
+    )
+    print(f"Serving {args.model} on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+def _bench(args: argparse.Namespace) -> None:
+    """Run the benchmark grid and print the results table."""
+    prompts: Dict[str, Optional[str]] = {"default": None}
+    for spec in args.prompt:
+        name, _, path = spec.partition("=")
+        if not path:
+            raise SystemExit(f"Invalid --prompt {spec!r}, expected NAME=FILE")
+        with open(path, encoding="utf-8") as f:
+            prompts[name] = f.read()
+
+    benchmark = Benchmark.from_csv(args.data, args.text_column, args.label_column)
+    source = ModelSource(args.source)
+    model_ids = [model.strip() for model in args.models.split(",") if model.strip()]
+    variants = [{"quantization": None if mode == "none" else mode} for mode in args.quantization or []] or [{}]
+    models = [(model_id, source, variant) for model_id in model_ids for variant in variants]
+    settings = {"gguf_file": args.gguf_file} if args.gguf_file else {}
+    benchmark.run_grid(models, prompts, source=source, workers=args.workers,
+                       warmup=args.warmup, **settings)
+
+    frame = benchmark.to_frame()
+    print(frame.to_string(index=False))
+    print("\nPareto front (cheapest first):")
+    for result in benchmark.pareto_front():
+        print(f"  {result.model} / {result.prompt}: accuracy={result.accuracy:.3f} "
+              f"prompt_tokens={result.prompt_tokens} latency_ms={result.latency_ms:.1f}")
+    if args.min_accuracy is not None:
+        best = benchmark.cheapest(args.min_accuracy)
+        print(f"\nCheapest with accuracy >= {args.min_accuracy}: "
+              + (f"{best.model} / {best.prompt}" if best else "none"))
+    if args.output:
+        frame.to_csv(args.output, index=False)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point of the `city-parse` command."""
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        _serve(args)
+    elif args.command == "bench":
+        _bench(args)
+    else:
+        parser.print_help()
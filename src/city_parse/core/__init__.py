@@ -1,11 +1,66 @@
+from ._batching import MicroBatcher
+from ._benchmark import Benchmark, BenchmarkResult
 from ._classify import Classify
+from ._distributed import Coordinator, RedisQueue, SQLiteQueue, WorkQueue, Worker
+from ._division import Division, DivisionTable
+from ._embedding import EmbeddingClassify
+from ._fewshot import Example, FewShotSelector
 from ._model import Model, ModelConfig, ModelSource
 from ._parse import Parse
+from ._polars import StreamingExtractor, classify_expr, parse_expr
+from ._result import CityCandidate, ParseResult, StructuredResult, WarmupReport
+from ._rules import DEFAULT_RULES, Rule, RuleEngine, RuleMatch
+from ._server import InferenceServer
+from ._spans import find_spans
+from ._store import ResultWriter, read_results, write_results
+from ._vectorized import CityParseAccessor, parse_arrow
+from ._vocab import CodedResults, Vocabulary, default_vocabulary
+from .model_func import BudgetExceeded, CompiledPrompt, HistoryPolicy, RateLimiter, RunResult, compile_prompt
 
 __all__ = [
     "Parse",
     "Classify",
+    "EmbeddingClassify",
     "ModelSource",
     "Model",
-    "ModelConfig"
+    "ModelConfig",
+    "Division",
+    "DivisionTable",
+    "ParseResult",
+    "StructuredResult",
+    "CityCandidate",
+    "WarmupReport",
+    "HistoryPolicy",
+    "CompiledPrompt",
+    "compile_prompt",
+    "RateLimiter",
+    "BudgetExceeded",
+    "RunResult",
+    "Coordinator",
+    "Worker",
+    "WorkQueue",
+    "SQLiteQueue",
+    "RedisQueue",
+    "MicroBatcher",
+    "InferenceServer",
+    "CityParseAccessor",
+    "parse_arrow",
+    "StreamingExtractor",
+    "parse_expr",
+    "classify_expr",
+    "ResultWriter",
+    "write_results",
+    "read_results",
+    "Vocabulary",
+    "CodedResults",
+    "default_vocabulary",
+    "Example",
+    "FewShotSelector",
+    "Benchmark",
+    "BenchmarkResult",
+    "Rule",
+    "RuleMatch",
+    "RuleEngine",
+    "DEFAULT_RULES",
+    "find_spans"
 ]
@@ -0,0 +1,135 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _batching.py
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class MicroBatcher:
+    """Aggregates concurrent single-text calls into batched backend calls"""
+
+    def __init__(self,
+                 batch_func: Callable[[List[str]], List[Any]],
+                 max_batch_size: int = 16,
+                 max_wait_ms: float = 10.0,
+                 workers: int = 1):
+        """
+        Start the aggregator thread.
+
+        Args:
+            batch_func (Callable[[List[str]], List[Any]]): Function handling one batch, returning results in order;
+                an exception returned in place of a result is raised to that caller only
+            max_batch_size (int): Dispatch a batch as soon as it holds this many items
+            max_wait_ms (float): Dispatch a batch at the latest this long after its first item arrived
+            workers (int): Number of batches that may run concurrently
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.batch_func = batch_func
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[Optional[Tuple[str, Future]]]" = queue.Queue()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="city-parse-batch")
+        self._closed = False
+        self._thread = threading.Thread(target=self._collect, name="city-parse-batcher", daemon=True)
+        self._thread.start()
+
+        # Counters for monitoring
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, text: str) -> Future:
+        """
+        Queue a text for the next batch.
+
+        Args:
+            text (str): Input text
+
+        Returns:
+            Future: Future resolving to this text's result
+        """
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def __call__(self, text: str, timeout: Optional[float] = None) -> Any:
+        """
+        Process a single text through the batcher and wait for its result.
+
+        Args:
+            text (str): Input text
+            timeout (float): Maximum seconds to wait (forever if None)
+
+        Returns:
+            Any: Result for this text
+        """
+        return self.submit(text).result(timeout=timeout)
+
+    def _collect(self) -> None:
+        """Aggregator loop: gather up to max_batch_size items or until max_wait elapses."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._pool.submit(self._dispatch, batch)
+            if stop:
+                break
+
+    def _dispatch(self, batch: List[Tuple[str, Future]]) -> None:
+        """Run one batch and hand each caller its own result."""
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = self.batch_func([text for text, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batch function returned {len(results)} results for {len(batch)} inputs")
+        except BaseException as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def close(self) -> None:
+        """Flush pending items and stop the aggregator."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "MicroBatcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,249 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _benchmark.py
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from ._division import DivisionTable
+from ._model import ModelSource
+from ._parse import Parse
+from .model_func import API_ERROR_OUTPUT, EMPTY_OUTPUT, CompiledPrompt, estimate_tokens
+
+
+@dataclass(slots=True)
+class BenchmarkResult:
+    """Accuracy and cost of one model / prompt combination"""
+    model: str
+    prompt: str
+    rows: int
+    accuracy: float
+    # Mean tokens of the system prompt per row, including examples picked by a selector
+    prompt_tokens: int
+    # Mean tokens per request: system prompt plus input text
+    tokens_per_row: float
+    latency_ms: float
+    p95_latency_ms: float
+    rows_per_sec: float
+    errors: int = 0
+    # Not dominated by any other combination on accuracy, tokens and latency
+    pareto: bool = False
+
+
+class Benchmark:
+    """Measures accuracy against prompt size and speed on a labeled dataset"""
+
+    def __init__(self,
+                 texts: Sequence[str],
+                 labels: Sequence[str],
+                 normalize: bool = True,
+                 division_table: Optional[DivisionTable] = None):
+        """
+        Initialize the benchmark.
+
+        Args:
+            texts (Sequence[str]): Input texts
+            labels (Sequence[str]): Expected outputs aligned with `texts`
+            normalize (bool): Compare canonical divisions (e.g. "六盘水" equals "六盘水市") instead of exact strings
+            division_table (DivisionTable): Division table used for normalization (uses bundled table if None)
+        """
+        if len(texts) != len(labels):
+            raise ValueError("texts and labels must have the same length")
+        if not texts:
+            raise ValueError("At least one labeled row must be provided")
+        self.texts = [str(text) for text in texts]
+        self.labels = [str(label).strip() for label in labels]
+        self.normalize = normalize
+        self._division_table = division_table
+        self.results: List[BenchmarkResult] = []
+
+    @classmethod
+    def from_csv(cls,
+                 path: str,
+                 text_column: str = "id",
+                 label_column: str = "city",
+                 **kwargs) -> "Benchmark":
+        """
+        Load a labeled dataset such as output.example.csv.
+
+        Args:
+            path (str): CSV file path
+            text_column (str): Column holding the input texts
+            label_column (str): Column holding the expected outputs
+            **kwargs: Arguments forwarded to the constructor
+
+        Returns:
+            Benchmark: Benchmark over the labeled rows
+        """
+        df = pd.read_csv(path).dropna(subset=[text_column, label_column])
+        return cls(df[text_column].tolist(), df[label_column].tolist(), **kwargs)
+
+    def _key(self, value: str) -> str:
+        """Comparison key of an output."""
+        value = value.strip()
+        if not self.normalize:
+            return value
+        if self._division_table is None:
+            self._division_table = DivisionTable.default()
+        division = self._division_table.canonicalize(value)
+        return division.code if division is not None else value
+
+    def run(self,
+            parser: Parse,
+            model: Optional[str] = None,
+            prompt: str = "default",
+            workers: int = 1,
+            warmup: bool = False) -> BenchmarkResult:
+        """
+        Benchmark one configured parser.
+
+        Args:
+            parser (Parse): Parser to measure
+            model (str): Label of the model (uses the parser's model id if None)
+            prompt (str): Label of the prompt variant
+            workers (int): Number of concurrent requests
+            warmup (bool): Load the model and run a dummy generation first, so load time is not measured
+
+        Returns:
+            BenchmarkResult: Measured result, also appended to `results`
+        """
+        if warmup:
+            parser.warmup()
+
+        def timed(text: str) -> Tuple[Optional[str], float]:
+            started = time.perf_counter()
+            try:
+                output = parser.parse(text)
+            except Exception:
+                output = None
+            return output, time.perf_counter() - started
+
+        started = time.perf_counter()
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                timings = list(pool.map(timed, self.texts))
+        else:
+            timings = [timed(text) for text in self.texts]
+        elapsed = time.perf_counter() - started
+
+        outputs = [output for output, _ in timings]
+        latencies = np.array([seconds for _, seconds in timings]) * 1000
+        correct = sum(
+            1 for output, label in zip(outputs, self.labels)
+            if output is not None and self._key(output) == self._key(label)
+        )
+        prompt_tokens = float(np.mean([parser.prompt_for(text).token_count for text in self.texts]))
+        result = BenchmarkResult(
+            model=model or parser.config.model_id,
+            prompt=prompt,
+            rows=len(self.texts),
+            accuracy=correct / len(self.texts),
+            prompt_tokens=round(prompt_tokens),
+            tokens_per_row=prompt_tokens + float(np.mean([estimate_tokens(text) for text in self.texts])),
+            latency_ms=float(latencies.mean()),
+            p95_latency_ms=float(np.percentile(latencies, 95)),
+            rows_per_sec=len(self.texts) / elapsed if elapsed > 0 else float("inf"),
+            errors=sum(1 for output in outputs if output is None or output.strip() in (API_ERROR_OUTPUT, EMPTY_OUTPUT))
+        )
+        self.results.append(result)
+        self._mark_pareto()
+        return result
+
+    def run_grid(self,
+                 models: Sequence[Union[str, Tuple[str, ModelSource], Tuple[str, ModelSource, Dict[str, Any]]]],
+                 prompts: Dict[str, Optional[Union[str, CompiledPrompt]]],
+                 source: ModelSource = ModelSource.OLLAMA,
+                 workers: int = 1,
+                 warmup: bool = False,
+                 **kwargs) -> List[BenchmarkResult]:
+        """
+        Benchmark every model / prompt combination.
+
+        Args:
+            models (Sequence[Union[str, Tuple[str, ModelSource], Tuple[str, ModelSource, Dict[str, Any]]]]): Model ids,
+                optionally with their source and model settings, e.g. ("Qwen/Qwen2.5-1.5B-Instruct",
+                ModelSource.HUGGINGFACE, {"quantization": "int8"})
+            prompts (Dict[str, Optional[Union[str, CompiledPrompt]]]): Prompt variants by name (None for the default prompt)
+            source (ModelSource): Source of models given without one
+            workers (int): Number of concurrent requests
+            warmup (bool): Warm each model / prompt combination up before measuring it
+            **kwargs: Additional arguments for Parse, e.g. host or api_key
+
+        Returns:
+            List[BenchmarkResult]: Results of this grid
+        """
+        results = []
+        for model in models:
+            if not isinstance(model, tuple):
+                model = (model, source)
+            model_id, model_source = model[:2]
+            overrides = model[2] if len(model) > 2 else {}
+            settings = {**kwargs, **overrides}
+            # Settings of a model variant are part of its label, e.g. "qwen (quantization=int8)"
+            variant = ", ".join(f"{key}={value}" for key, value in overrides.items())
+            label = f"{model_id} ({variant})" if variant else model_id
+            for name, system_prompt in prompts.items():
+                parser = Parse(model_id=model_id, source=model_source, system_prompt=system_prompt,
+                               division_table=self._division_table, **settings)
+                results.append(self.run(parser, model=label, prompt=name, workers=workers, warmup=warmup))
+        return results
+
+    def _mark_pareto(self) -> None:
+        """Flag results not dominated on (accuracy up, prompt tokens down, latency down)."""
+        for result in self.results:
+            result.pareto = not any(
+                other.accuracy >= result.accuracy
+                and other.prompt_tokens <= result.prompt_tokens
+                and other.latency_ms <= result.latency_ms
+                and (other.accuracy > result.accuracy
+                     or other.prompt_tokens < result.prompt_tokens
+                     or other.latency_ms < result.latency_ms)
+                for other in self.results
+            )
+
+    def pareto_front(self) -> List[BenchmarkResult]:
+        """
+        Get the combinations worth considering, cheapest first.
+
+        Returns:
+            List[BenchmarkResult]: Non-dominated results sorted by prompt tokens
+        """
+        return sorted((result for result in self.results if result.pareto),
+                      key=lambda result: (result.prompt_tokens, result.latency_ms))
+
+    def cheapest(self, min_accuracy: float) -> Optional[BenchmarkResult]:
+        """
+        Get the cheapest combination meeting an accuracy bar.
+
+        Args:
+            min_accuracy (float): Minimum accuracy between 0 and 1
+
+        Returns:
+            Optional[BenchmarkResult]: Result with the fewest tokens per row (then lowest latency), or None
+        """
+        candidates = [result for result in self.results if result.accuracy >= min_accuracy]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda result: (result.tokens_per_row, result.latency_ms))
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Get all results as a table.
+
+        Returns:
+            pd.DataFrame: One row per combination, best accuracy first
+        """
+        frame = pd.DataFrame([asdict(result) for result in self.results])
+        if frame.empty:
+            return frame
+        return frame.sort_values(["accuracy", "prompt_tokens"], ascending=[False, True], ignore_index=True)
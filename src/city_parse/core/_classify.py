@@ -7,9 +7,13 @@
 # @Email  : sepinetam@gmail.com
 # @File   : _classify.py
 
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
+from ._fewshot import FewShotSelector
 from ._model import Model, ModelConfig, ModelSource
+from ._parallel import EXECUTOR_THREAD, run_batch
+from ._vocab import CodedResults, Vocabulary, run_coded
+from .model_func import CompiledPrompt, compile_prompt
 
 
 class Classify:
@@ -44,6 +48,8 @@ class Classify:
                  temperature: float = 0.1,
                  category_descriptions: Optional[Dict[str, str]] = None,
                  examples: Optional[Dict[str, List[str]]] = None,
+                 category_tree: Optional[Dict[str, Any]] = None,
+                 example_selector: Optional[FewShotSelector] = None,
                  **kwargs):
         """
         Initialize the Classify class.
@@ -56,6 +62,10 @@ class Classify:
             temperature (float): Temperature parameter for generation (lower for more consistent results)
             category_descriptions (Dict[str, str]): Optional descriptions for each category to help classification
             examples (Dict[str, List[str]]): Optional example texts for each category
+            category_tree (Dict[str, Any]): Optional grouping of categories for coarse-to-fine classification,
+                e.g. {"经济": ["财政", "金融"], "人才": {"引进": [...], "培养": [...]}}
+            example_selector (FewShotSelector): Picks the most similar examples per input instead of
+                listing up to 3 examples for every category, e.g. `FewShotSelector.from_category_examples(bank)`
             **kwargs: Additional arguments for model initialization
         """
         self.categories = [str(cat).strip() for cat in categories if str(cat).strip()]
@@ -64,7 +74,14 @@ class Classify:
 
         self.category_descriptions = category_descriptions or {}
         self.examples = examples or {}
-        self.system_prompt = self._build_system_prompt(system_prompt)
+        self.example_selector = example_selector
+        self._base_prompt = system_prompt or self.DEFAULT_SYSTEM_PROMPT
+        self.prompt: CompiledPrompt = compile_prompt(self._build_system_prompt())
+        self.system_prompt = self.prompt.text
+
+        # Hierarchical mode: one small prompt per tree level, compiled lazily
+        self.category_tree = self._normalize_tree(category_tree) if category_tree else None
+        self._level_prompts: Dict[Tuple[str, ...], CompiledPrompt] = {}
 
         # Create model configuration
         self.config = ModelConfig(
@@ -78,38 +95,46 @@ class Classify:
         # Initialize model
         self.model = Model(self.config)
 
-    def _build_system_prompt(self, custom_prompt: Optional[str] = None) -> str:
+    def _build_system_prompt(self,
+                             custom_prompt: Optional[str] = None,
+                             categories: Optional[List[str]] = None,
+                             examples: Optional[Dict[str, List[str]]] = None) -> str:
         """
         Build comprehensive system prompt with categories, descriptions, and examples.
 
         Args:
-            custom_prompt (str): Custom system prompt
+            custom_prompt (str): Custom system prompt (uses the prompt given at init if None)
+            categories (List[str]): Categories to list (uses all categories if None)
+            examples (Dict[str, List[str]]): Examples to include (uses all examples if None,
+                none if an example selector adds them per input)
 
         Returns:
             str: Complete system prompt
         """
-        if custom_prompt:
-            base_prompt = custom_prompt
-        else:
-            base_prompt = self.DEFAULT_SYSTEM_PROMPT
+        base_prompt = custom_prompt or self._base_prompt
+        categories = self.categories if categories is None else categories
+        if examples is None:
+            examples = {} if self.example_selector is not None else self.examples
 
         # Build categories section
-        categories_section = "可用类别：\n"
-        for category in self.categories:
-            categories_section += f"- {category}"
+        lines = ["可用类别："]
+        for category in categories:
             if category in self.category_descriptions:
-                categories_section += f": {self.category_descriptions[category]}"
-            categories_section += "\n"
+                lines.append(f"- {category}: {self.category_descriptions[category]}")
+            else:
+                lines.append(f"- {category}")
+        categories_section = "\n".join(lines) + "\n"
 
         # Build examples section if provided
-        examples_section = ""
-        if self.examples:
-            examples_section = "\n\n分类示例：\n"
-            for category, example_list in self.examples.items():
-                if category in self.categories and example_list:
-                    examples_section += f"\n{category} 类别示例：\n"
-                    for i, example in enumerate(example_list[:3], 1):  # Limit to 3 examples per category
-                        examples_section += f"{i}. {example}\n"
+        parts = []
+        if examples:
+            parts.append("\n\n分类示例：\n")
+            for category, example_list in examples.items():
+                if category in categories and example_list:
+                    parts.append(f"\n{category} 类别示例：\n")
+                    # Limit to 3 examples per category
+                    parts.extend(f"{i}. {example}\n" for i, example in enumerate(example_list[:3], 1))
+        examples_section = "".join(parts)
 
         return f"{base_prompt}\n\n{categories_section}{examples_section}"
 
@@ -126,28 +151,149 @@ class Classify:
         if not text or not text.strip():
             raise ValueError("Input text cannot be empty")
 
+        if self.category_tree is not None:
+            return self._classify_hierarchical(text.strip())
+
         # Create model instance and run
-        model_instance = self.model.create_instance()
+        if self.example_selector is not None:
+            model_instance = self.model.create_instance(system_prompt=self._selected_prompt(text.strip()))
+        else:
+            model_instance = self.model.create_instance()
         result = model_instance.run(text.strip()).strip()
 
-        # Validate that result is one of the categories
-        if result not in self.categories:
+        return self._match_category(result, self.categories)
+
+    def _selected_prompt(self, text: str) -> CompiledPrompt:
+        """System prompt listing only the examples selected for the text."""
+        examples: Dict[str, List[str]] = {}
+        for example in self.example_selector.select(text):
+            examples.setdefault(example.output, []).append(example.input)
+        return compile_prompt(self._build_system_prompt(examples=examples))
+
+    @staticmethod
+    def _match_category(result: str, categories: List[str]) -> str:
+        """
+        Validate that a model result is one of the given categories.
+
+        Args:
+            result (str): Model output
+            categories (List[str]): Allowed categories
+
+        Returns:
+            str: Matching category
+        """
+        if result not in categories:
             # Try to find closest match by simple substring matching
-            for category in self.categories:
+            for category in categories:
                 if category.lower() in result.lower() or result.lower() in category.lower():
                     return category
 
             # If no match found, raise error
-            raise ValueError(f"Classification result '{result}' is not in the predefined categories: {self.categories}")
+            raise ValueError(f"Classification result '{result}' is not in the predefined categories: {categories}")
 
         return result
 
-    def classify_batch(self, texts: List[str]) -> List[str]:
+    def _normalize_tree(self, tree: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a category tree into nested dicts with `None` leaves.
+
+        Categories missing from the tree are attached to the root level.
+
+        Args:
+            tree (Dict[str, Any]): Groups mapping to lists of categories or nested groups
+
+        Returns:
+            Dict[str, Any]: Normalized tree
+        """
+        def convert(node: Union[Dict[str, Any], List[str]]) -> Dict[str, Any]:
+            if isinstance(node, dict):
+                return {str(name).strip(): convert(child) for name, child in node.items()}
+            return {str(leaf).strip(): None for leaf in node}
+
+        normalized = convert(tree)
+        known = self._tree_leaves(normalized)
+        unknown = [leaf for leaf in known if leaf not in self.categories]
+        if unknown:
+            raise ValueError(f"Category tree contains unknown categories: {unknown}")
+        for category in self.categories:
+            if category not in known:
+                normalized[category] = None
+        return normalized
+
+    @classmethod
+    def _tree_leaves(cls, node: Dict[str, Any]) -> List[str]:
+        """List the categories below a tree node in order."""
+        found = []
+        for name, child in node.items():
+            found.extend([name] if child is None else cls._tree_leaves(child))
+        return found
+
+    def _level_prompt(self, path: Tuple[str, ...], node: Dict[str, Any]) -> CompiledPrompt:
+        """
+        Get the compiled prompt for one level of the category tree.
+
+        Args:
+            path (Tuple[str, ...]): Group names from the root to this level
+            node (Dict[str, Any]): Subtree at this level
+
+        Returns:
+            CompiledPrompt: Prompt listing only the options at this level
+        """
+        prompt = self._level_prompts.get(path)
+        if prompt is None:
+            options = list(node)
+            examples = {}
+            for option, child in node.items():
+                if child is None:
+                    examples[option] = self.examples.get(option, [])
+                else:
+                    # Groups borrow one example from each of their first categories
+                    pooled = [self.examples[leaf][0] for leaf in self._tree_leaves(child) if self.examples.get(leaf)]
+                    examples[option] = pooled[:3]
+            prompt = compile_prompt(self._build_system_prompt(categories=options, examples=examples))
+            self._level_prompts[path] = prompt
+        return prompt
+
+    def _classify_hierarchical(self, text: str) -> str:
+        """
+        Classify coarse-to-fine through the category tree.
+
+        Args:
+            text (str): Stripped input text
+
+        Returns:
+            str: Leaf category name
+        """
+        node = self.category_tree
+        path: Tuple[str, ...] = ()
+        while True:
+            options = list(node)
+            if len(options) == 1:
+                # Nothing to decide at this level
+                choice = options[0]
+            else:
+                prompt = self._level_prompt(path, node)
+                model_instance = self.model.create_instance(system_prompt=prompt.text)
+                choice = self._match_category(model_instance.run(text).strip(), options)
+            child = node[choice]
+            if child is None:
+                return choice
+            node = child
+            path += (choice,)
+
+    def classify_batch(self,
+                       texts: List[str],
+                       workers: int = 1,
+                       executor: str = EXECUTOR_THREAD,
+                       threads_per_worker: Optional[int] = None) -> List[str]:
         """
         Classify multiple texts in batch.
 
         Args:
             texts (List[str]): List of input texts to classify
+            workers (int): Number of worker threads or processes
+            executor (str): "thread" for remote backends, "process" for CPU-bound local models
+            threads_per_worker (int): Compute threads pinned in each worker process
 
         Returns:
             List[str]: List of category names
@@ -155,7 +301,29 @@ class Classify:
         if not texts:
             return []
 
-        return [self.classify(text) for text in texts]
+        return run_batch(self, "classify", texts, workers, executor, threads_per_worker)
+
+    def classify_coded(self,
+                       texts: List[str],
+                       workers: int = 1,
+                       executor: str = EXECUTOR_THREAD,
+                       threads_per_worker: Optional[int] = None,
+                       vocab: Optional[Vocabulary] = None) -> CodedResults:
+        """
+        Classify multiple texts into compact interned results.
+
+        Args:
+            texts (List[str]): List of input texts to classify
+            workers (int): Number of worker threads or processes
+            executor (str): "thread" for remote backends, "process" for CPU-bound local models
+            threads_per_worker (int): Compute threads pinned in each worker process
+            vocab (Vocabulary): Vocabulary to intern results into (uses the shared one if None)
+
+        Returns:
+            CodedResults: Category names as codes, convertible with `to_pandas()` / `to_arrow()`
+        """
+        return run_coded(lambda unique: self.classify_batch(unique, workers, executor, threads_per_worker),
+                         texts, vocab)
 
     def classify_with_confidence(self, text: str) -> Dict[str, Any]:
         """
@@ -211,10 +379,14 @@ class Classify:
             self.categories.append(category)
             if description:
                 self.category_descriptions[category] = description
-            # Rebuild system prompt with new category
-            self.system_prompt = self._build_system_prompt()
+            # Recompile system prompt with new category; the model reads it from config
+            self.prompt = compile_prompt(self._build_system_prompt())
+            self.system_prompt = self.prompt.text
             self.config.system_prompt = self.system_prompt
-            self.model = Model(self.config)
+            if self.category_tree is not None:
+                # New categories join the root level
+                self.category_tree[category] = None
+                self._level_prompts.pop((), None)
 
     def create_model(self):
         """
@@ -0,0 +1,391 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _distributed.py
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class Chunk:
+    """A contiguous range of input rows leased to one worker"""
+    chunk_id: int
+    start: int
+    texts: List[str]
+
+
+class WorkQueue(ABC):
+    """Base class for chunk queues with lease expiry"""
+
+    @abstractmethod
+    def put_chunks(self, job_id: str, chunks: List[Chunk]) -> None:
+        """
+        Enqueue all chunks of a job.
+
+        Args:
+            job_id (str): Job identifier
+            chunks (List[Chunk]): Chunks to enqueue
+        """
+
+    @abstractmethod
+    def lease(self, job_id: str, worker_id: str, lease_seconds: float) -> Optional[Chunk]:
+        """
+        Lease the next pending chunk; chunks whose lease expired are handed out again.
+
+        Args:
+            job_id (str): Job identifier
+            worker_id (str): Identifier of the leasing worker
+            lease_seconds (float): Lease duration
+
+        Returns:
+            Optional[Chunk]: Leased chunk, None if nothing is available right now
+        """
+
+    @abstractmethod
+    def complete(self, job_id: str, chunk_id: int, results: List[Any]) -> None:
+        """
+        Store the results of a chunk; the first completion wins.
+
+        Args:
+            job_id (str): Job identifier
+            chunk_id (int): Chunk identifier
+            results (List[Any]): JSON-serializable results, one per row
+        """
+
+    @abstractmethod
+    def progress(self, job_id: str) -> Dict[str, int]:
+        """
+        Get job progress.
+
+        Args:
+            job_id (str): Job identifier
+
+        Returns:
+            Dict[str, int]: Dictionary with 'total' and 'done' chunk counts
+        """
+
+    @abstractmethod
+    def results(self, job_id: str) -> List[List[Any]]:
+        """
+        Get the results of all completed chunks ordered by chunk id.
+
+        Args:
+            job_id (str): Job identifier
+
+        Returns:
+            List[List[Any]]: Per-chunk results
+        """
+
+
+class SQLiteQueue(WorkQueue):
+    """File-based queue for single-host jobs and tests; safe across processes"""
+
+    def __init__(self, path: str):
+        """
+        Open (or create) the queue database.
+
+        Args:
+            path (str): SQLite database file path
+        """
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunks ("
+                " job_id TEXT NOT NULL, chunk_id INTEGER NOT NULL, start INTEGER NOT NULL,"
+                " payload TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'pending',"
+                " lease_owner TEXT, lease_expires REAL, result TEXT,"
+                " PRIMARY KEY (job_id, chunk_id))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get the connection of the current thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def put_chunks(self, job_id: str, chunks: List[Chunk]) -> None:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "INSERT OR IGNORE INTO chunks (job_id, chunk_id, start, payload) VALUES (?, ?, ?, ?)",
+            [(job_id, c.chunk_id, c.start, json.dumps(c.texts, ensure_ascii=False)) for c in chunks]
+        )
+        conn.execute("COMMIT")
+
+    def lease(self, job_id: str, worker_id: str, lease_seconds: float) -> Optional[Chunk]:
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT chunk_id, start, payload FROM chunks WHERE job_id = ? AND"
+                " (status = 'pending' OR (status = 'leased' AND lease_expires < ?))"
+                " ORDER BY chunk_id LIMIT 1",
+                (job_id, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE chunks SET status = 'leased', lease_owner = ?, lease_expires = ?"
+                " WHERE job_id = ? AND chunk_id = ?",
+                (worker_id, now + lease_seconds, job_id, row[0])
+            )
+            return Chunk(chunk_id=row[0], start=row[1], texts=json.loads(row[2]))
+        finally:
+            conn.execute("COMMIT")
+
+    def complete(self, job_id: str, chunk_id: int, results: List[Any]) -> None:
+        self._connect().execute(
+            "UPDATE chunks SET status = 'done', result = ?, lease_expires = NULL"
+            " WHERE job_id = ? AND chunk_id = ? AND status != 'done'",
+            (json.dumps(results, ensure_ascii=False), job_id, chunk_id)
+        )
+
+    def progress(self, job_id: str) -> Dict[str, int]:
+        total, done = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(status = 'done'), 0) FROM chunks WHERE job_id = ?",
+            (job_id,)
+        ).fetchone()
+        return {"total": total, "done": done}
+
+    def results(self, job_id: str) -> List[List[Any]]:
+        rows = self._connect().execute(
+            "SELECT result FROM chunks WHERE job_id = ? AND status = 'done' ORDER BY chunk_id",
+            (job_id,)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+
+class RedisQueue(WorkQueue):
+    """Queue on a Redis-compatible server for multi-node jobs"""
+
+    # Re-queue expired leases and pop the next chunk atomically
+    _LEASE_SCRIPT = """
+    local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+    for _, chunk_id in ipairs(expired) do
+        redis.call('ZREM', KEYS[2], chunk_id)
+        if redis.call('HEXISTS', KEYS[3], chunk_id) == 0 then
+            redis.call('RPUSH', KEYS[1], chunk_id)
+        end
+    end
+    local chunk_id = redis.call('LPOP', KEYS[1])
+    if not chunk_id then
+        return false
+    end
+    redis.call('ZADD', KEYS[2], ARGV[2], chunk_id)
+    return chunk_id
+    """
+
+    # Enqueue chunks not stored yet, so submitting a job again adds nothing
+    _SUBMIT_SCRIPT = """
+    local added = 0
+    for i = 1, #ARGV, 2 do
+        if redis.call('HSETNX', KEYS[1], ARGV[i], ARGV[i + 1]) == 1 then
+            redis.call('RPUSH', KEYS[2], ARGV[i])
+            added = added + 1
+        end
+    end
+    return added
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", client: Any = None, prefix: str = "city_parse"):
+        """
+        Connect to the queue server.
+
+        Args:
+            url (str): Redis URL, ignored when `client` is given
+            client (Any): Existing redis.Redis-compatible client
+            prefix (str): Key prefix
+        """
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImportError("RedisQueue requires the redis package: pip install redis") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._lease = self.client.register_script(self._LEASE_SCRIPT)
+        self._submit = self.client.register_script(self._SUBMIT_SCRIPT)
+
+    def _key(self, job_id: str, name: str) -> str:
+        return f"{self.prefix}:{job_id}:{name}"
+
+    def put_chunks(self, job_id: str, chunks: List[Chunk]) -> None:
+        args: List[Any] = []
+        for c in chunks:
+            args += [c.chunk_id, json.dumps({"start": c.start, "texts": c.texts}, ensure_ascii=False)]
+        if args:
+            self._submit(keys=[self._key(job_id, "chunks"), self._key(job_id, "pending")], args=args)
+
+    def lease(self, job_id: str, worker_id: str, lease_seconds: float) -> Optional[Chunk]:
+        now = time.time()
+        keys = [self._key(job_id, "pending"), self._key(job_id, "leases"), self._key(job_id, "results")]
+        chunk_id = self._lease(keys=keys, args=[now, now + lease_seconds])
+        if chunk_id is None:
+            return None
+        payload = json.loads(self.client.hget(self._key(job_id, "chunks"), chunk_id))
+        return Chunk(chunk_id=int(chunk_id), start=payload["start"], texts=payload["texts"])
+
+    def complete(self, job_id: str, chunk_id: int, results: List[Any]) -> None:
+        pipe = self.client.pipeline()
+        pipe.hsetnx(self._key(job_id, "results"), chunk_id, json.dumps(results, ensure_ascii=False))
+        pipe.zrem(self._key(job_id, "leases"), chunk_id)
+        pipe.execute()
+
+    def progress(self, job_id: str) -> Dict[str, int]:
+        return {"total": self.client.hlen(self._key(job_id, "chunks")),
+                "done": self.client.hlen(self._key(job_id, "results"))}
+
+    def results(self, job_id: str) -> List[List[Any]]:
+        stored = self.client.hgetall(self._key(job_id, "results"))
+        return [json.loads(stored[key]) for key in sorted(stored, key=int)]
+
+
+class Coordinator:
+    """Splits a job into leased chunks and merges the results back in order"""
+
+    def __init__(self, queue: WorkQueue, job_id: Optional[str] = None):
+        """
+        Initialize the coordinator.
+
+        Args:
+            queue (WorkQueue): Queue shared with the workers
+            job_id (str): Job identifier (generated if None)
+        """
+        self.queue = queue
+        self.job_id = job_id or uuid.uuid4().hex
+
+    def submit(self, texts: List[str], chunk_size: int = 1000) -> int:
+        """
+        Split texts into chunks and enqueue them.
+
+        Args:
+            texts (List[str]): Input texts
+            chunk_size (int): Rows per chunk
+
+        Returns:
+            int: Number of chunks
+        """
+        chunks = [
+            Chunk(chunk_id=index, start=start, texts=texts[start:start + chunk_size])
+            for index, start in enumerate(range(0, len(texts), chunk_size))
+        ]
+        self.queue.put_chunks(self.job_id, chunks)
+        return len(chunks)
+
+    def done(self) -> bool:
+        """Whether every chunk has been completed."""
+        progress = self.queue.progress(self.job_id)
+        return progress["done"] >= progress["total"]
+
+    def wait(self, poll_interval: float = 5.0, timeout: Optional[float] = None) -> None:
+        """
+        Block until all chunks are completed.
+
+        Args:
+            poll_interval (float): Seconds between progress checks
+            timeout (float): Maximum seconds to wait (forever if None)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.done():
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Job {self.job_id} not finished: {self.queue.progress(self.job_id)}")
+            time.sleep(poll_interval)
+
+    def collect(self) -> List[Any]:
+        """
+        Merge chunk results into one list in input order.
+
+        Returns:
+            List[Any]: Results, one per input row
+        """
+        if not self.done():
+            raise RuntimeError(f"Job {self.job_id} not finished: {self.queue.progress(self.job_id)}")
+        return [result for chunk_results in self.queue.results(self.job_id) for result in chunk_results]
+
+
+class Worker:
+    """Leases chunks from a queue and runs them through a Parse or Classify engine"""
+
+    def __init__(self,
+                 queue: WorkQueue,
+                 job_id: str,
+                 engine: Any,
+                 method: str = "parse_batch",
+                 worker_id: Optional[str] = None,
+                 lease_seconds: float = 600.0):
+        """
+        Initialize the worker.
+
+        Args:
+            queue (WorkQueue): Queue shared with the coordinator
+            job_id (str): Job identifier
+            engine (Any): Engine with a batch method, e.g. Parse
+            method (str): Batch method called with the chunk texts
+            worker_id (str): Worker identifier (host and pid if None)
+            lease_seconds (float): Lease duration; must exceed the time to process one chunk
+        """
+        self.queue = queue
+        self.job_id = job_id
+        self.engine = engine
+        self.method = method
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+
+    def run_once(self) -> bool:
+        """
+        Process a single chunk.
+
+        Returns:
+            bool: False if no chunk was available
+        """
+        chunk = self.queue.lease(self.job_id, self.worker_id, self.lease_seconds)
+        if chunk is None:
+            return False
+        results = getattr(self.engine, self.method)(chunk.texts)
+        self.queue.complete(self.job_id, chunk.chunk_id, list(results))
+        return True
+
+    def run(self, poll_interval: float = 5.0, max_chunks: Optional[int] = None) -> int:
+        """
+        Process chunks until the job is finished.
+
+        Workers may start before the coordinator; they wait until the job has
+        been submitted.
+
+        Args:
+            poll_interval (float): Seconds to wait when all remaining chunks are leased by others
+            max_chunks (int): Stop after this many chunks (unlimited if None)
+
+        Returns:
+            int: Number of chunks processed
+        """
+        processed = 0
+        while max_chunks is None or processed < max_chunks:
+            if self.run_once():
+                processed += 1
+                continue
+            progress = self.queue.progress(self.job_id)
+            if progress["total"] and progress["done"] >= progress["total"]:
+                break
+            # Not submitted yet, or remaining chunks are leased; wait in case a lease expires
+            time.sleep(poll_interval)
+        return processed
@@ -0,0 +1,297 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _division.py
+
+import csv
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from importlib import resources
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from .model_func import API_ERROR_OUTPUT, EMPTY_OUTPUT
+
+# Administrative suffixes, longest first so that "自治区" wins over "区"
+ADMIN_SUFFIXES = (
+    "特别行政区", "自治区", "自治州", "自治县", "自治旗",
+    "林区", "地区", "省", "市", "县", "区", "盟", "旗",
+)
+
+# Ethnic group names that appear inside autonomous division names
+ETHNIC_GROUPS = (
+    "蒙古族", "回族", "藏族", "维吾尔族", "苗族", "彝族", "壮族", "布依族", "朝鲜族",
+    "满族", "侗族", "瑶族", "白族", "土家族", "哈尼族", "哈萨克族", "傣族", "黎族",
+    "傈僳族", "佤族", "畲族", "拉祜族", "水族", "东乡族", "纳西族", "景颇族",
+    "柯尔克孜族", "土族", "达斡尔族", "仫佬族", "羌族", "布朗族", "撒拉族", "毛南族",
+    "仡佬族", "锡伯族", "阿昌族", "普米族", "塔吉克族", "怒族", "乌孜别克族",
+    "俄罗斯族", "鄂温克族", "德昂族", "保安族", "裕固族", "京族", "塔塔尔族",
+    "独龙族", "鄂伦春族", "赫哲族", "门巴族", "珞巴族", "基诺族", "高山族",
+)
+
+# Province-level municipalities, which also act as prefecture-level cities
+MUNICIPALITY_CODES = frozenset({"110000", "120000", "310000", "500000"})
+
+LEVEL_PROVINCE = "province"
+LEVEL_PREFECTURE = "prefecture"
+LEVEL_COUNTY = "county"
+
+_LEVEL_ORDER = {LEVEL_PROVINCE: 0, LEVEL_PREFECTURE: 1, LEVEL_COUNTY: 2}
+
+_THINK_RE = re.compile(r"<think>.*?(</think>|$)", re.DOTALL)
+_TAG_RE = re.compile(r"</?[a-zA-Z_]+>")
+_STRIP_CHARS = " \t\r\n\"'“”‘’「」『』《》【】()（）[]<>.,，。、!！?？:：;；`*-"
+
+
+def strip_reasoning(raw: str) -> str:
+    """
+    Remove `<think>` reasoning blocks emitted by reasoning models.
+
+    Args:
+        raw (str): Raw model output
+
+    Returns:
+        str: Output without reasoning blocks
+    """
+    return _THINK_RE.sub("", raw).strip() if raw else ""
+
+
+def clean_output(raw: str) -> str:
+    """
+    Remove reasoning blocks, markup, punctuation and error sentinels from model output.
+
+    Args:
+        raw (str): Raw model output
+
+    Returns:
+        str: Cleaned output, empty string if nothing usable remains
+    """
+    text = _TAG_RE.sub("", strip_reasoning(raw)).strip()
+    if not text:
+        return ""
+    text = text.splitlines()[0].strip(_STRIP_CHARS)
+    if text in (EMPTY_OUTPUT, API_ERROR_OUTPUT):
+        return ""
+    return text
+
+
+def short_name(name: str) -> str:
+    """
+    Strip the administrative suffix and ethnic group names from a division name.
+
+    Args:
+        name (str): Full division name, e.g. "广西壮族自治区"
+
+    Returns:
+        str: Short name, e.g. "广西"
+    """
+    for suffix in ADMIN_SUFFIXES:
+        if name.endswith(suffix) and len(name) > len(suffix):
+            name = name[:-len(suffix)]
+            break
+    stripped = True
+    while stripped:
+        stripped = False
+        for group in ETHNIC_GROUPS:
+            if name.endswith(group) and len(name) > len(group):
+                name = name[:-len(group)]
+                stripped = True
+                break
+    return name
+
+
+@dataclass(frozen=True, slots=True)
+class Division:
+    """A single administrative division identified by its GB/T 2260 code"""
+    code: str
+    name: str
+
+    @property
+    def level(self) -> str:
+        """Administrative level derived from the code"""
+        if self.code.endswith("0000"):
+            return LEVEL_PROVINCE
+        if self.code.endswith("00"):
+            return LEVEL_PREFECTURE
+        return LEVEL_COUNTY
+
+    @property
+    def is_municipality(self) -> bool:
+        """Whether the division is a province-level municipality"""
+        return self.code in MUNICIPALITY_CODES
+
+    @property
+    def short_name(self) -> str:
+        """Name without administrative suffix"""
+        return short_name(self.name)
+
+
+class DivisionTable:
+    """In-memory indexed administrative division table (GB/T 2260)"""
+
+    def __init__(self, divisions: Iterable[Division]):
+        """
+        Build code and name indexes over the divisions.
+
+        Args:
+            divisions (Iterable[Division]): Divisions to index
+        """
+        self._by_code: Dict[str, Division] = {}
+        self._by_name: Dict[str, List[Division]] = {}
+        self._by_alias: Dict[str, List[Division]] = {}
+
+        for division in divisions:
+            self._by_code[division.code] = division
+            self._by_name.setdefault(division.name, []).append(division)
+            alias = division.short_name
+            if len(alias) >= 2 and alias != division.name:
+                self._by_alias.setdefault(alias, []).append(division)
+
+        # Prefer higher administrative levels when a name is ambiguous
+        for index in (self._by_name, self._by_alias):
+            for candidates in index.values():
+                candidates.sort(key=lambda d: (_LEVEL_ORDER[d.level], d.code))
+
+        self.max_name_length = max((len(name) for name in self._by_name), default=0)
+        self._names: Optional[FrozenSet[str]] = None
+
+    @classmethod
+    def from_csv(cls, path: str) -> "DivisionTable":
+        """
+        Load a division table from a CSV file with `code` and `name` columns.
+
+        Args:
+            path (str): CSV file path
+
+        Returns:
+            DivisionTable: Loaded table
+        """
+        with open(path, encoding="utf-8", newline="") as f:
+            return cls(Division(row["code"], row["name"]) for row in csv.DictReader(f))
+
+    @classmethod
+    def default(cls) -> "DivisionTable":
+        """
+        Get the bundled division table, loaded once per process.
+
+        Returns:
+            DivisionTable: Shared default table
+        """
+        return _load_default_table()
+
+    def __len__(self) -> int:
+        return len(self._by_code)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name or name in self._by_alias
+
+    @property
+    def names(self) -> FrozenSet[str]:
+        """Full names of all divisions (no short names)"""
+        if self._names is None:
+            self._names = frozenset(self._by_name)
+        return self._names
+
+    def get(self, code: str) -> Optional[Division]:
+        """
+        Get a division by its code.
+
+        Args:
+            code (str): 6-digit GB/T 2260 code
+
+        Returns:
+            Optional[Division]: Matching division or None
+        """
+        return self._by_code.get(code)
+
+    def lookup(self, name: str, parent: Optional[Division] = None) -> Optional[Division]:
+        """
+        Look up a division by full or short name.
+
+        Args:
+            name (str): Division name, e.g. "六盘水市" or "六盘水"
+            parent (Division): Optional ancestor used to disambiguate duplicate names
+
+        Returns:
+            Optional[Division]: Best matching division or None
+        """
+        candidates = self._by_name.get(name) or self._by_alias.get(name)
+        if not candidates:
+            return None
+        if parent is not None:
+            for candidate in candidates:
+                if self.is_ancestor(parent, candidate):
+                    return candidate
+        return candidates[0]
+
+    def parent(self, division: Division) -> Optional[Division]:
+        """
+        Get the parent division, skipping levels absent from the table.
+
+        Args:
+            division (Division): Child division
+
+        Returns:
+            Optional[Division]: Parent division, None for provinces
+        """
+        if division.level == LEVEL_COUNTY:
+            prefecture = self._by_code.get(division.code[:4] + "00")
+            if prefecture is not None:
+                return prefecture
+        if division.level != LEVEL_PROVINCE:
+            return self._by_code.get(division.code[:2] + "0000")
+        return None
+
+    def province(self, division: Division) -> Optional[Division]:
+        """Get the province-level division containing the division."""
+        return self._by_code.get(division.code[:2] + "0000")
+
+    def is_ancestor(self, ancestor: Division, division: Division) -> bool:
+        """Check whether `ancestor` contains `division`."""
+        if ancestor.level == LEVEL_PROVINCE:
+            return division.code[:2] == ancestor.code[:2]
+        if ancestor.level == LEVEL_PREFECTURE:
+            return division.code[:4] == ancestor.code[:4]
+        return division.code == ancestor.code
+
+    def canonicalize(self, raw: str, parent: Optional[Division] = None) -> Optional[Division]:
+        """
+        Map raw model output to a canonical division.
+
+        Args:
+            raw (str): Raw model output
+            parent (Division): Optional ancestor used to disambiguate duplicate names
+
+        Returns:
+            Optional[Division]: Canonical division, None if the output is not a known place
+        """
+        text = clean_output(raw)
+        if not text:
+            return None
+        division = self.lookup(text, parent)
+        if division is not None:
+            return division
+        # Outputs like "上海市徐汇区" carry several levels, take the longest known prefix.
+        # The rest must itself be a division or suffix, so 北京大学 or 南京路 are rejected
+        for length in range(min(len(text) - 1, self.max_name_length), 1, -1):
+            division = self.lookup(text[:length], parent)
+            if division is not None and self._starts_with_division(text[length:]):
+                return division
+        return None
+
+    def _starts_with_division(self, text: str) -> bool:
+        """Check whether text starts with a known division name or an administrative suffix."""
+        if text.startswith(ADMIN_SUFFIXES):
+            return True
+        return any(text[:length] in self for length in range(min(len(text), self.max_name_length), 1, -1))
+
+
+@lru_cache(maxsize=1)
+def _load_default_table() -> DivisionTable:
+    source = resources.files("city_parse").joinpath("data", "divisions.csv")
+    with source.open(encoding="utf-8", newline="") as f:
+        return DivisionTable(Division(row["code"], row["name"]) for row in csv.DictReader(f))
@@ -0,0 +1,201 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _embedding.py
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ._classify import Classify
+from ._model import Model, ModelConfig, ModelSource
+
+
+class EmbeddingClassify:
+    """Nearest-neighbour text classification over category embeddings, without generation"""
+
+    def __init__(self,
+                 model_id: str,
+                 categories: List[str],
+                 source: ModelSource = ModelSource.OLLAMA,
+                 category_descriptions: Optional[Dict[str, str]] = None,
+                 examples: Optional[Dict[str, List[str]]] = None,
+                 fallback: Optional[Classify] = None,
+                 min_margin: float = 0.05,
+                 batch_size: int = 64,
+                 **kwargs):
+        """
+        Initialize the classifier and embed all categories once.
+
+        Args:
+            model_id (str): Embedding model identifier (e.g. "bge-m3" for Ollama)
+            categories (List[str]): List of classification categories
+            source (ModelSource): Model source providing embeddings
+            category_descriptions (Dict[str, str]): Optional descriptions for each category
+            examples (Dict[str, List[str]]): Optional example texts for each category
+            fallback (Classify): Generative classifier used when the top-2 score margin is small
+            min_margin (float): Minimum margin between best and second best score to skip the fallback
+            batch_size (int): Number of texts embedded per backend call
+            **kwargs: Additional arguments for model initialization
+        """
+        self.categories = [str(cat).strip() for cat in categories if str(cat).strip()]
+        if not self.categories:
+            raise ValueError("At least one category must be provided")
+
+        self.category_descriptions = category_descriptions or {}
+        self.examples = examples or {}
+        self.fallback = fallback
+        self.min_margin = min_margin
+        self.batch_size = batch_size
+
+        self.config = ModelConfig(model_id=model_id, source=source, **kwargs)
+        self.model = Model(self.config)
+        self._instance = self.model.create_instance()
+
+        self._build_index()
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts in batches and L2-normalize the rows."""
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._instance.embed(texts[start:start + self.batch_size]))
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def _build_index(self) -> None:
+        """Embed category names, descriptions and examples into one matrix."""
+        entries: List[str] = []
+        owners: List[int] = []
+        for index, category in enumerate(self.categories):
+            description = self.category_descriptions.get(category)
+            entries.append(f"{category}: {description}" if description else category)
+            owners.append(index)
+            for example in self.examples.get(category, []):
+                entries.append(example)
+                owners.append(index)
+
+        # Entries are grouped by category so per-category maxima can use reduceat
+        self._matrix = self._embed(entries)
+        self._owners = np.asarray(owners)
+        self._offsets = np.searchsorted(self._owners, np.arange(len(self.categories)))
+
+    def scores(self, texts: List[str]) -> np.ndarray:
+        """
+        Compute cosine similarity of each text to each category.
+
+        Args:
+            texts (List[str]): Input texts
+
+        Returns:
+            np.ndarray: Matrix of shape (len(texts), len(categories))
+        """
+        if not texts:
+            return np.zeros((0, len(self.categories)), dtype=np.float32)
+        similarities = self._embed([text.strip() for text in texts]) @ self._matrix.T
+        return np.maximum.reduceat(similarities, self._offsets, axis=1)
+
+    def top_k(self, texts: List[str], k: int = 3) -> List[List[Tuple[str, float]]]:
+        """
+        Get the k most similar categories for each text.
+
+        Args:
+            texts (List[str]): Input texts
+            k (int): Number of categories to return per text
+
+        Returns:
+            List[List[Tuple[str, float]]]: (category, score) pairs, best first
+        """
+        scores = self.scores(texts)
+        k = min(k, len(self.categories))
+        order = np.argsort(-scores, axis=1)[:, :k]
+        return [
+            [(self.categories[j], float(row_scores[j])) for j in row_order]
+            for row_order, row_scores in zip(order, scores)
+        ]
+
+    def classify_batch(self, texts: List[str]) -> List[str]:
+        """
+        Classify multiple texts with one embedding pass and a matrix multiply.
+
+        Args:
+            texts (List[str]): List of input texts to classify
+
+        Returns:
+            List[str]: List of category names
+        """
+        return [info['category'] for info in self.classify_batch_with_confidence(texts)]
+
+    def classify_batch_with_confidence(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Classify multiple texts and report similarity scores as confidence.
+
+        Args:
+            texts (List[str]): List of input texts to classify
+
+        Returns:
+            List[Dict[str, Any]]: Dictionaries with 'category', 'confidence', 'margin' and 'fallback' keys
+        """
+        if not texts:
+            return []
+        if any(not text or not text.strip() for text in texts):
+            raise ValueError("Input text cannot be empty")
+
+        scores = self.scores(texts)
+        if scores.shape[1] > 1:
+            top2 = np.partition(scores, -2, axis=1)[:, -2:]
+            margins = top2[:, 1] - top2[:, 0]
+        else:
+            margins = np.ones(len(texts), dtype=np.float32)
+        best = np.argmax(scores, axis=1)
+
+        results = []
+        for text, index, row_scores, margin in zip(texts, best, scores, margins):
+            category = self.categories[index]
+            used_fallback = self.fallback is not None and bool(margin < self.min_margin)
+            if used_fallback:
+                category = self.fallback.classify(text)
+            results.append({
+                'category': category,
+                'confidence': float(row_scores[index]),
+                'margin': float(margin),
+                'fallback': used_fallback
+            })
+        return results
+
+    def classify(self, text: str) -> str:
+        """
+        Classify text into predefined categories.
+
+        Args:
+            text (str): Input text to classify
+
+        Returns:
+            str: Category name
+        """
+        return self.classify_batch([text])[0]
+
+    def classify_with_confidence(self, text: str) -> Dict[str, Any]:
+        """
+        Classify text with similarity score as confidence.
+
+        Args:
+            text (str): Input text to classify
+
+        Returns:
+            Dict[str, Any]: Dictionary containing 'category', 'confidence', 'margin' and 'fallback' keys
+        """
+        return self.classify_batch_with_confidence([text])[0]
+
+    def get_categories(self) -> List[str]:
+        """
+        Get the list of available categories.
+
+        Returns:
+            List[str]: List of category names
+        """
+        return self.categories.copy()
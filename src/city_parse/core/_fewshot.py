@@ -0,0 +1,186 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _fewshot.py
+
+import math
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Union
+
+
+@dataclass(frozen=True, slots=True)
+class Example:
+    """One few-shot example: an input text and the expected output"""
+    input: str
+    output: str
+
+
+def render_examples(examples: Sequence[Example], indent: str = "    ") -> str:
+    """
+    Render examples as the <examples> block used by the system prompts.
+
+    Args:
+        examples (Sequence[Example]): Examples to render
+        indent (str): Indentation of the <examples> tag
+
+    Returns:
+        str: Prompt section without a trailing newline
+    """
+    lines = [f"{indent}<examples>"]
+    for example in examples:
+        lines += [
+            f"{indent}    <example>",
+            f"{indent}        <input>{example.input}</input>",
+            f"{indent}        <output>{example.output}</output>",
+            f"{indent}    </example>",
+        ]
+    lines.append(f"{indent}</examples>")
+    return "\n".join(lines)
+
+
+class FewShotSelector:
+    """Picks the examples most similar to an input from a character n-gram index"""
+
+    def __init__(self,
+                 examples: Iterable[Union[Example, Tuple[str, str]]],
+                 k: int = 3,
+                 ngram: int = 2,
+                 cluster_ngrams: int = 3,
+                 cache_size: int = 4096):
+        """
+        Index the example bank once.
+
+        Args:
+            examples (Iterable[Union[Example, Tuple[str, str]]]): Example bank as Example or (input, output) pairs
+            k (int): Default number of examples selected per input
+            ngram (int): Character n-gram length used for similarity
+            cluster_ngrams (int): Number of rarest n-grams identifying a cluster of similar inputs
+            cache_size (int): Number of clusters whose selection is cached
+        """
+        self.examples: List[Example] = [
+            example if isinstance(example, Example) else Example(*example) for example in examples
+        ]
+        if not self.examples:
+            raise ValueError("At least one example must be provided")
+        self.k = k
+        self.ngram = ngram
+        self.cluster_ngrams = cluster_ngrams
+        self.cache_size = cache_size
+
+        # Inverted index: n-gram -> ids of examples containing it, weighted by IDF
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        example_grams = [self._ngrams(example.input) for example in self.examples]
+        for index, grams in enumerate(example_grams):
+            for gram in grams:
+                self._postings[gram].append(index)
+        count = len(self.examples)
+        self._idf = {gram: math.log(1 + count / len(ids)) for gram, ids in self._postings.items()}
+        self._norms = [math.sqrt(sum(self._idf[gram] ** 2 for gram in grams)) or 1.0 for grams in example_grams]
+
+        self._cache: "OrderedDict[Tuple[FrozenSet[str], int], Tuple[Example, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self) -> dict:
+        # Locks cannot be pickled; process workers start with an empty cache of their own
+        state = self.__dict__.copy()
+        del state["_lock"], state["_cache"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_category_examples(cls, examples: Dict[str, List[str]], **kwargs) -> "FewShotSelector":
+        """
+        Build a selector from per-category example texts, as passed to Classify.
+
+        Args:
+            examples (Dict[str, List[str]]): Example texts for each category
+            **kwargs: Arguments forwarded to the constructor
+
+        Returns:
+            FewShotSelector: Selector whose example outputs are category names
+        """
+        return cls([Example(text, category) for category, texts in examples.items() for text in texts], **kwargs)
+
+    def _ngrams(self, text: str) -> FrozenSet[str]:
+        """Character n-grams of a text, ignoring whitespace."""
+        text = "".join(text.split())
+        if len(text) <= self.ngram:
+            return frozenset([text]) if text else frozenset()
+        return frozenset(text[i:i + self.ngram] for i in range(len(text) - self.ngram + 1))
+
+    def _cluster_key(self, grams: FrozenSet[str]) -> FrozenSet[str]:
+        """Identify a cluster by the rarest indexed n-grams of an input."""
+        known = sorted((gram for gram in grams if gram in self._idf), key=lambda gram: (-self._idf[gram], gram))
+        return frozenset(known[:self.cluster_ngrams])
+
+    def _rank(self, grams: FrozenSet[str], k: int) -> Tuple[Example, ...]:
+        """Rank examples by TF-IDF cosine similarity to the input n-grams."""
+        scores: Dict[int, float] = defaultdict(float)
+        for gram in grams:
+            weight = self._idf.get(gram)
+            if weight is None:
+                continue
+            for index in self._postings[gram]:
+                scores[index] += weight * weight
+        ranked = sorted(scores, key=lambda index: (-scores[index] / self._norms[index], index))
+        # Pad with the first examples of the bank so the format is always demonstrated
+        chosen = ranked[:k] + [index for index in range(len(self.examples)) if index not in scores][:k - len(ranked)]
+        return tuple(self.examples[index] for index in chosen[:k])
+
+    def select(self, text: str, k: Optional[int] = None) -> Tuple[Example, ...]:
+        """
+        Select the k examples most relevant to a text.
+
+        Inputs sharing their rarest n-grams (e.g. titles of the same issuing
+        authority) reuse one cached selection.
+
+        Args:
+            text (str): Input text
+            k (int): Number of examples (uses the default if None)
+
+        Returns:
+            Tuple[Example, ...]: Selected examples, most similar first
+        """
+        k = self.k if k is None else k
+        grams = self._ngrams(text)
+        key = (self._cluster_key(grams), k)
+        with self._lock:
+            selection = self._cache.get(key)
+            if selection is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return selection
+            self.misses += 1
+
+        selection = self._rank(grams, k)
+        with self._lock:
+            self._cache[key] = selection
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return selection
+
+    def render(self, text: str, k: Optional[int] = None, indent: str = "    ") -> str:
+        """
+        Render the examples selected for a text as an <examples> block.
+
+        Args:
+            text (str): Input text
+            k (int): Number of examples (uses the default if None)
+            indent (str): Indentation of the <examples> tag
+
+        Returns:
+            str: Prompt section
+        """
+        return render_examples(self.select(text, k), indent)
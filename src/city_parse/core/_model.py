@@ -7,11 +7,12 @@
 # @Email  : sepinetam@gmail.com
 # @File   : _model.py
 
+import time
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, Optional, Type
+from typing import Any, Collection, Dict, Optional, Type, Union
 
-from .model_func import OllamaFunc, OpenAIFunc
+from .model_func import HistoryPolicy, HuggingFaceFunc, LlamaCppFunc, OllamaFunc, OpenAIFunc, RateLimiter
 
 
 class ModelSource(Enum):
@@ -20,6 +21,7 @@ class ModelSource(Enum):
     MODELSCOPE = "modelscope"
     OLLAMA = "ollama"
     OPENAI = "openai"
+    LLAMA_CPP = "llama_cpp"
 
 
 @dataclass
@@ -32,11 +34,23 @@ class ModelConfig:
     # Hugging Face specific
     device: str = "cpu"  # "cpu", "cuda", "mps" etc.
     torch_dtype: str = "float32"  # "float32", "float16", "bfloat16"
+    quantization: Optional[str] = None  # None, "int8" (dynamic int8 on CPU), "int4"
+    prompt_lookup_num_tokens: Optional[int] = 10  # tokens drafted from the input, None disables
+    early_exit: Optional[Collection[str]] = None  # complete answers that stop generation early
+    # llama.cpp specific (quantization is chosen by the GGUF file, e.g. Q4_K_M)
+    gguf_file: Optional[str] = None  # file inside the repo when model_id is a repo id
+    n_ctx: int = 2048
+    n_threads: Optional[int] = None
     # OpenAI specific
     api_key: Optional[str] = None
     base_url: str = "https://api.openai.com/v1"
+    # Shared by every instance created from this config (and any other config given the same limiter)
+    rate_limiter: Optional[RateLimiter] = None
     # Ollama specific
     host: str = "http://localhost:11434"
+    keep_alive: Optional[Union[str, float]] = None  # e.g. "30m", -1 keeps the model loaded
+    # Conversation history bounds for instances created from this config
+    history_policy: Optional[HistoryPolicy] = None
 
 
 class ModelRegistry:
@@ -65,6 +79,8 @@ class ModelRegistry:
 # Initialize registry with built-in implementations
 ModelRegistry.register(ModelSource.OLLAMA, OllamaFunc)
 ModelRegistry.register(ModelSource.OPENAI, OpenAIFunc)
+ModelRegistry.register(ModelSource.HUGGINGFACE, HuggingFaceFunc)
+ModelRegistry.register(ModelSource.LLAMA_CPP, LlamaCppFunc)
 
 
 class Model:
@@ -100,28 +116,58 @@ class Model:
 
         return self.model_class(**init_args)
 
+    def preload(self, keep_alive: Optional[Union[str, float]] = -1, **kwargs) -> float:
+        """
+        Load the model weights (and pin them resident on an Ollama server).
+
+        Args:
+            keep_alive (Union[str, float]): How long Ollama keeps the model loaded after the load request,
+                -1 pins it, None uses the configured value; ignored by other sources
+            **kwargs: Additional arguments for model initialization
+
+        Returns:
+            float: Load time in milliseconds
+        """
+        if self.config.source == ModelSource.OLLAMA and keep_alive is not None:
+            kwargs.setdefault("keep_alive", keep_alive)
+        started = time.perf_counter()
+        self.create_instance(**kwargs).preload()
+        return (time.perf_counter() - started) * 1000
+
     def _prepare_init_args(self, **kwargs) -> Dict[str, Any]:
         """Prepare initialization arguments based on model source"""
         base_args = {
             "model_id": self.config.model_id,
             "system_prompt": self.config.system_prompt,
-            "temperature": self.config.temperature
+            "temperature": self.config.temperature,
+            "history_policy": self.config.history_policy
         }
 
         # Add source-specific arguments
         if self.config.source == ModelSource.OPENAI:
             base_args.update({
                 "api_key": self.config.api_key,
-                "base_url": self.config.base_url
+                "base_url": self.config.base_url,
+                "rate_limiter": self.config.rate_limiter
             })
         elif self.config.source == ModelSource.HUGGINGFACE:
             base_args.update({
                 "device": self.config.device,
-                "torch_dtype": self.config.torch_dtype
+                "torch_dtype": self.config.torch_dtype,
+                "quantization": self.config.quantization,
+                "prompt_lookup_num_tokens": self.config.prompt_lookup_num_tokens,
+                "early_exit": self.config.early_exit
+            })
+        elif self.config.source == ModelSource.LLAMA_CPP:
+            base_args.update({
+                "gguf_file": self.config.gguf_file,
+                "n_ctx": self.config.n_ctx,
+                "n_threads": self.config.n_threads
             })
         elif self.config.source == ModelSource.OLLAMA:
             base_args.update({
-                "host": self.config.host
+                "host": self.config.host,
+                "keep_alive": self.config.keep_alive
             })
 
         # Override with any provided kwargs
@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _parallel.py
+
+import math
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, List, Optional
+
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+
+# Environment variables read by BLAS / OpenMP runtimes when they start
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+# Engine loaded once per worker process
+_worker_engine: Any = None
+
+
+def pin_threads(threads: int) -> None:
+    """
+    Limit the number of compute threads used by the current process.
+
+    Args:
+        threads (int): Number of threads
+    """
+    for name in _THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+
+
+def _init_worker(engine: Any, threads: Optional[int]) -> None:
+    """Process pool initializer: pin threads, then load the model once."""
+    global _worker_engine
+    if threads:
+        pin_threads(threads)
+    _worker_engine = engine
+    # Instantiating the backend loads local weights into this process
+    engine.create_model()
+
+
+def _run_shard(method: str, shard: List[str]) -> List[Any]:
+    """Run one contiguous shard of rows in a worker process."""
+    func = getattr(_worker_engine, method)
+    return [func(text) for text in shard]
+
+
+def _shards(texts: List[str], count: int) -> List[List[str]]:
+    """Split rows into `count` contiguous ranges of near-equal size."""
+    size = max(1, math.ceil(len(texts) / count))
+    return [texts[start:start + size] for start in range(0, len(texts), size)]
+
+
+def run_batch(engine: Any,
+              method: str,
+              texts: List[str],
+              workers: int = 1,
+              executor: str = EXECUTOR_THREAD,
+              threads_per_worker: Optional[int] = None,
+              shards_per_worker: int = 4) -> List[Any]:
+    """
+    Run `engine.<method>(text)` for every text, preserving input order.
+
+    Args:
+        engine (Any): Parse or Classify instance; must be picklable for process execution
+        method (str): Name of the per-text method, e.g. "parse"
+        texts (List[str]): Input texts
+        workers (int): Number of worker threads or processes
+        executor (str): "thread" for I/O-bound remote backends, "process" for CPU-bound local inference
+        threads_per_worker (int): Compute threads pinned in each worker process (defaults to cores / workers)
+        shards_per_worker (int): Number of row ranges per worker, for load balancing
+
+    Returns:
+        List[Any]: Results in input order
+    """
+    if not texts:
+        return []
+    func = getattr(engine, method)
+    if workers <= 1:
+        return [func(text) for text in texts]
+
+    if executor == EXECUTOR_THREAD:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(func, texts))
+
+    if executor == EXECUTOR_PROCESS:
+        if threads_per_worker is None:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+        shards = _shards(texts, workers * shards_per_worker)
+        # Spawned workers avoid inheriting locked thread pools from the parent
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=context,
+                                 initializer=_init_worker,
+                                 initargs=(engine, threads_per_worker)) as pool:
+            results: List[Any] = []
+            for shard_results in pool.map(_run_shard, [method] * len(shards), shards):
+                results.extend(shard_results)
+            return results
+
+    raise ValueError(f"Unknown executor: {executor}")
@@ -7,72 +7,111 @@
 # @Email  : sepinetam@gmail.com
 # @File   : _parse.py
 
-from typing import Optional
+import json
+import math
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
+from ._batching import MicroBatcher
+from ._fewshot import Example, FewShotSelector, render_examples
+from ._division import (LEVEL_COUNTY, LEVEL_PREFECTURE, LEVEL_PROVINCE, Division,
+                        DivisionTable, strip_reasoning)
 from ._model import Model, ModelConfig, ModelSource
+from ._parallel import EXECUTOR_THREAD, run_batch
+from ._result import CityCandidate, ParseResult, StructuredResult, WarmupReport
+from ._rules import RuleEngine
+from ._spans import find_spans
+from ._store import write_results
+from ._vocab import CodedResults, Vocabulary, run_coded
+from .model_func import CompiledPrompt, FuncBase, compile_prompt
+
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
 
 
 class Parse:
     """Parse class for extracting city names from text using various models"""
 
-    # Default system prompt for city parsing
-    DEFAULT_SYSTEM_PROMPT = """
+    # Few-shot examples of the default system prompt
+    DEFAULT_EXAMPLES: Tuple[Example, ...] = (
+        Example('山西省临沂市人民政府办公厅关于印发临沂市金融业"十三五"发展规划（2016-2018年）的通知', "临沂市"),
+        Example('重庆市人民政府关于印发重庆市建设国内重要功能性金融中心"十三五"规划的通知', "重庆市"),
+        Example("武汉市长江大桥正式通车", "武汉市"),
+        Example("中共龙州县委员会办公室、龙州县人民政府办公室关于印发《龙州县工业产业转型升级三年攻坚行动计划(2016―2018年)》的通知", "龙州县"),
+        Example("关于六盘水人民政府的众多问题多方协商会议", "六盘水市"),
+        Example("商丘市人民政府办公室关于印发商丘市科技创新跨越发展行动计划的通知", "商丘市"),
+        Example("上海市徐汇区人民政府关于印发徐汇区深化医药卫生体制改革近期重点实施方案的通知", "上海市"),
+        Example("内蒙古自治区人力资源和社会保障厅对自治区十三届人大ー次会议第434号建议的答复", "内蒙古自治区"),
+        Example("绍兴市上虞区人民政府办公室关于印发绍兴市上虞区卫生健康现代化建设实施方案的通知", "绍兴市"),
+        Example("北京市石景山区人民政府关于印发《中关村科技园区石景山园改革提升工作方案》的通知", "北京市"),
+        Example("河北省数据和政务服务局对政协河北省第十三届委员会第二次会议第0317号提案的答复", "河北省"),
+    )
+
+    # System prompt without examples, used with a FewShotSelector
+    BASE_SYSTEM_PROMPT = """
     <role>你是一个专门从文本中提取城市名称的助手。</role>
     <task>请从给定的文本中识别并提取出最主要的一个城市名称，要求是最小行政单位。只返回一个城市名称，不要添加其他解释。</task>
+"""
+
+    # Default system prompt for city parsing
+    DEFAULT_SYSTEM_PROMPT = BASE_SYSTEM_PROMPT + render_examples(DEFAULT_EXAMPLES) + "\n\n    "
+
+    # System prompt for province / prefecture / county extraction with JSON output
+    STRUCTURED_SYSTEM_PROMPT = """
+    <role>你是一个专门从文本中提取行政区划的助手。</role>
+    <task>请从给定的文本中识别最主要的地点，分别给出省级、地级（市）和县级行政区名称。
+    只输出一个JSON对象，键为province、city、county，无法确定的层级填null，不要添加其他解释。</task>
     <examples>
-        <example>
-            <input>山西省临沂市人民政府办公厅关于印发临沂市金融业"十三五"发展规划（2016-2018年）的通知</input>
-            <output>临沂市</output>
-        </example>
-        <example>
-            <input>重庆市人民政府关于印发重庆市建设国内重要功能性金融中心"十三五"规划的通知</input>
-            <output>重庆市</output>
-        </example>
-        <example>
-            <input>武汉市长江大桥正式通车</input>
-            <output>武汉市</output>
-        </example>
         <example>
             <input>中共龙州县委员会办公室、龙州县人民政府办公室关于印发《龙州县工业产业转型升级三年攻坚行动计划(2016―2018年)》的通知</input>
-            <output>龙州县</output>
+            <output>{"province": "广西壮族自治区", "city": "崇左市", "county": "龙州县"}</output>
         </example>
         <example>
-            <input>关于六盘水人民政府的众多问题多方协商会议</input>
-            <output>六盘水市</output>
+            <input>绍兴市上虞区人民政府办公室关于印发绍兴市上虞区卫生健康现代化建设实施方案的通知</input>
+            <output>{"province": "浙江省", "city": "绍兴市", "county": "上虞区"}</output>
         </example>
         <example>
             <input>商丘市人民政府办公室关于印发商丘市科技创新跨越发展行动计划的通知</input>
-            <output>商丘市</output>
-        </example>
-        <example>
-            <input>上海市徐汇区人民政府关于印发徐汇区深化医药卫生体制改革近期重点实施方案的通知</input>
-            <output>上海市</output>
+            <output>{"province": "河南省", "city": "商丘市", "county": null}</output>
         </example>
         <example>
-            <input>内蒙古自治区人力资源和社会保障厅对自治区十三届人大ー次会议第434号建议的答复</input>
-            <output>内蒙古自治区</output>
+            <input>河北省数据和政务服务局对政协河北省第十三届委员会第二次会议第0317号提案的答复</input>
+            <output>{"province": "河北省", "city": null, "county": null}</output>
         </example>
+    </examples>
+    """
+
+    # System prompt listing every place of a text with a confidence, as JSON
+    CANDIDATES_SYSTEM_PROMPT = """
+    <role>你是一个专门从文本中提取城市名称的助手。</role>
+    <task>请列出给定文本中所有可能是主要城市的名称，要求是最小行政单位，按可能性从高到低排序，并给出0到1之间的置信度。
+    只输出一个JSON对象，格式为{"candidates": [{"city": "城市名称", "score": 置信度}]}，不要添加其他解释。</task>
+    <examples>
         <example>
-            <input>绍兴市上虞区人民政府办公室关于印发绍兴市上虞区卫生健康现代化建设实施方案的通知</input>
-            <output>绍兴市</output>
+            <input>上海与深圳经济对比分析报告</input>
+            <output>{"candidates": [{"city": "上海市", "score": 0.5}, {"city": "深圳市", "score": 0.5}]}</output>
         </example>
         <example>
-            <input>北京市石景山区人民政府关于印发《中关村科技园区石景山园改革提升工作方案》的通知</input>
-            <output>北京市</output>
+            <input>山西省临沂市人民政府办公厅关于印发临沂市金融业"十三五"发展规划（2016-2018年）的通知</input>
+            <output>{"candidates": [{"city": "临沂市", "score": 0.9}, {"city": "山西省", "score": 0.1}]}</output>
         </example>
         <example>
-            <input>河北省数据和政务服务局对政协河北省第十三届委员会第二次会议第0317号提案的答复</input>
-            <output>河北省</output>
+            <input>商丘市人民政府办公室关于印发商丘市科技创新跨越发展行动计划的通知</input>
+            <output>{"candidates": [{"city": "商丘市", "score": 1.0}]}</output>
         </example>
     </examples>
-
     """
 
     def __init__(self,
                  model_id: str,
                  source: ModelSource = ModelSource.OLLAMA,
-                 system_prompt: Optional[str] = None,
+                 system_prompt: Optional[Union[str, CompiledPrompt]] = None,
                  temperature: float = 0.1,
+                 division_table: Optional[DivisionTable] = None,
+                 example_selector: Optional[FewShotSelector] = None,
+                 rules: Union[bool, RuleEngine, None] = None,
+                 span_extraction: bool = False,
+                 early_exit: bool = True,
                  **kwargs):
         """
         Initialize the Parse class.
@@ -80,21 +119,50 @@ class Parse:
         Args:
             model_id (str): Model identifier
             source (ModelSource): Model source (OLLAMA or OPENAI)
-            system_prompt (str): System prompt for the model (uses default if None)
+            system_prompt (Union[str, CompiledPrompt]): System prompt for the model (uses default if None)
             temperature (float): Temperature parameter for generation
+            division_table (DivisionTable): Division table used for validation (uses bundled table if None)
+            example_selector (FewShotSelector): Picks the few-shot examples per input instead of
+                the fixed examples of the default prompt
+            rules (Union[bool, RuleEngine]): Title template pre-pass; True uses the default rules.
+                Only texts no rule matches are sent to the model
+            span_extraction (bool): Let the model score the place names found verbatim in the text
+                instead of generating an answer (local models only, e.g. ModelSource.HUGGINGFACE)
+            early_exit (bool): Stop local generation as soon as the answer is a complete division
+                name (ModelSource.HUGGINGFACE only); disable it for reasoning models
             **kwargs: Additional arguments for model initialization
         """
+        self.example_selector = example_selector
+        self._division_table = division_table
+        if system_prompt is None and example_selector is not None:
+            system_prompt = self.BASE_SYSTEM_PROMPT
+        self.prompt: CompiledPrompt = compile_prompt(system_prompt or self.DEFAULT_SYSTEM_PROMPT)
+
+        if early_exit and source == ModelSource.HUGGINGFACE:
+            kwargs["early_exit"] = self.division_table.names
+
         # Create model configuration
         self.config = ModelConfig(
             model_id=model_id,
             source=source,
-            system_prompt=system_prompt or self.DEFAULT_SYSTEM_PROMPT,
+            system_prompt=self.prompt.text,
             temperature=temperature,
             **kwargs
         )
 
         # Initialize model
         self.model = Model(self.config)
+        self.rule_engine: Optional[RuleEngine] = RuleEngine(division_table=self.division_table) if rules is True else (rules or None)
+        if span_extraction and self.model.model_class.score is FuncBase.score:
+            raise ValueError(f"Span extraction is not supported by {source.value} models")
+        self.span_extraction = span_extraction
+
+    @property
+    def division_table(self) -> DivisionTable:
+        """Division table used to validate and canonicalize outputs"""
+        if self._division_table is None:
+            self._division_table = DivisionTable.default()
+        return self._division_table
 
     def parse(self, text: str) -> str:
         """
@@ -106,10 +174,359 @@ class Parse:
         Returns:
             str: Extracted city name
         """
+        return self.parse_with_rule(text)[0]
+
+    def parse_with_rule(self, text: str) -> Tuple[str, Optional[str]]:
+        """
+        Parse text, trying the rule pre-pass before the model.
+
+        Args:
+            text (str): Input text to parse
+
+        Returns:
+            Tuple[str, Optional[str]]: Extracted city name and the id of the matching rule (None if the model answered)
+        """
+        if self.rule_engine is not None:
+            match = self.rule_engine.match(text)
+            if match is not None:
+                return match.place, match.rule_id
+
+        return self._parse_model(text), None
+
+    def _parse_model(self, text: str) -> str:
+        """Answer with the model, by span scoring if enabled."""
+        if self.span_extraction:
+            candidates = find_spans(text, self.division_table)
+            if len(candidates) == 1:
+                return candidates[0]
+            if candidates:
+                scores = self._create_instance_for(text).score(text, candidates)
+                return max(zip(scores, candidates), key=lambda pair: pair[0])[1]
         # Create model instance and run
-        model_instance = self.model.create_instance()
+        model_instance = self._create_instance_for(text)
         return model_instance.run(text)
 
+    def warmup(self, text: Optional[str] = None, keep_alive: Optional[Union[str, float]] = -1) -> WarmupReport:
+        """
+        Load the model and run a dummy generation before serving traffic.
+
+        The dummy request uses the real system prompt, so the server's prefix
+        cache holds it afterwards. The rule pre-pass is skipped.
+
+        Args:
+            text (str): Sample input (uses the first default example if None)
+            keep_alive (Union[str, float]): How long Ollama keeps the model loaded, -1 pins it. Every Ollama
+                request resets this timer, so it is kept for later requests unless keep_alive was configured;
+                None leaves the server default
+
+        Returns:
+            WarmupReport: Load, first-generation and warm-generation timings
+        """
+        text = text or self.DEFAULT_EXAMPLES[0].input
+        if self.config.source == ModelSource.OLLAMA and self.config.keep_alive is None:
+            self.config.keep_alive = keep_alive
+        load_ms = self.model.preload(keep_alive=self.config.keep_alive)
+        timings = []
+        output = ""
+        for _ in range(2):
+            started = time.perf_counter()
+            output = self._create_instance_for(text).run(text)
+            timings.append((time.perf_counter() - started) * 1000)
+        return WarmupReport(model_id=self.config.model_id, load_ms=load_ms,
+                            first_ms=timings[0], warm_ms=timings[1], output=output)
+
+    def prompt_for(self, text: str) -> CompiledPrompt:
+        """
+        Get the system prompt sent with a text.
+
+        Args:
+            text (str): Input text
+
+        Returns:
+            CompiledPrompt: The parser's prompt, plus the examples selected for the text if a selector is set
+        """
+        if self.example_selector is None:
+            return self.prompt
+        return compile_prompt(f"{self.prompt.text}{self.example_selector.render(text)}\n")
+
+    def _create_instance_for(self, text: str):
+        """Create a model instance, with examples selected for the text if a selector is set."""
+        if self.example_selector is None:
+            return self.model.create_instance()
+        return self.model.create_instance(system_prompt=self.prompt_for(text))
+
+    def parse_batch(self,
+                    texts: List[str],
+                    workers: int = 1,
+                    executor: str = EXECUTOR_THREAD,
+                    threads_per_worker: Optional[int] = None) -> List[str]:
+        """
+        Parse multiple texts, preserving input order.
+
+        Args:
+            texts (List[str]): Input texts to parse
+            workers (int): Number of worker threads or processes
+            executor (str): "thread" for remote backends, "process" for CPU-bound local models
+            threads_per_worker (int): Compute threads pinned in each worker process
+
+        Returns:
+            List[str]: Extracted city names
+        """
+        if self.rule_engine is None:
+            return run_batch(self, "parse", texts, workers, executor, threads_per_worker)
+
+        # Resolve rule matches up front so only the remaining rows reach the workers
+        results, pending = self._apply_rules(texts)
+        outputs = run_batch(self, "parse", [texts[i] for i in pending], workers, executor, threads_per_worker)
+        for index, output in zip(pending, outputs):
+            results[index] = output
+        return results
+
+    def _apply_rules(self, texts: List[str]) -> Tuple[List[Optional[str]], List[int]]:
+        """Run the rule pre-pass; returns partial results and indices left for the model."""
+        results: List[Optional[str]] = [None] * len(texts)
+        pending: List[int] = []
+        matches = self.rule_engine.match_batch(texts) if self.rule_engine is not None else [None] * len(texts)
+        for index, match in enumerate(matches):
+            if match is not None:
+                results[index] = match.place
+            else:
+                pending.append(index)
+        return results, pending
+
+    def parse_coded(self,
+                    texts: List[str],
+                    workers: int = 1,
+                    executor: str = EXECUTOR_THREAD,
+                    threads_per_worker: Optional[int] = None,
+                    vocab: Optional[Vocabulary] = None) -> CodedResults:
+        """
+        Parse multiple texts into compact interned results.
+
+        Each distinct text is parsed once and rows are stored as integer codes
+        into a shared vocabulary; strings are only built when read.
+
+        Args:
+            texts (List[str]): Input texts to parse
+            workers (int): Number of worker threads or processes
+            executor (str): "thread" for remote backends, "process" for CPU-bound local models
+            threads_per_worker (int): Compute threads pinned in each worker process
+            vocab (Vocabulary): Vocabulary to intern results into (uses the shared one if None)
+
+        Returns:
+            CodedResults: City names as codes, convertible with `to_pandas()` / `to_arrow()`
+        """
+        return run_coded(lambda unique: self.parse_batch(unique, workers, executor, threads_per_worker),
+                         texts, vocab)
+
+    def parse_to_store(self,
+                       texts: Iterable[str],
+                       path: str,
+                       chunk_size: int = 65536,
+                       include_text: bool = False,
+                       workers: int = 1,
+                       executor: str = EXECUTOR_THREAD,
+                       threads_per_worker: Optional[int] = None) -> int:
+        """
+        Parse texts chunk by chunk into an Arrow IPC or Parquet results file.
+
+        Memory stays bounded by `chunk_size`; read the output back with `read_results`.
+
+        Args:
+            texts (Iterable[str]): Input texts; may be a generator
+            path (str): Output path (".arrow"/".feather" or ".parquet")
+            chunk_size (int): Rows per record batch / row group
+            include_text (bool): Also store the input text column
+            workers (int): Number of worker threads or processes
+            executor (str): "thread" for remote backends, "process" for CPU-bound local models
+            threads_per_worker (int): Compute threads pinned in each worker process
+
+        Returns:
+            int: Number of rows written
+        """
+        return write_results(self, texts, path, "parse_batch", chunk_size, include_text,
+                             workers, executor, threads_per_worker)
+
+    def create_batcher(self,
+                       max_batch_size: int = 16,
+                       max_wait_ms: float = 10.0,
+                       packed: bool = False,
+                       workers: int = 1) -> MicroBatcher:
+        """
+        Create an aggregator that batches concurrent single-text parse calls.
+
+        Each call waits at most `max_wait_ms` for other callers before its
+        batch is sent to the backend as one batched call: native batch
+        generation for local models, concurrent requests for chat backends
+        (or one packed request with `packed=True`).
+
+        Args:
+            max_batch_size (int): Maximum number of texts per backend call
+            max_wait_ms (float): Maximum added latency per call in milliseconds
+            packed (bool): Pack each batch into one chat request (for chat APIs without batch generation)
+            workers (int): Number of batches that may run concurrently
+
+        Returns:
+            MicroBatcher: Callable batcher; use `batcher(text)` or `batcher.submit(text)`
+        """
+        def parse_many(texts: List[str]) -> List[str]:
+            results, pending = self._apply_rules(texts)
+            remaining = [texts[i] for i in pending]
+            if self.example_selector is not None or self.span_extraction:
+                # Each text gets its own prompt or candidates, so texts cannot share one request
+                workers_per_batch = len(remaining) if self.model.model_class.concurrent_batch else 1
+                outputs = run_batch(self, "_parse_model", remaining, workers_per_batch)
+            else:
+                outputs = self.model.create_instance().run_batch(remaining, packed=packed) if remaining else []
+            for index, output in zip(pending, outputs):
+                results[index] = output
+            return results
+
+        return MicroBatcher(parse_many, max_batch_size, max_wait_ms, workers)
+
+    def canonicalize(self, raw: str, text: str = "") -> ParseResult:
+        """
+        Validate raw model output against the division table.
+
+        Args:
+            raw (str): Raw model output
+            text (str): Input text the output was extracted from
+
+        Returns:
+            ParseResult: Result with canonical division, or no division if the output is not a known place
+        """
+        return ParseResult(text=text, raw=raw, division=self.division_table.canonicalize(raw))
+
+    def parse_validated(self, text: str) -> ParseResult:
+        """
+        Parse text and map the output to a canonical division name and code.
+
+        Args:
+            text (str): Input text to parse
+
+        Returns:
+            ParseResult: Validated extraction result
+        """
+        return self.canonicalize(self.parse(text), text)
+
+    def parse_structured(self, text: str) -> StructuredResult:
+        """
+        Extract province, prefecture and county in a single model call.
+
+        Levels the model leaves out are filled in from the division hierarchy.
+
+        Args:
+            text (str): Input text to parse
+
+        Returns:
+            StructuredResult: Canonical divisions for each administrative level
+        """
+        model_instance = self.model.create_instance(
+            system_prompt=self.STRUCTURED_SYSTEM_PROMPT,
+            json_mode=True
+        )
+        raw = model_instance.run(text)
+        return self._resolve_structured(text, raw)
+
+    def parse_candidates(self, text: str, k: int = 3) -> List[CityCandidate]:
+        """
+        Rank the places of an ambiguous text in a single model call.
+
+        With span extraction the candidates found in the text are scored in
+        one forward pass; otherwise the model lists them as JSON. The rule
+        pre-pass is skipped, as it only yields one place.
+
+        Args:
+            text (str): Input text to parse
+            k (int): Maximum number of candidates
+
+        Returns:
+            List[CityCandidate]: Up to k distinct places, most likely first
+        """
+        if self.span_extraction:
+            spans = find_spans(text, self.division_table)
+            if spans:
+                scores = self._create_instance_for(text).score(text, spans) if len(spans) > 1 else [0.0]
+                # Softmax over the candidates' log-probabilities
+                top = max(scores)
+                weights = [math.exp(score - top) for score in scores]
+                total = sum(weights)
+                ranked = [(span, weight / total) for span, weight in zip(spans, weights)]
+                return self._rank_candidates(ranked, k)
+
+        model_instance = self.model.create_instance(
+            system_prompt=self.CANDIDATES_SYSTEM_PROMPT,
+            json_mode=True
+        )
+        items = self._load_json(model_instance.run(text)).get("candidates")
+        ranked = []
+        for rank, item in enumerate(items if isinstance(items, list) else []):
+            name, score = (item.get("city"), item.get("score")) if isinstance(item, dict) else (item, None)
+            if not isinstance(name, str) or not name.strip():
+                continue
+            if not isinstance(score, (int, float)) or isinstance(score, bool):
+                # Without a confidence fall back to the listed order
+                score = 1 / (rank + 1)
+            ranked.append((name.strip(), min(max(float(score), 0.0), 1.0)))
+        return self._rank_candidates(ranked, k)
+
+    def _rank_candidates(self, ranked: List[Tuple[str, float]], k: int) -> List[CityCandidate]:
+        """Merge candidates naming the same division and keep the k best."""
+        candidates: Dict[str, CityCandidate] = {}
+        for name, score in ranked:
+            division = self.division_table.canonicalize(name)
+            key = division.code if division is not None else name
+            if key not in candidates or score > candidates[key].score:
+                candidates[key] = CityCandidate(name=name, score=score, division=division)
+        return sorted(candidates.values(), key=lambda candidate: -candidate.score)[:k]
+
+    def _resolve_structured(self, text: str, raw: str) -> StructuredResult:
+        """Map a JSON model answer onto the division hierarchy."""
+        table = self.division_table
+        fields = self._load_json(raw)
+
+        # Resolve top-down so duplicate names (e.g. 朝阳区) use the parent as context
+        levels: Dict[str, Division] = {}
+        parent = None
+        for key in ("province", "city", "county"):
+            value = fields.get(key)
+            if not isinstance(value, str) or not value.strip():
+                continue
+            division = table.canonicalize(value, parent)
+            if division is not None:
+                # Slot by the actual level in case the model put a name in the wrong key
+                levels.setdefault(division.level, division)
+                parent = division
+
+        county = levels.get(LEVEL_COUNTY)
+        city = levels.get(LEVEL_PREFECTURE)
+        province = levels.get(LEVEL_PROVINCE)
+
+        if city is None and county is not None:
+            city = table.parent(county)
+        if province is None and (city or county) is not None:
+            province = table.province(city or county)
+        # Municipalities act as their own prefecture; directly administered
+        # counties (e.g. 神农架林区) have no prefecture at all
+        if city is None and province is not None and province.is_municipality:
+            city = province
+        if city is not None and city.level == LEVEL_PROVINCE and not city.is_municipality:
+            city = None
+
+        return StructuredResult(text=text, raw=raw, province=province, city=city, county=county)
+
+    @staticmethod
+    def _load_json(raw: str) -> Dict[str, Any]:
+        """Extract the first JSON object from model output."""
+        match = _JSON_OBJECT_RE.search(strip_reasoning(raw))
+        if not match:
+            return {}
+        try:
+            data = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
     def create_model(self):
         """
         Create and return a model instance for advanced usage.
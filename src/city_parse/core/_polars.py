@@ -0,0 +1,167 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _polars.py
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
+
+from ._parallel import EXECUTOR_THREAD
+from ._vocab import Vocabulary, compact_codes
+
+
+def _require_polars():
+    """Import polars lazily so it stays an optional dependency."""
+    try:
+        import polars as pl
+    except ImportError as e:
+        raise ImportError("Polars integration requires the polars package: pip install polars") from e
+    return pl
+
+
+class StreamingExtractor:
+    """Batch UDF for Polars queries with a result cache shared across batches"""
+
+    def __init__(self,
+                 engine: Any,
+                 method: str = "parse_batch",
+                 workers: int = 1,
+                 executor: str = EXECUTOR_THREAD,
+                 cache_size: Optional[int] = 100000,
+                 vocab: Optional[Vocabulary] = None):
+        """
+        Initialize the extractor.
+
+        Args:
+            engine (Any): Parse or Classify instance
+            method (str): Batch method of the engine, e.g. "parse_batch" or "classify_batch"
+            workers (int): Number of concurrent backend calls per batch
+            executor (str): "thread" for remote backends, "process" for CPU-bound local models
+            cache_size (int): Maximum number of cached results (None for unbounded)
+            vocab (Vocabulary): Vocabulary interning cached results (a private one, compacted as
+                entries are evicted, if None)
+        """
+        self.engine = engine
+        self.method = method
+        self.workers = workers
+        self.executor = executor
+        self.cache_size = cache_size
+        self._owns_vocab = vocab is None
+        self.vocab = vocab if vocab is not None else Vocabulary()
+        # Cached results are stored as vocabulary codes
+        self._cache: "OrderedDict[str, int]" = OrderedDict()
+        # Polars may evaluate several batches of a streaming query in parallel
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, texts: List[str]) -> Dict[str, Any]:
+        """Resolve distinct texts from the cache, running the model on the rest."""
+        found: Dict[str, Any] = {}
+        missing: List[str] = []
+        with self._lock:
+            for text in texts:
+                if text in self._cache:
+                    self._cache.move_to_end(text)
+                    found[text] = self.vocab.value(self._cache[text])
+                else:
+                    missing.append(text)
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        if missing:
+            func = getattr(self.engine, self.method)
+            results = func(missing, workers=self.workers, executor=self.executor)
+            found.update(zip(missing, results))
+            with self._lock:
+                for text, code in zip(missing, self.vocab.encode(results).tolist()):
+                    self._cache[text] = code
+                    self._cache.move_to_end(text)
+                if self.cache_size is not None:
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+                    if self._owns_vocab and len(self.vocab) > 2 * self.cache_size:
+                        self.vocab = compact_codes(self._cache, self.vocab)
+        return found
+
+    def __call__(self, series: Any) -> Any:
+        """
+        Process one batch of a column.
+
+        Args:
+            series (polars.Series): String column batch
+
+        Returns:
+            polars.Series: Results aligned with the batch, null where the input is null
+        """
+        pl = _require_polars()
+        uniques = series.drop_nulls().unique().to_list()
+        mapping = self._lookup(uniques)
+        return series.replace_strict(
+            list(mapping.keys()), list(mapping.values()), default=None, return_dtype=pl.String
+        ).alias(series.name)
+
+    def expr(self, column: Union[str, Any]) -> Any:
+        """
+        Build a Polars expression applying this extractor to a column.
+
+        Args:
+            column (Union[str, polars.Expr]): Column name or expression
+
+        Returns:
+            polars.Expr: Element-wise expression usable in lazy and streaming queries
+        """
+        pl = _require_polars()
+        if isinstance(column, str):
+            column = pl.col(column)
+        return column.map_batches(self, return_dtype=pl.String, is_elementwise=True)
+
+
+def parse_expr(column: Union[str, Any],
+               parser: Any,
+               workers: int = 1,
+               executor: str = EXECUTOR_THREAD,
+               cache_size: Optional[int] = 100000) -> Any:
+    """
+    Polars expression extracting city names from a string column.
+
+    Example:
+        lf.with_columns(parse_expr("title", parser).alias("city")).sink_parquet("out.parquet")
+
+    Args:
+        column (Union[str, polars.Expr]): Column name or expression
+        parser (Parse): Parse instance
+        workers (int): Number of concurrent backend calls per batch
+        executor (str): "thread" for remote backends, "process" for CPU-bound local models
+        cache_size (int): Maximum number of results cached across batches
+
+    Returns:
+        polars.Expr: Expression producing the extracted city names
+    """
+    return StreamingExtractor(parser, "parse_batch", workers, executor, cache_size).expr(column)
+
+
+def classify_expr(column: Union[str, Any],
+                  classifier: Any,
+                  workers: int = 1,
+                  executor: str = EXECUTOR_THREAD,
+                  cache_size: Optional[int] = 100000) -> Any:
+    """
+    Polars expression classifying a string column.
+
+    Args:
+        column (Union[str, polars.Expr]): Column name or expression
+        classifier (Classify): Classify instance
+        workers (int): Number of concurrent backend calls per batch
+        executor (str): "thread" for remote backends, "process" for CPU-bound local models
+        cache_size (int): Maximum number of results cached across batches
+
+    Returns:
+        polars.Expr: Expression producing the category names
+    """
+    return StreamingExtractor(classifier, "classify_batch", workers, executor, cache_size).expr(column)
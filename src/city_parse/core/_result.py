@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _result.py
+
+from dataclasses import dataclass
+from typing import Optional
+
+from ._division import Division
+
+
+@dataclass(slots=True)
+class ParseResult:
+    """Validated result of a city extraction"""
+    text: str
+    raw: str
+    division: Optional[Division] = None
+
+    @property
+    def valid(self) -> bool:
+        """Whether the model output maps to a known administrative division"""
+        return self.division is not None
+
+    @property
+    def name(self) -> Optional[str]:
+        """Canonical division name"""
+        return self.division.name if self.division is not None else None
+
+    @property
+    def code(self) -> Optional[str]:
+        """GB/T 2260 division code"""
+        return self.division.code if self.division is not None else None
+
+    @property
+    def level(self) -> Optional[str]:
+        """Administrative level ('province', 'prefecture' or 'county')"""
+        return self.division.level if self.division is not None else None
+
+
+@dataclass(slots=True)
+class StructuredResult:
+    """Province / prefecture / county extraction result"""
+    text: str
+    raw: str
+    province: Optional[Division] = None
+    city: Optional[Division] = None
+    county: Optional[Division] = None
+
+    @property
+    def valid(self) -> bool:
+        """Whether any level maps to a known administrative division"""
+        return self.province is not None or self.city is not None or self.county is not None
+
+    @property
+    def finest(self) -> Optional[Division]:
+        """Lowest administrative level that was resolved"""
+        return self.county or self.city or self.province
+
+
+@dataclass(slots=True)
+class CityCandidate:
+    """One ranked place of an ambiguous text"""
+    name: str
+    # Confidence between 0 and 1, higher is more likely
+    score: float
+    division: Optional[Division] = None
+
+
+@dataclass(slots=True)
+class WarmupReport:
+    """Timings of a model warm-up"""
+    model_id: str
+    # Loading the weights (or the model on the Ollama server)
+    load_ms: float
+    # First generation with the real system prompt, filling the prefix cache
+    first_ms: float
+    # Following generation, the latency to expect once warm
+    warm_ms: float
+    output: str = ""
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _rules.py
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from ._division import DivisionTable
+
+# Name of the group every rule pattern must define
+PLACE_GROUP = "place"
+# Optional group for a lower unit, preferred when `place` is a province (山西省 + 临沂市)
+SUB_GROUP = "sub"
+_PROVINCE_SUFFIXES = ("省", "自治区")
+
+# Zones and parks named like districts but not administrative divisions
+# (开发区, 苏州工业园区); matched units ending with these are left to the model
+NON_PLACE_SUFFIXES = (
+    "开发区", "高新区", "示范区", "工业园区", "产业园区", "科技园区",
+    "自贸区", "试验区", "保税区", "景区", "校区", "片区",
+)
+# One-character suffixes that need a stem of at least two characters:
+# 社区 / 园区 are no places and 苏州 is only short for 苏州市
+_SHORT_STEM_SUFFIXES = ("州", "区")
+
+# Suffixes that never end the stem of a unit: 深圳市 + 市场监督管理局 or
+# 龙州县 + 县委 stop at the first unit. 州 is left out, as in 杭州市 or 龙州县
+_STEM_SUFFIXES = "省市盟县区旗"
+
+# Leading administrative unit, e.g. 商丘市 / 内蒙古自治区 / 龙州县. A 州 may not
+# continue with another suffix (龙州 + 县), and titles starting with 中共, common
+# verbs, quantifiers or 城市 are never treated as places.
+_UNIT = (
+    r"(?!中共|关于|印发|转发|全|本|各|我|城市)"
+    rf"[一-龥]{{1,9}}?(?<![{_STEM_SUFFIXES}])"
+    r"(?:自治区|自治州|自治县|自治旗|特别行政区|省|市|州(?![省市州盟县区旗])|盟|县|区|旗)"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Rule:
+    """A title template; the pattern captures the issuing authority's place as `place` (and optionally `sub`)"""
+    id: str
+    pattern: str
+
+
+@dataclass(frozen=True, slots=True)
+class RuleMatch:
+    """Place extracted by a rule"""
+    rule_id: str
+    place: str
+    span: Tuple[int, int]
+
+
+# Up to three nested units, e.g. 浙江省 + 绍兴市 + 上虞区
+_AUTHORITY = rf"(?P<place>{_UNIT})(?P<sub>{_UNIT})?(?:{_UNIT})?"
+
+# Common issuing-authority templates of government document titles, in priority order
+DEFAULT_RULES: Tuple[Rule, ...] = (
+    Rule("party_committee", rf"中共{_AUTHORITY}委"),
+    Rule("government", rf"{_AUTHORITY}人民政府"),
+    Rule("congress", rf"{_AUTHORITY}人大常委会"),
+    Rule("department", rf"{_AUTHORITY}[一-龥]{{1,12}}?(?:厅|局|委员会|办公室)"),
+)
+
+
+def _is_place(unit: str) -> bool:
+    """Check that a matched unit is not a zone, park or bare one-character-stem word."""
+    if unit.endswith(NON_PLACE_SUFFIXES):
+        return False
+    return not (len(unit) < 3 and unit.endswith(_SHORT_STEM_SUFFIXES))
+
+
+def _has_stem_suffix(unit: str) -> bool:
+    """Check whether a unit has an administrative suffix inside its stem, e.g. 开平市区."""
+    return any(char in _STEM_SUFFIXES for char in unit[:-1])
+
+
+class RuleEngine:
+    """Ordered title templates compiled into one anchored alternation"""
+
+    def __init__(self, rules: Sequence[Rule] = DEFAULT_RULES, division_table: Optional[DivisionTable] = None):
+        """
+        Compile the rules.
+
+        Args:
+            rules (Sequence[Rule]): Rules in priority order; each pattern is matched at the start of the text
+                and must define a `place` group
+            division_table (DivisionTable): If given, places with a suffix inside their stem that the table
+                does not know are left to the model
+        """
+        self.rules: List[Rule] = list(rules)
+        self.division_table = division_table
+        if not self.rules:
+            raise ValueError("At least one rule must be provided")
+
+        alternatives = []
+        for index, rule in enumerate(self.rules):
+            if f"(?P<{PLACE_GROUP}>" not in rule.pattern:
+                raise ValueError(f"Rule '{rule.id}' has no (?P<{PLACE_GROUP}>...) group")
+            # Group names must be unique across the alternation
+            pattern = (rule.pattern
+                       .replace(f"(?P<{PLACE_GROUP}>", f"(?P<p{index}>")
+                       .replace(f"(?P<{SUB_GROUP}>", f"(?P<s{index}>"))
+            alternatives.append(f"(?P<r{index}>{pattern})")
+        self._regex = re.compile("|".join(alternatives))
+
+    def match(self, text: str) -> Optional[RuleMatch]:
+        """
+        Extract the issuing authority's place in one scan.
+
+        Args:
+            text (str): Input text
+
+        Returns:
+            Optional[RuleMatch]: First matching rule in priority order, or None
+        """
+        match = self._regex.match(text.strip())
+        if match is None:
+            return None
+        # The outer group of the matching rule closes last
+        index = int(match.lastgroup[1:])
+        group = f"p{index}"
+        sub = f"s{index}"
+        if (sub in self._regex.groupindex and match.group(sub)
+                and match.group(group).endswith(_PROVINCE_SUFFIXES) and _is_place(match.group(sub))):
+            group = sub
+        place = match.group(group)
+        if not _is_place(place):
+            return None
+        if (self.division_table is not None and _has_stem_suffix(place)
+                and self.division_table.canonicalize(place) is None):
+            return None
+        return RuleMatch(rule_id=self.rules[index].id, place=place, span=match.span(group))
+
+    def match_batch(self, texts: Sequence[str]) -> List[Optional[RuleMatch]]:
+        """
+        Apply the rules to many texts.
+
+        Args:
+            texts (Sequence[str]): Input texts
+
+        Returns:
+            List[Optional[RuleMatch]]: One match (or None) per text
+        """
+        return [self.match(text) for text in texts]
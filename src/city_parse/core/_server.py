@@ -0,0 +1,347 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _server.py
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+
+from ._batching import MicroBatcher
+from ._classify import Classify
+from ._division import clean_output
+from ._parse import Parse
+from ._vocab import Vocabulary, compact_codes
+
+# Largest accepted request body in bytes
+MAX_BODY_SIZE = 4 * 1024 * 1024
+
+_JSON_TYPE = "application/json; charset=utf-8"
+_METRICS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class HTTPError(Exception):
+    """Error answered with a JSON body and an HTTP status"""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ResultCache:
+    """Least-recently-used cache of model results, used from the event loop thread"""
+
+    def __init__(self, max_size: int = 10000, vocab: Optional[Vocabulary] = None):
+        self.max_size = max_size
+        # A private vocabulary is compacted as entries are evicted; a given one is left alone
+        self._owns_vocab = vocab is None
+        self.vocab = vocab if vocab is not None else Vocabulary()
+        # Results are stored as vocabulary codes and materialized on lookup
+        self._data: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[str]:
+        """Return a cached result and mark it as recently used, or None."""
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self.vocab.value(self._data[key])
+        self.misses += 1
+        return None
+
+    def put(self, key: Tuple[str, str], value: str) -> None:
+        """Store a result, evicting the least recently used entries."""
+        if self.max_size <= 0:
+            return
+        self._data[key] = self.vocab.code(value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+        if self._owns_vocab and len(self.vocab) > 2 * self.max_size:
+            self.vocab = compact_codes(self._data, self.vocab)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class InferenceServer:
+    """Asynchronous HTTP/JSON server sharing one warm Parse/Classify engine across clients"""
+
+    def __init__(self,
+                 parser: Optional[Parse] = None,
+                 classifier: Optional[Classify] = None,
+                 max_queue: int = 1024,
+                 cache_size: int = 10000,
+                 max_batch_size: int = 16,
+                 max_wait_ms: float = 10.0,
+                 workers: int = 4,
+                 packed: bool = False):
+        """
+        Initialize the server.
+
+        Args:
+            parser (Parse): Engine behind `POST /parse`
+            classifier (Classify): Engine behind `POST /classify`
+            max_queue (int): Maximum number of texts waiting for the model before answering 429
+            cache_size (int): Number of results kept in the LRU cache (0 disables caching)
+            max_batch_size (int): Maximum number of texts per backend call
+            max_wait_ms (float): Maximum time a text waits for other texts to fill a batch
+            workers (int): Number of backend calls that may run concurrently
+            packed (bool): Pack parse batches into one chat request
+        """
+        if parser is None and classifier is None:
+            raise ValueError("At least one of parser or classifier must be provided")
+        self.parser = parser
+        self.classifier = classifier
+        self.max_queue = max_queue
+        self.cache = ResultCache(cache_size)
+
+        self._batchers: Dict[str, MicroBatcher] = {}
+        if parser is not None:
+            self._batchers["parse"] = parser.create_batcher(max_batch_size, max_wait_ms, packed, workers)
+        if classifier is not None:
+            self._batchers["classify"] = MicroBatcher(
+                self._classify_each, max_batch_size, max_wait_ms, workers
+            )
+
+        self.pending = 0
+        self.requests: Dict[Tuple[str, int], int] = {}
+        self.items = 0
+        self.rejected = 0
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    def _classify_each(self, texts: List[str]) -> List[Any]:
+        """Classify a batch, returning the error of a text that fails instead of failing the whole batch."""
+        results: List[Any] = []
+        for text in texts:
+            try:
+                results.append(self.classifier.classify(text))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    async def infer(self, endpoint: str, texts: List[str]) -> List[Any]:
+        """
+        Run texts through the shared engine, serving repeated texts from the cache.
+
+        Args:
+            endpoint (str): "parse" or "classify"
+            texts (List[str]): Input texts
+
+        Returns:
+            List[Any]: Results in input order; a text whose inference failed holds its exception
+        """
+        batcher = self._batchers.get(endpoint)
+        if batcher is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Endpoint not enabled: /{endpoint}")
+
+        results: List[Any] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        for index, text in enumerate(texts):
+            cached = self.cache.get((endpoint, text))
+            if cached is not None:
+                results[index] = cached
+            else:
+                missing.setdefault(text, []).append(index)
+
+        if len(missing) > self.max_queue:
+            # Would be rejected even by an idle server, so retrying cannot help
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                            f"Batch of {len(missing)} new texts exceeds the queue size {self.max_queue}, split it")
+        if self.pending + len(missing) > self.max_queue:
+            self.rejected += 1
+            raise HTTPError(HTTPStatus.TOO_MANY_REQUESTS, "Inference queue is full, retry later")
+
+        self.items += len(missing)
+        self.pending += len(missing)
+        try:
+            futures = {text: asyncio.wrap_future(batcher.submit(text)) for text in missing}
+            values = await asyncio.gather(*futures.values(), return_exceptions=True)
+        finally:
+            self.pending -= len(missing)
+
+        for text, value in zip(futures, values):
+            # Backend failures (API调用失败 / 未能提取到城市名称) are retried on the next request
+            if not isinstance(value, BaseException) and clean_output(value):
+                self.cache.put((endpoint, text), value)
+            for index in missing[text]:
+                results[index] = value
+        return results
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[HTTPStatus, Any, str]:
+        """Dispatch one request; returns status, payload and content type."""
+        if path == "/metrics" and method == "GET":
+            return HTTPStatus.OK, self.metrics(), _METRICS_TYPE
+        if path == "/health" and method == "GET":
+            return HTTPStatus.OK, {"status": "ok", "endpoints": sorted(self._batchers)}, _JSON_TYPE
+        if path not in ("/parse", "/classify"):
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown path: {path}")
+        if method != "POST":
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST with a JSON body")
+
+        try:
+            payload = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+
+        endpoint = path[1:]
+        if isinstance(payload.get("texts"), list):
+            texts = payload["texts"]
+            if not all(isinstance(text, str) and text.strip() for text in texts):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "'texts' must be a list of non-empty strings")
+            results = await self.infer(endpoint, texts)
+            # A failed text is reported in `errors` without losing the other results
+            errors = [{"index": index, "error": str(result)}
+                      for index, result in enumerate(results) if isinstance(result, BaseException)]
+            response: Dict[str, Any] = {
+                "results": [None if isinstance(result, BaseException) else result for result in results]
+            }
+            if errors:
+                response["errors"] = errors
+            return HTTPStatus.OK, response, _JSON_TYPE
+        text = payload.get("text")
+        if not isinstance(text, str) or not text.strip():
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Provide 'text' or 'texts'")
+        result = (await self.infer(endpoint, [text]))[0]
+        if isinstance(result, BaseException):
+            raise result
+        return HTTPStatus.OK, {"result": result}, _JSON_TYPE
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP/1.1 requests on one connection until it is closed."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                started = time.perf_counter()
+                path = target.split("?", 1)[0]
+                length = -1
+                try:
+                    value = headers.get("content-length") or "0"
+                    if not (value.isascii() and value.isdigit()):
+                        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length header")
+                    length = int(value)
+                    if length > MAX_BODY_SIZE:
+                        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload, content_type = await self._route(method, path, body)
+                except HTTPError as e:
+                    status, payload, content_type = e.status, {"error": e.message}, _JSON_TYPE
+                except Exception as e:
+                    status, payload, content_type = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}, _JSON_TYPE
+
+                key = (path, int(status))
+                self.requests[key] = self.requests.get(key, 0) + 1
+                self.latency_sum += time.perf_counter() - started
+                self.latency_count += 1
+
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version.upper() == "HTTP/1.1"
+                              and 0 <= length <= MAX_BODY_SIZE)
+                data = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+                data = data.encode("utf-8")
+                head = [
+                    f"HTTP/1.1 {int(status)} {status.phrase}",
+                    f"Content-Type: {content_type}",
+                    f"Content-Length: {len(data)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ]
+                if status == HTTPStatus.TOO_MANY_REQUESTS:
+                    head.append("Retry-After: 1")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def metrics(self) -> str:
+        """
+        Render counters in the Prometheus text exposition format.
+
+        Returns:
+            str: Metrics text
+        """
+        lines = ["# TYPE city_parse_requests_total counter"]
+        for (path, status), count in sorted(self.requests.items()):
+            lines.append(f'city_parse_requests_total{{path="{path}",status="{status}"}} {count}')
+        lines += [
+            "# TYPE city_parse_items_total counter",
+            f"city_parse_items_total {self.items}",
+            "# TYPE city_parse_rejected_total counter",
+            f"city_parse_rejected_total {self.rejected}",
+            "# TYPE city_parse_cache_hits_total counter",
+            f"city_parse_cache_hits_total {self.cache.hits}",
+            "# TYPE city_parse_cache_misses_total counter",
+            f"city_parse_cache_misses_total {self.cache.misses}",
+            "# TYPE city_parse_cache_size gauge",
+            f"city_parse_cache_size {len(self.cache)}",
+            "# TYPE city_parse_queue_depth gauge",
+            f"city_parse_queue_depth {self.pending}",
+            "# TYPE city_parse_batches_total counter",
+        ]
+        for endpoint, batcher in sorted(self._batchers.items()):
+            lines.append(f'city_parse_batches_total{{endpoint="{endpoint}"}} {batcher.batches}')
+        lines += [
+            "# TYPE city_parse_request_seconds summary",
+            f"city_parse_request_seconds_sum {self.latency_sum:.6f}",
+            f"city_parse_request_seconds_count {self.latency_count}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000) -> asyncio.base_events.Server:
+        """
+        Start listening without blocking.
+
+        Args:
+            host (str): Interface to bind
+            port (int): Port to bind (0 picks a free port)
+
+        Returns:
+            asyncio.base_events.Server: The listening server
+        """
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8000) -> None:
+        """Start the server and serve until cancelled."""
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self) -> None:
+        """Stop listening and shut down the batchers."""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for batcher in self._batchers.values():
+            batcher.close()
@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _spans.py
+
+from typing import List, Optional
+
+from ._division import ADMIN_SUFFIXES, DivisionTable
+
+
+def find_spans(text: str,
+               division_table: Optional[DivisionTable] = None,
+               max_candidates: int = 8) -> List[str]:
+    """
+    List the place names appearing verbatim in a text.
+
+    The text is scanned left to right taking the longest known name at each
+    position, so "上海市徐汇区" yields "上海市" and "徐汇区". Short names
+    ("六盘水") are kept only when no administrative suffix follows them.
+
+    Args:
+        text (str): Input text
+        division_table (DivisionTable): Gazetteer to match against (uses bundled table if None)
+        max_candidates (int): Maximum number of distinct spans, in order of first appearance
+
+    Returns:
+        List[str]: Distinct substrings of the text that are known division names
+    """
+    table = division_table if division_table is not None else DivisionTable.default()
+    spans: List[str] = []
+    start = 0
+    while start < len(text) - 1 and len(spans) < max_candidates:
+        end = min(len(text), start + table.max_name_length)
+        while end - start >= 2 and text[start:end] not in table:
+            end -= 1
+        span = text[start:end]
+        if end - start < 2 or (not span.endswith(ADMIN_SUFFIXES) and text.startswith(ADMIN_SUFFIXES, end)):
+            start += 1
+            continue
+        if span not in spans:
+            spans.append(span)
+        start = end
+    return spans
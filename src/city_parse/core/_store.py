@@ -0,0 +1,188 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _store.py
+
+import itertools
+import os
+from typing import Any, Iterable, List, Optional
+
+import pandas as pd
+
+from ._parallel import EXECUTOR_THREAD
+from ._vectorized import map_unique
+from ._vocab import Vocabulary
+
+FORMAT_IPC = "ipc"
+FORMAT_PARQUET = "parquet"
+
+
+def _require_pyarrow():
+    """Import pyarrow lazily so it stays an optional dependency."""
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("The results store requires the pyarrow package: pip install pyarrow") from e
+    return pa
+
+
+def _infer_format(path: str) -> str:
+    """Pick the file format from the file extension."""
+    return FORMAT_PARQUET if str(path).endswith((".parquet", ".pq")) else FORMAT_IPC
+
+
+class ResultWriter:
+    """Append-only columnar writer with dictionary-encoded result values"""
+
+    def __init__(self,
+                 path: str,
+                 format: Optional[str] = None,
+                 include_text: bool = False):
+        """
+        Open a results file for writing.
+
+        Args:
+            path (str): Output path; ".parquet" selects Parquet, anything else Arrow IPC (Feather v2)
+            format (str): "ipc" or "parquet", overriding the extension
+            include_text (bool): Also store the input text column
+        """
+        pa = _require_pyarrow()
+        self.path = os.fspath(path)
+        self.format = format or _infer_format(self.path)
+        if self.format not in (FORMAT_IPC, FORMAT_PARQUET):
+            raise ValueError(f"Unknown results format: {self.format}")
+        self.include_text = include_text
+
+        fields = [("row", pa.int64())]
+        if include_text:
+            fields.append(("text", pa.large_string()))
+        fields.append(("result", pa.dictionary(pa.int32(), pa.string())))
+        self.schema = pa.schema(fields)
+
+        # Values only ever get appended, so IPC batches can ship dictionary deltas
+        self._vocab = Vocabulary()
+        self.rows = 0
+
+        if self.format == FORMAT_IPC:
+            options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            self._writer = pa.ipc.new_file(self.path, self.schema, options=options)
+        else:
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(self.path, self.schema, use_dictionary=["result"])
+
+    def _encode(self, results: List[Any]) -> Any:
+        """Map result strings to codes in the file's dictionary."""
+        pa = _require_pyarrow()
+        codes = self._vocab.encode(results)
+        return pa.DictionaryArray.from_arrays(
+            pa.array(codes, mask=codes < 0), pa.array(self._vocab.to_list(), type=pa.string())
+        )
+
+    def write_batch(self, texts: List[str], results: List[Any]) -> None:
+        """
+        Append one batch of results; each call becomes one record batch or row group.
+
+        Args:
+            texts (List[str]): Input texts of the batch
+            results (List[Any]): Results aligned with `texts`
+        """
+        if len(texts) != len(results):
+            raise ValueError("texts and results must have the same length")
+        if not texts:
+            return
+        pa = _require_pyarrow()
+        columns = [pa.array(range(self.rows, self.rows + len(texts)), type=pa.int64())]
+        if self.include_text:
+            columns.append(pa.array(texts, type=pa.large_string()))
+        columns.append(self._encode(results))
+        batch = pa.record_batch(columns, schema=self.schema)
+        if self.format == FORMAT_IPC:
+            self._writer.write_batch(batch)
+        else:
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        self.rows += len(texts)
+
+    def close(self) -> None:
+        """Finish the file."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def write_results(engine: Any,
+                  texts: Iterable[str],
+                  path: str,
+                  method: str = "parse_batch",
+                  chunk_size: int = 65536,
+                  include_text: bool = False,
+                  workers: int = 1,
+                  executor: str = EXECUTOR_THREAD,
+                  threads_per_worker: Optional[int] = None) -> int:
+    """
+    Stream texts through an engine into a columnar results file.
+
+    Only one chunk of texts and results is held in memory at a time, and
+    each distinct text within a chunk reaches the model once.
+
+    Args:
+        engine (Any): Parse or Classify instance
+        texts (Iterable[str]): Input texts; may be a generator
+        path (str): Output path (".arrow"/".feather" or ".parquet")
+        method (str): Batch method of the engine
+        chunk_size (int): Rows per record batch / row group
+        include_text (bool): Also store the input text column
+        workers (int): Number of worker threads or processes
+        executor (str): "thread" for remote backends, "process" for CPU-bound local models
+        threads_per_worker (int): Compute threads pinned in each worker process
+
+    Returns:
+        int: Number of rows written
+    """
+    func = getattr(engine, method)
+
+    def batch_func(unique_texts: List[str]) -> List[Any]:
+        return func(unique_texts, workers=workers, executor=executor, threads_per_worker=threads_per_worker)
+
+    iterator = iter(texts)
+    with ResultWriter(path, include_text=include_text) as writer:
+        while True:
+            chunk = list(itertools.islice(iterator, chunk_size))
+            if not chunk:
+                break
+            codes, uniques = pd.factorize(pd.Series(chunk, dtype=object))
+            results = map_unique(codes, [str(value) for value in uniques], batch_func)
+            writer.write_batch(chunk, list(results))
+        return writer.rows
+
+
+def read_results(path: str, memory_map: bool = True) -> Any:
+    """
+    Open a results file written by `ResultWriter`.
+
+    Arrow IPC files are memory-mapped, so the returned table references the
+    file pages directly instead of copying them into process memory.
+
+    Args:
+        path (str): Results file path
+        memory_map (bool): Memory-map the file instead of reading it into memory
+
+    Returns:
+        pyarrow.Table: Table with "row", optional "text" and dictionary-encoded "result" columns
+    """
+    pa = _require_pyarrow()
+    path = os.fspath(path)
+    if _infer_format(path) == FORMAT_PARQUET:
+        import pyarrow.parquet as pq
+        return pq.read_table(path, memory_map=memory_map, read_dictionary=["result"])
+    source = pa.memory_map(path, "r") if memory_map else pa.OSFile(path, "rb")
+    return pa.ipc.open_file(source).read_all()
@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _vectorized.py
+
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ._parallel import EXECUTOR_THREAD
+
+BatchFunc = Callable[[List[str]], List[Any]]
+
+
+def _batch_method(engine: Any,
+                  method: str,
+                  workers: int,
+                  executor: str,
+                  threads_per_worker: Optional[int]) -> BatchFunc:
+    """Bind the batch method of a Parse/Classify engine."""
+    func = getattr(engine, method)
+    return lambda texts: func(texts, workers=workers, executor=executor, threads_per_worker=threads_per_worker)
+
+
+def map_unique(codes: np.ndarray, uniques: List[str], batch_func: BatchFunc) -> np.ndarray:
+    """
+    Run a batch function over unique values and scatter results back to rows.
+
+    Args:
+        codes (np.ndarray): Index of each row into `uniques`, negative for missing rows
+        uniques (List[str]): Distinct input values
+        batch_func (BatchFunc): Function mapping a list of texts to results in order
+
+    Returns:
+        np.ndarray: Object array with one result per row, None for missing rows
+    """
+    values = np.empty(len(uniques) + 1, dtype=object)
+    values[:-1] = batch_func(list(uniques)) if len(uniques) else []
+    values[-1] = None
+    # Negative codes point at the trailing None slot
+    return values.take(np.where(codes < 0, len(uniques), codes))
+
+
+@pd.api.extensions.register_series_accessor("city_parse")
+class CityParseAccessor:
+    """Vectorized extraction over a pandas Series, available as `series.city_parse`"""
+
+    def __init__(self, series: pd.Series):
+        self._series = series
+
+    def apply(self, batch_func: BatchFunc) -> pd.Series:
+        """
+        Run a batch function once per distinct value of the column.
+
+        Args:
+            batch_func (BatchFunc): Function mapping a list of texts to results in order
+
+        Returns:
+            pd.Series: Results aligned with the original index; missing values stay missing
+        """
+        codes, uniques = pd.factorize(self._series)
+        values = map_unique(codes, [str(value) for value in uniques], batch_func)
+        return pd.Series(values, index=self._series.index, name=self._series.name)
+
+    def parse(self,
+              parser: Any,
+              workers: int = 1,
+              executor: str = EXECUTOR_THREAD,
+              threads_per_worker: Optional[int] = None) -> pd.Series:
+        """
+        Extract city names from each row, calling the model once per distinct value.
+
+        Args:
+            parser (Parse): Parse instance
+            workers (int): Number of worker threads or processes
+            executor (str): "thread" for remote backends, "process" for CPU-bound local models
+            threads_per_worker (int): Compute threads pinned in each worker process
+
+        Returns:
+            pd.Series: Extracted city names
+        """
+        return self.apply(_batch_method(parser, "parse_batch", workers, executor, threads_per_worker))
+
+    def classify(self,
+                 classifier: Any,
+                 workers: int = 1,
+                 executor: str = EXECUTOR_THREAD,
+                 threads_per_worker: Optional[int] = None) -> pd.Series:
+        """
+        Classify each row, calling the model once per distinct value.
+
+        Args:
+            classifier (Classify): Classify instance
+            workers (int): Number of worker threads or processes
+            executor (str): "thread" for remote backends, "process" for CPU-bound local models
+            threads_per_worker (int): Compute threads pinned in each worker process
+
+        Returns:
+            pd.Series: Category names
+        """
+        return self.apply(_batch_method(classifier, "classify_batch", workers, executor, threads_per_worker))
+
+
+def parse_arrow(array: Any,
+                parser: Any,
+                workers: int = 1,
+                executor: str = EXECUTOR_THREAD,
+                threads_per_worker: Optional[int] = None) -> Any:
+    """
+    Extract city names from a pyarrow string array, in the style of `pyarrow.compute`.
+
+    The array is dictionary-encoded so each distinct value reaches the model once.
+
+    Args:
+        array (pyarrow.Array | pyarrow.ChunkedArray): Input strings
+        parser (Parse): Parse instance (or any engine with `parse_batch`)
+        workers (int): Number of worker threads or processes
+        executor (str): "thread" for remote backends, "process" for CPU-bound local models
+        threads_per_worker (int): Compute threads pinned in each worker process
+
+    Returns:
+        pyarrow.Array: Extracted city names, null where the input is null
+    """
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("parse_arrow requires the pyarrow package: pip install pyarrow") from e
+
+    batch_func = _batch_method(parser, "parse_batch", workers, executor, threads_per_worker)
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    encoded = array.dictionary_encode()
+    dictionary = pa.array(batch_func(encoded.dictionary.to_pylist()), type=pa.string())
+    return dictionary.take(encoded.indices)
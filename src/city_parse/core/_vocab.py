@@ -0,0 +1,240 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _vocab.py
+
+import threading
+from array import array
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+# Code of a missing value
+MISSING = -1
+
+# array typecode matching np.intc, four bytes per code
+_TYPECODE = "i"
+
+
+class Vocabulary:
+    """Append-only interned vocabulary mapping output strings to small integer codes"""
+    __slots__ = ("_codes", "_values", "_lock")
+
+    def __init__(self, values: Iterable[str] = ()):
+        self._codes: Dict[str, int] = {}
+        self._values: List[str] = []
+        self._lock = threading.Lock()
+        for value in values:
+            self.code(value)
+
+    def code(self, value: Optional[str]) -> int:
+        """
+        Get the code of a value, interning it if it is new.
+
+        Args:
+            value (str): Output string (None maps to MISSING)
+
+        Returns:
+            int: Code of the value
+        """
+        if value is None:
+            return MISSING
+        code = self._codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(value)
+                if code is None:
+                    code = self._codes[value] = len(self._values)
+                    self._values.append(value)
+        return code
+
+    def value(self, code: int) -> Optional[str]:
+        """Materialize the string of a code (None for MISSING)."""
+        return None if code < 0 else self._values[code]
+
+    def encode(self, values: Sequence[Optional[str]]) -> np.ndarray:
+        """
+        Encode many values, interning each distinct value once.
+
+        Args:
+            values (Sequence[Optional[str]]): Output strings, None for missing
+
+        Returns:
+            np.ndarray: np.intc codes, MISSING for missing values
+        """
+        local_codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+        if not len(uniques):
+            return np.full(len(local_codes), MISSING, dtype=np.intc)
+        mapping = np.fromiter((self.code(str(value)) for value in uniques), dtype=np.intc, count=len(uniques))
+        return np.where(local_codes < 0, MISSING, mapping.take(np.maximum(local_codes, 0))).astype(np.intc)
+
+    def decode(self, codes: Iterable[int]) -> List[Optional[str]]:
+        """Materialize the strings of many codes."""
+        values = self._values
+        return [None if code < 0 else values[code] for code in codes]
+
+    def to_list(self) -> List[str]:
+        """All interned values, indexed by code."""
+        return list(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, value: str) -> bool:
+        return value in self._codes
+
+
+class CodedResults:
+    """Array-backed sequence of results stored as codes into a shared vocabulary"""
+    __slots__ = ("vocab", "codes")
+
+    def __init__(self, vocab: Vocabulary, codes: Optional[array] = None):
+        """
+        Initialize the results.
+
+        Args:
+            vocab (Vocabulary): Vocabulary the codes refer to
+            codes (array): Existing codes (typecode "i"), empty if None
+        """
+        self.vocab = vocab
+        self.codes = codes if codes is not None else array(_TYPECODE)
+
+    @classmethod
+    def from_values(cls, vocab: Vocabulary, values: Sequence[Optional[str]]) -> "CodedResults":
+        """Build results from output strings."""
+        results = cls(vocab)
+        results.extend(values)
+        return results
+
+    def append(self, value: Optional[str]) -> None:
+        """Append one output string."""
+        self.codes.append(self.vocab.code(value))
+
+    def extend(self, values: Union[Sequence[Optional[str]], "CodedResults"]) -> None:
+        """Append many output strings (or results sharing this vocabulary)."""
+        if isinstance(values, CodedResults) and values.vocab is self.vocab:
+            self.codes.extend(values.codes)
+            return
+        self.codes.frombytes(self.vocab.encode(list(values)).tobytes())
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Optional[str], "CodedResults"]:
+        if isinstance(index, slice):
+            return CodedResults(self.vocab, self.codes[index])
+        return self.vocab.value(self.codes[index])
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        value = self.vocab.value
+        return (value(code) for code in self.codes)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, CodedResults):
+            return self.to_list() == other.to_list()
+        if isinstance(other, list):
+            return self.to_list() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"CodedResults(rows={len(self)}, vocabulary={len(self.vocab)})"
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the codes."""
+        return len(self.codes) * self.codes.itemsize
+
+    def to_list(self) -> List[Optional[str]]:
+        """Materialize all results as strings."""
+        return self.vocab.decode(self.codes)
+
+    def to_numpy(self) -> np.ndarray:
+        """Codes as a numpy array sharing the underlying buffer."""
+        return np.frombuffer(self.codes, dtype=np.intc)
+
+    def to_pandas(self, index: Any = None, name: Optional[str] = None) -> pd.Series:
+        """
+        Convert to a categorical Series without materializing per-row strings.
+
+        Args:
+            index (Any): Index of the Series
+            name (str): Name of the Series
+
+        Returns:
+            pd.Series: Categorical Series whose categories are the vocabulary
+        """
+        categorical = pd.Categorical.from_codes(self.to_numpy(), categories=self.vocab.to_list())
+        return pd.Series(categorical, index=index, name=name)
+
+    def to_arrow(self) -> Any:
+        """
+        Convert to a dictionary-encoded pyarrow array.
+
+        Returns:
+            pyarrow.DictionaryArray: Codes as indices into the vocabulary
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("to_arrow requires the pyarrow package: pip install pyarrow") from e
+        codes = self.to_numpy()
+        return pa.DictionaryArray.from_arrays(
+            pa.array(codes, mask=codes < 0), pa.array(self.vocab.to_list(), type=pa.string())
+        )
+
+
+# Process-wide vocabulary shared by batch results
+default_vocabulary = Vocabulary()
+
+
+def compact_codes(codes: Dict[Hashable, int], vocab: Vocabulary) -> Vocabulary:
+    """
+    Move the values still referenced by a cache into a fresh vocabulary.
+
+    Vocabularies are append-only, so a cache evicting entries calls this once
+    its vocabulary has outgrown it; memory then stays bounded by the cache size.
+
+    Args:
+        codes (Dict[Hashable, int]): Cache entries mapping keys to codes of `vocab`, recoded in place
+        vocab (Vocabulary): Vocabulary the codes currently refer to
+
+    Returns:
+        Vocabulary: New vocabulary holding only the referenced values
+    """
+    fresh = Vocabulary()
+    for key, code in codes.items():
+        codes[key] = fresh.code(vocab.value(code))
+    return fresh
+
+
+def run_coded(batch_func: Callable[[List[str]], List[Optional[str]]],
+              texts: Sequence[str],
+              vocab: Optional[Vocabulary] = None) -> CodedResults:
+    """
+    Run a batch function over distinct texts and return per-row codes.
+
+    No per-row string is created: each distinct result is interned once and
+    rows only hold a four-byte code.
+
+    Args:
+        batch_func (Callable[[List[str]], List[Optional[str]]]): Function mapping texts to results in order
+        texts (Sequence[str]): Input texts
+        vocab (Vocabulary): Vocabulary to intern results into (uses the shared one if None)
+
+    Returns:
+        CodedResults: Results aligned with `texts`
+    """
+    vocab = vocab if vocab is not None else default_vocabulary
+    local_codes, uniques = pd.factorize(pd.Series(list(texts), dtype=object))
+    if not len(uniques):
+        return CodedResults(vocab, array(_TYPECODE, [MISSING]) * len(local_codes))
+    unique_codes = vocab.encode(batch_func([str(value) for value in uniques]))
+    codes = np.where(local_codes < 0, MISSING, unique_codes.take(np.maximum(local_codes, 0))).astype(np.intc)
+    results = CodedResults(vocab)
+    results.codes.frombytes(codes.tobytes())
+    return results
@@ -1,9 +1,31 @@
-from .huggingface_func import HuggingFaceFunc
+from ._base import API_ERROR_OUTPUT, EMPTY_OUTPUT, FuncBase
+from ._history import HistoryPolicy, estimate_tokens
+from ._prompt import CompiledPrompt, compile_prompt
+from ._ratelimit import BudgetExceeded, RateLimiter
+from ._singleflight import SingleFlight, default_flight
+from ._usage import RunResult
+from .huggingface_func import QUANTIZATION_INT4, QUANTIZATION_INT8, HuggingFaceFunc
+from .llama_cpp_func import LlamaCppFunc
 from .ollama_func import OllamaFunc
 from .openai_func import OpenAIFunc
 
 __all__ = [
+    "FuncBase",
+    "RunResult",
+    "EMPTY_OUTPUT",
+    "API_ERROR_OUTPUT",
+    "HistoryPolicy",
+    "estimate_tokens",
+    "CompiledPrompt",
+    "compile_prompt",
+    "RateLimiter",
+    "BudgetExceeded",
+    "SingleFlight",
+    "default_flight",
     "OllamaFunc",
     "OpenAIFunc",
-    "HuggingFaceFunc"
+    "HuggingFaceFunc",
+    "LlamaCppFunc",
+    "QUANTIZATION_INT8",
+    "QUANTIZATION_INT4"
 ]
@@ -7,14 +7,50 @@
 # @Email  : sepinetam@gmail.com
 # @File   : _base.py
 
+import json
+import re
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+
+from ._history import HistoryPolicy
+from ._prompt import CompiledPrompt, compile_prompt
+from ._singleflight import default_flight
+from ._usage import RunResult
+
+# Sentinel outputs returned by backends when no usable answer is available
+EMPTY_OUTPUT = "未能提取到城市名称"
+API_ERROR_OUTPUT = "API调用失败"
+
+# Instruction wrapped around several inputs packed into one chat request
+PACKED_BATCH_TEMPLATE = (
+    "下面有{count}条输入，请按要求分别处理每一条，互不影响。\n"
+    "只输出一个JSON对象：{{\"results\": [...]}}，results按输入顺序给出{count}个答案，每个答案是一个字符串。\n\n"
+    "{items}"
+)
+
+# Most requests of one unpacked batch that are in flight at the same time
+MAX_BATCH_CONCURRENCY = 16
+
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
 
 
 class FuncBase(ABC):
     """Base class for model functions"""
 
-    def __init__(self, model_id: str, system_prompt: str = None, temperature: float = 0.1):
+    # Share one backend call between identical concurrent requests
+    coalesce: bool = True
+    # Send the inputs of an unpacked batch as concurrent requests (remote servers
+    # and APIs); local backends that compute one request at a time disable it
+    concurrent_batch: bool = True
+
+    def __init__(self,
+                 model_id: str,
+                 system_prompt: Union[str, CompiledPrompt] = None,
+                 temperature: float = 0.1,
+                 json_mode: bool = False,
+                 history_policy: Optional[HistoryPolicy] = None):
         """
         Initialize the model function.
 
@@ -22,25 +58,58 @@ class FuncBase(ABC):
             model_id (str): The model identifier
             system_prompt (str): System prompt for the model
             temperature (float): Temperature parameter for generation
+            json_mode (bool): Constrain the model output to a JSON object
+            history_policy (HistoryPolicy): Bounds for conversation history (unbounded if None)
         """
         self.model_id = model_id
-        self.system_prompt = system_prompt
+        self.system_prompt = str(system_prompt) if system_prompt is not None else None
         self.temperature = temperature
+        self.json_mode = json_mode
+        self.history_policy = history_policy
         self.history: List[Dict[str, str]] = []
+        # Number of leading history messages that are never trimmed
+        self.pinned_count = 0
 
-    def add_history(self, role: str, content: str) -> None:
+    @property
+    def prompt(self) -> Optional[CompiledPrompt]:
+        """Compiled system prompt, shared by all instances with the same prompt text"""
+        return compile_prompt(self.system_prompt) if self.system_prompt else None
+
+    def add_history(self, role: str, content: str, pinned: bool = False) -> None:
         """
         Add a message to conversation history.
 
         Args:
             role (str): Message role ('system', 'user', 'assistant')
             content (str): Message content
+            pinned (bool): Keep the message regardless of the history policy (e.g. few-shot examples)
+        """
+        message = {"role": role, "content": content}
+        if pinned:
+            self.history.insert(self.pinned_count, message)
+            self.pinned_count += 1
+        else:
+            self.history.append(message)
+        self._trim_history()
+
+    def clear_history(self, keep_pinned: bool = False) -> None:
         """
-        self.history.append({"role": role, "content": content})
+        Clear conversation history.
 
-    def clear_history(self) -> None:
-        """Clear conversation history."""
-        self.history.clear()
+        Args:
+            keep_pinned (bool): Keep pinned messages
+        """
+        if keep_pinned:
+            del self.history[self.pinned_count:]
+        else:
+            self.history.clear()
+            self.pinned_count = 0
+
+    def _trim_history(self) -> None:
+        """Apply the history policy so that request size stays bounded."""
+        if self.history_policy is not None:
+            self.history[:] = self.history_policy.trim(self.history, self.pinned_count)
+            self.pinned_count = min(self.pinned_count, len(self.history))
 
     def get_history(self) -> List[Dict[str, str]]:
         """Get conversation history."""
@@ -57,6 +126,47 @@ class FuncBase(ABC):
         Returns:
             str: Model response
         """
+        messages = self._build_messages(message)
+
+        # Get response from abstract method; identical in-flight requests share one call
+        if self.coalesce:
+            response = default_flight.do(self._request_key(messages), lambda: self._chat_completion(messages))
+        else:
+            response = self._chat_completion(messages)
+
+        # Update history if requested
+        if save_to_history:
+            self.add_history("user", message)
+            self.add_history("assistant", response)
+
+        return response
+
+    def run_detailed(self, message: str, save_to_history: bool = False) -> RunResult:
+        """
+        Run the model like `run`, keeping the usage and timings of the call.
+
+        Args:
+            message (str): Input message
+            save_to_history (bool): Whether to save this interaction to history
+
+        Returns:
+            RunResult: Model response with token counts and timings
+        """
+        messages = self._build_messages(message)
+        if self.coalesce:
+            key = ("detailed",) + self._request_key(messages)
+            result = default_flight.do(key, lambda: self._chat_completion_detailed(messages))
+        else:
+            result = self._chat_completion_detailed(messages)
+
+        if save_to_history:
+            self.add_history("user", message)
+            self.add_history("assistant", result.text)
+
+        return result
+
+    def _build_messages(self, message: str) -> List[Dict[str, str]]:
+        """Messages of a request: system prompt, history and the current message."""
         # Build messages
         messages = []
 
@@ -69,16 +179,126 @@ class FuncBase(ABC):
 
         # Add current message
         messages.append({"role": "user", "content": message})
+        return messages
 
-        # Get response from abstract method
-        response = self._chat_completion(messages)
+    def run_batch(self, messages: List[str], packed: bool = False) -> List[str]:
+        """
+        Run the model on several independent inputs.
 
-        # Update history if requested
-        if save_to_history:
-            self.add_history("user", message)
-            self.add_history("assistant", response)
+        History is used as context but never updated. Unless packed, inputs are
+        sent as concurrent requests. Backends with native batch generation
+        override this method.
 
-        return response
+        Args:
+            messages (List[str]): Input messages
+            packed (bool): Pack all inputs into one chat request returning a JSON list
+                (falls back to one request per input if the answer is malformed)
+
+        Returns:
+            List[str]: One response per input message
+        """
+        if packed and len(messages) > 1:
+            results = self._run_packed(messages)
+            if results is not None:
+                return results
+        if not self.concurrent_batch or len(messages) <= 1:
+            return [self.run(message) for message in messages]
+        with ThreadPoolExecutor(max_workers=min(len(messages), MAX_BATCH_CONCURRENCY)) as pool:
+            return list(pool.map(self.run, messages))
+
+    def _run_packed(self, messages: List[str]) -> Optional[List[str]]:
+        """Send several inputs as one numbered prompt; None if the answer cannot be split."""
+        items = "\n".join(f"{i}. {message}" for i, message in enumerate(messages, 1))
+        prompt = PACKED_BATCH_TEMPLATE.format(count=len(messages), items=items)
+        json_mode, self.json_mode = self.json_mode, True
+        try:
+            response = self.run(prompt)
+        finally:
+            self.json_mode = json_mode
+
+        match = _JSON_OBJECT_RE.search(response)
+        if not match:
+            return None
+        try:
+            results = json.loads(match.group(0)).get("results")
+        except (json.JSONDecodeError, AttributeError):
+            return None
+        if not isinstance(results, list) or len(results) != len(messages):
+            return None
+        return ["" if result is None else str(result).strip() for result in results]
+
+    def _request_key(self, messages: List[Dict[str, str]]) -> Hashable:
+        """
+        Build the identity of a request for single-flight deduplication.
+
+        Args:
+            messages (List[Dict[str, str]]): Messages to send
+
+        Returns:
+            Hashable: Key covering backend, model, generation settings and messages
+        """
+        return (
+            type(self).__name__,
+            self._endpoint(),
+            self.model_id,
+            self.temperature,
+            self.json_mode,
+            tuple((msg["role"], msg["content"]) for msg in messages)
+        )
+
+    def _endpoint(self) -> Tuple:
+        """Backend-specific part of the request identity, e.g. the server address."""
+        return ()
+
+    def preload(self) -> None:
+        """
+        Load the model ahead of the first request.
+
+        Local backends load their weights on construction and remote APIs
+        have nothing to load, so the default does nothing.
+        """
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Compute embedding vectors for texts.
+
+        Args:
+            texts (List[str]): Input texts
+
+        Returns:
+            List[List[float]]: One embedding vector per text
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support embeddings")
+
+    def score(self, message: str, candidates: List[str]) -> List[float]:
+        """
+        Score candidate answers to a message instead of generating one.
+
+        Args:
+            message (str): Input message
+            candidates (List[str]): Candidate answers
+
+        Returns:
+            List[float]: Log-probability of each candidate being the whole answer
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support candidate scoring")
+
+    def _chat_completion_detailed(self, messages: List[Dict[str, str]]) -> RunResult:
+        """
+        Chat completion with usage and timings.
+
+        Backends reporting usage override this method; the default only
+        measures the latency of `_chat_completion`.
+
+        Args:
+            messages (List[Dict[str, str]]): List of messages
+
+        Returns:
+            RunResult: Model response with the metadata the backend reports
+        """
+        started = time.perf_counter()
+        text = self._chat_completion(messages)
+        return RunResult(text, latency_ms=(time.perf_counter() - started) * 1000)
 
     @abstractmethod
     def _chat_completion(self, messages: List[Dict[str, str]]) -> str:
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _history.py
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+
+@lru_cache(maxsize=4096)
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a text without loading a tokenizer.
+
+    CJK characters are counted as one token each, other characters as
+    roughly four per token, which is close to BPE tokenizers used by Qwen/GPT.
+
+    Args:
+        text (str): Input text
+
+    Returns:
+        int: Estimated number of tokens
+    """
+    cjk = sum(1 for ch in text if "㐀" <= ch <= "鿿" or "豈" <= ch <= "﫿")
+    other = len(text) - cjk
+    return cjk + (other + 3) // 4
+
+
+@dataclass
+class HistoryPolicy:
+    """Bounds applied to conversation history kept by a model function"""
+    # Maximum number of unpinned turns (a user message and its replies)
+    max_turns: Optional[int] = None
+    # Maximum number of history tokens, pinned messages included
+    max_tokens: Optional[int] = None
+    # Token counter, e.g. `lambda s: len(tokenizer.encode(s))`
+    tokenizer: Optional[Callable[[str], int]] = None
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens of a text with the configured tokenizer."""
+        return (self.tokenizer or estimate_tokens)(text)
+
+    def trim(self, history: List[Dict[str, str]], pinned: int = 0) -> List[Dict[str, str]]:
+        """
+        Apply the sliding window to a history.
+
+        The first `pinned` messages (e.g. few-shot examples) are always kept;
+        whole turns are dropped from the oldest end of the remaining window.
+
+        Args:
+            history (List[Dict[str, str]]): Messages, pinned messages first
+            pinned (int): Number of leading pinned messages
+
+        Returns:
+            List[Dict[str, str]]: Trimmed history
+        """
+        head, window = history[:pinned], history[pinned:]
+        starts = [i for i, msg in enumerate(window) if msg["role"] == "user"]
+        if not starts or starts[0] != 0:
+            starts.insert(0, 0)
+        bounds = starts + [len(window)]
+        turns = [(bounds[i], bounds[i + 1]) for i in range(len(starts)) if bounds[i] < bounds[i + 1]]
+
+        if self.max_turns is not None:
+            turns = turns[-self.max_turns:] if self.max_turns > 0 else []
+
+        if self.max_tokens is not None:
+            budget = self.max_tokens - sum(self.count_tokens(msg["content"]) for msg in head)
+            sizes = [sum(self.count_tokens(msg["content"]) for msg in window[a:b]) for a, b in turns]
+            used = sum(sizes)
+            while turns and used > budget:
+                turns.pop(0)
+                used -= sizes.pop(0)
+
+        start = turns[0][0] if turns else len(window)
+        return head + window[start:]
@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _prompt.py
+
+import hashlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Optional, Union
+
+from ._history import estimate_tokens
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledPrompt:
+    """Immutable system prompt with its token count and a stable cache key"""
+    text: str
+    token_count: int
+    cache_key: str
+
+    def __str__(self) -> str:
+        return self.text
+
+
+def compile_prompt(prompt: Union[str, CompiledPrompt],
+                   tokenizer: Optional[Callable[[str], int]] = None) -> CompiledPrompt:
+    """
+    Compile a prompt once; identical texts share the same compiled object.
+
+    Args:
+        prompt (Union[str, CompiledPrompt]): Prompt text or an already compiled prompt
+        tokenizer (Callable[[str], int]): Token counter (uses a CJK-aware estimate if None)
+
+    Returns:
+        CompiledPrompt: Compiled prompt
+    """
+    if isinstance(prompt, CompiledPrompt):
+        return prompt
+    return _compile(prompt, tokenizer)
+
+
+@lru_cache(maxsize=256)
+def _compile(text: str, tokenizer: Optional[Callable[[str], int]]) -> CompiledPrompt:
+    return CompiledPrompt(
+        text=text,
+        token_count=(tokenizer or estimate_tokens)(text),
+        cache_key=hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+    )
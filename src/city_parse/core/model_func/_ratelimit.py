@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _ratelimit.py
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised before a request that could exceed the cost budget"""
+
+
+class _Bucket:
+    """Token bucket refilled continuously up to one minute of capacity"""
+    __slots__ = ("capacity", "rate", "level", "updated")
+
+    def __init__(self, per_minute: float, now: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (requests larger than the capacity wait for a full bucket)."""
+        missing = min(amount, self.capacity) - self.level
+        return missing / self.rate if missing > 0 else 0.0
+
+
+class RateLimiter:
+    """Requests/min and tokens/min limits plus a cost budget, shared by concurrent callers"""
+
+    def __init__(self,
+                 requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None,
+                 budget: Optional[float] = None,
+                 prompt_price: float = 0.0,
+                 completion_price: float = 0.0,
+                 completion_allowance: int = 32,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute (float): Provider request limit (unlimited if None)
+            tokens_per_minute (float): Provider token limit, prompt and completion (unlimited if None)
+            budget (float): Hard cost limit in the currency of the prices (unlimited if None)
+            prompt_price (float): Price per million prompt tokens
+            completion_price (float): Price per million completion tokens
+            completion_allowance (int): Completion tokens reserved per request until the usage is known
+            clock (Callable[[], float]): Monotonic clock in seconds
+        """
+        self._clock = clock
+        now = clock()
+        self._requests = _Bucket(requests_per_minute, now) if requests_per_minute else None
+        self._tokens = _Bucket(tokens_per_minute, now) if tokens_per_minute else None
+        self.budget = budget
+        self.prompt_price = prompt_price
+        self.completion_price = completion_price
+        self.completion_allowance = completion_allowance
+        self._cond = threading.Condition()
+        # Cost of completed requests and upper bound of the in-flight ones
+        self.spent = 0.0
+        self._pending_cost = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.requests = 0
+
+    def _cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        return (prompt_tokens * self.prompt_price + completion_tokens * self.completion_price) / 1_000_000
+
+    def _reserved_cost(self, reserved: int) -> float:
+        """Upper bound of the cost of a reservation."""
+        return reserved * max(self.prompt_price, self.completion_price) / 1_000_000
+
+    def acquire(self, prompt_tokens: int) -> int:
+        """
+        Wait until a request fits the limits and reserve its tokens.
+
+        Args:
+            prompt_tokens (int): Estimated prompt tokens of the request
+
+        Returns:
+            int: Tokens reserved (prompt plus completion allowance), to pass to `record`
+
+        Raises:
+            BudgetExceeded: If the request could push the cost over the budget
+        """
+        reserved = prompt_tokens + self.completion_allowance
+        with self._cond:
+            while True:
+                if (self.budget is not None
+                        and self.spent + self._pending_cost + self._reserved_cost(reserved) > self.budget):
+                    raise BudgetExceeded(f"Cost budget {self.budget} exhausted (spent {self.spent:.4f})")
+                now = self._clock()
+                wait = 0.0
+                for bucket, amount in ((self._requests, 1), (self._tokens, reserved)):
+                    if bucket is not None:
+                        bucket.refill(now)
+                        wait = max(wait, bucket.wait_time(amount))
+                if wait <= 0:
+                    break
+                self._cond.wait(wait)
+
+            if self._requests is not None:
+                self._requests.level -= 1
+            if self._tokens is not None:
+                self._tokens.level -= reserved
+            self._pending_cost += self._reserved_cost(reserved)
+            self.requests += 1
+        return reserved
+
+    def record(self, reserved: int, prompt_tokens: int, completion_tokens: int) -> None:
+        """
+        Settle a reservation with the usage reported by the provider.
+
+        Args:
+            reserved (int): Tokens returned by `acquire`
+            prompt_tokens (int): Actual prompt tokens (0 if the request failed)
+            completion_tokens (int): Actual completion tokens (0 if the request failed)
+        """
+        with self._cond:
+            if self._tokens is not None:
+                # Return over-estimated tokens, or take the shortfall from the bucket
+                self._tokens.level += reserved - prompt_tokens - completion_tokens
+            self._pending_cost = max(0.0, self._pending_cost - self._reserved_cost(reserved))
+            self.spent += self._cost(prompt_tokens, completion_tokens)
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self._cond.notify_all()
+
+    @property
+    def remaining_budget(self) -> Optional[float]:
+        """Budget left after completed requests (None if unlimited)"""
+        return None if self.budget is None else max(0.0, self.budget - self.spent)
@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : _usage.py
+
+from typing import Optional
+
+
+class RunResult:
+    """Model response with the usage and timings reported by the backend (None where not reported)"""
+    __slots__ = ("text", "latency_ms", "prompt_tokens", "completion_tokens", "prompt_eval_ms", "eval_ms", "load_ms")
+
+    def __init__(self,
+                 text: str,
+                 latency_ms: float = 0.0,
+                 prompt_tokens: Optional[int] = None,
+                 completion_tokens: Optional[int] = None,
+                 prompt_eval_ms: Optional[float] = None,
+                 eval_ms: Optional[float] = None,
+                 load_ms: Optional[float] = None):
+        """
+        Initialize the result.
+
+        Args:
+            text (str): Model response
+            latency_ms (float): Wall time of the call measured by the client
+            prompt_tokens (int): Prompt tokens
+            completion_tokens (int): Generated tokens
+            prompt_eval_ms (float): Prefill time measured by the backend
+            eval_ms (float): Decode time measured by the backend
+            load_ms (float): Time the backend spent loading the model for this call
+        """
+        self.text = text
+        self.latency_ms = latency_ms
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.prompt_eval_ms = prompt_eval_ms
+        self.eval_ms = eval_ms
+        self.load_ms = load_ms
+
+    @property
+    def total_tokens(self) -> Optional[int]:
+        """Prompt plus completion tokens"""
+        if self.prompt_tokens is None or self.completion_tokens is None:
+            return None
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def tokens_per_sec(self) -> Optional[float]:
+        """Decode speed, from the backend's decode time if reported, else from the latency"""
+        elapsed_ms = self.eval_ms or self.latency_ms
+        if self.completion_tokens is None or not elapsed_ms:
+            return None
+        return self.completion_tokens / elapsed_ms * 1000
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return (f"RunResult(text={self.text!r}, latency_ms={self.latency_ms:.1f}, "
+                f"prompt_tokens={self.prompt_tokens}, completion_tokens={self.completion_tokens})")
@@ -0,0 +1,285 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : huggingface_func.py
+
+import threading
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+from ._base import API_ERROR_OUTPUT, EMPTY_OUTPUT, FuncBase
+from ._history import HistoryPolicy
+
+# Supported weight quantization modes
+QUANTIZATION_INT8 = "int8"
+QUANTIZATION_INT4 = "int4"
+
+# Loaded (tokenizer, model) pairs shared by all instances of this process
+_MODEL_CACHE: Dict[Tuple, Tuple[Any, Any]] = {}
+_MODEL_LOCK = threading.Lock()
+
+
+def _import_transformers() -> Tuple[Any, Any]:
+    """Import torch and transformers lazily, they are optional dependencies."""
+    try:
+        import torch
+        import transformers
+    except ImportError as e:
+        raise ImportError(
+            "HuggingFaceFunc requires the torch and transformers packages: pip install city-parse[huggingface]"
+        ) from e
+    return torch, transformers
+
+
+def _load_model(model_id: str,
+                device: str,
+                torch_dtype: str,
+                quantization: Optional[str]) -> Tuple[Any, Any]:
+    """
+    Load a tokenizer and causal LM once per process.
+
+    Args:
+        model_id (str): Hugging Face model identifier or local path
+        device (str): Device to run on ("cpu", "cuda", "mps" etc.)
+        torch_dtype (str): Weight dtype of the non-quantized layers
+        quantization (str): None, "int8" or "int4"
+
+    Returns:
+        Tuple[Any, Any]: Tokenizer and model in eval mode
+    """
+    key = (model_id, device, torch_dtype, quantization)
+    with _MODEL_LOCK:
+        cached = _MODEL_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        torch, transformers = _import_transformers()
+        tokenizer = transformers.AutoTokenizer.from_pretrained(model_id)
+        # Batched generation appends new tokens on the right
+        tokenizer.padding_side = "left"
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+
+        load_args: Dict[str, Any] = {"torch_dtype": getattr(torch, torch_dtype)}
+        dynamic_int8 = quantization == QUANTIZATION_INT8 and device == "cpu"
+        if quantization is not None and not dynamic_int8:
+            # 8-bit on accelerators and 4-bit weights go through bitsandbytes
+            load_args["quantization_config"] = transformers.BitsAndBytesConfig(
+                load_in_8bit=quantization == QUANTIZATION_INT8,
+                load_in_4bit=quantization == QUANTIZATION_INT4
+            )
+            load_args["device_map"] = device
+        model = transformers.AutoModelForCausalLM.from_pretrained(model_id, **load_args)
+
+        if dynamic_int8:
+            # int8 weights for every linear layer, activations quantized on the fly
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        elif quantization is None:
+            model = model.to(device)
+        model.eval()
+
+        _MODEL_CACHE[key] = (tokenizer, model)
+        return tokenizer, model
+
+
+def _complete_answer_criteria(tokenizer: Any, prompt_length: int, answers: Collection[str]) -> Any:
+    """
+    Build stopping criteria ending each sequence once its reply is a complete answer.
+
+    Args:
+        tokenizer (Any): Tokenizer decoding the generated tokens
+        prompt_length (int): Number of (padded) prompt tokens in front of the reply
+        answers (Collection[str]): Complete answers, e.g. full division names
+
+    Returns:
+        transformers.StoppingCriteriaList: Criteria for generate()
+    """
+    torch, transformers = _import_transformers()
+
+    class CompleteAnswer(transformers.StoppingCriteria):
+        def __call__(self, input_ids, scores, **kwargs):
+            replies = tokenizer.batch_decode(input_ids[:, prompt_length:], skip_special_tokens=True)
+            return torch.tensor([reply.strip() in answers for reply in replies], device=input_ids.device)
+
+    return transformers.StoppingCriteriaList([CompleteAnswer()])
+
+
+class HuggingFaceFunc(FuncBase):
+    """Local transformers model function wrapper"""
+    # Batches go through one batched generate() call instead
+    concurrent_batch = False
+
+    def __init__(self,
+                 model_id: str,
+                 system_prompt: str = None,
+                 temperature: float = 0.1,
+                 device: str = "cpu",
+                 torch_dtype: str = "float32",
+                 quantization: Optional[str] = None,
+                 max_new_tokens: int = 32,
+                 prompt_lookup_num_tokens: Optional[int] = 10,
+                 early_exit: Optional[Collection[str]] = None,
+                 json_mode: bool = False,
+                 history_policy: Optional[HistoryPolicy] = None,
+                 **kwargs) -> None:
+        """
+        Initialize local transformers model function.
+
+        Args:
+            model_id (str): Hugging Face model identifier or local path
+            system_prompt (str): System prompt for the model
+            temperature (float): Temperature parameter for generation (greedy if 0)
+            device (str): Device to run on ("cpu", "cuda", "mps" etc.)
+            torch_dtype (str): Weight dtype ("float32", "float16", "bfloat16")
+            quantization (str): Weight quantization: None, "int8" (dynamic int8 linear layers on CPU)
+                or "int4" (bitsandbytes; prefer ModelSource.LLAMA_CPP for 4-bit on CPU)
+            max_new_tokens (int): Maximum number of generated tokens
+            prompt_lookup_num_tokens (int): Draft up to this many tokens by copying from the input
+                (prompt lookup decoding) and verify them in one forward pass; only used for single
+                conversations, batches keep native batched generation. None disables it
+            early_exit (Collection[str]): Complete answers (e.g. the full names of a DivisionTable)
+                that end generation as soon as the reply equals one of them, instead of generating
+                up to end-of-sequence; ignored in JSON mode. None disables it
+            json_mode (bool): Constrain the model output to a JSON object
+            history_policy (HistoryPolicy): Bounds for conversation history (unbounded if None)
+            **kwargs: Additional arguments for generate()
+        """
+        if quantization not in (None, QUANTIZATION_INT8, QUANTIZATION_INT4):
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        super().__init__(model_id, system_prompt, temperature, json_mode, history_policy)
+        self.device = device
+        self.torch_dtype = torch_dtype
+        self.quantization = quantization
+        self.max_new_tokens = max_new_tokens
+        self.prompt_lookup_num_tokens = prompt_lookup_num_tokens
+        self.early_exit = early_exit
+        self.kwargs = kwargs
+        self.tokenizer, self.model = _load_model(model_id, device, torch_dtype, quantization)
+
+    def _endpoint(self) -> Tuple:
+        """Device and weight format, part of the request identity."""
+        return (self.device, self.torch_dtype, self.quantization)
+
+    def _generate_args(self, batch_size: int = 1) -> Dict[str, Any]:
+        """Arguments for model.generate() on a batch of `batch_size` conversations."""
+        args = {
+            "max_new_tokens": self.max_new_tokens,
+            "pad_token_id": self.tokenizer.pad_token_id,
+        }
+        if self.temperature > 0:
+            args.update({"do_sample": True, "temperature": self.temperature})
+        else:
+            args["do_sample"] = False
+        # Answers are almost always a substring of the title, so drafts copied
+        # from the input are usually accepted and skip full forward passes.
+        # Assisted generation drafts for one sequence at a time, so batches skip it
+        if self.prompt_lookup_num_tokens and batch_size == 1:
+            args["prompt_lookup_num_tokens"] = self.prompt_lookup_num_tokens
+        args.update(self.kwargs)
+        return args
+
+    def _generate(self, conversations: List[List[Dict[str, str]]]) -> List[str]:
+        """
+        Generate one reply per conversation in a single padded batch.
+
+        Args:
+            conversations (List[List[Dict[str, str]]]): Messages of each conversation
+
+        Returns:
+            List[str]: Decoded replies
+        """
+        torch, _ = _import_transformers()
+        prompts = [
+            self.tokenizer.apply_chat_template(messages, tokenize=False, add_generation_prompt=True)
+            for messages in conversations
+        ]
+        inputs = self.tokenizer(prompts, return_tensors="pt", padding=True).to(self.model.device)
+        # Left padding: every prompt ends at the same position
+        prompt_length = inputs["input_ids"].shape[1]
+        args = self._generate_args(len(conversations))
+        if self.early_exit and not self.json_mode:
+            args["stopping_criteria"] = _complete_answer_criteria(self.tokenizer, prompt_length, self.early_exit)
+        with torch.inference_mode():
+            output_ids = self.model.generate(**inputs, **args)
+        new_tokens = output_ids[:, prompt_length:]
+        return [text.strip() for text in self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)]
+
+    def score(self, message: str, candidates: List[str]) -> List[float]:
+        """
+        Score candidate answers in one batched forward pass, without generation.
+
+        Each row is the chat prompt followed by a candidate and the end-of-sequence
+        token, so a candidate only scores well if the model would stop after it.
+
+        Args:
+            message (str): Input message
+            candidates (List[str]): Candidate answers
+
+        Returns:
+            List[float]: Log-probability of each candidate being the whole answer
+        """
+        if not candidates:
+            return []
+        torch, _ = _import_transformers()
+        prompt = self.tokenizer.apply_chat_template(self._build_messages(message), tokenize=False, add_generation_prompt=True)
+        prompt_ids = list(self.tokenizer(prompt, add_special_tokens=False)["input_ids"])
+        answers = [
+            list(self.tokenizer(candidate, add_special_tokens=False)["input_ids"]) + [self.tokenizer.eos_token_id]
+            for candidate in candidates
+        ]
+
+        # Right padding keeps the shared prompt at the same positions in every row
+        width = len(prompt_ids) + max(len(answer) for answer in answers)
+        pad_id = self.tokenizer.pad_token_id
+        rows = [prompt_ids + answer + [pad_id] * (width - len(prompt_ids) - len(answer)) for answer in answers]
+        mask = [[1] * (len(prompt_ids) + len(answer)) + [0] * (width - len(prompt_ids) - len(answer))
+                for answer in answers]
+        with torch.inference_mode():
+            logits = self.model(input_ids=torch.tensor(rows, device=self.model.device),
+                                attention_mask=torch.tensor(mask, device=self.model.device)).logits
+            log_probs = torch.log_softmax(logits, dim=-1)
+
+        scores = []
+        for row, answer in enumerate(answers):
+            # The token at position p is predicted from position p - 1
+            scores.append(sum(float(log_probs[row, len(prompt_ids) + i - 1, token]) for i, token in enumerate(answer)))
+        return scores
+
+    def _chat_completion(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Perform chat completion with the local model.
+
+        Args:
+            messages (List[Dict[str, str]]): List of messages with role and content
+
+        Returns:
+            str: Model response
+        """
+        try:
+            return self._generate([messages])[0] or EMPTY_OUTPUT
+        except Exception as e:
+            print(f"本地模型推理出错: {e}")
+            return API_ERROR_OUTPUT
+
+    def run_batch(self, messages: List[str], packed: bool = False) -> List[str]:
+        """
+        Run many independent messages through one batched generate() call.
+
+        Args:
+            messages (List[str]): Input messages
+            packed (bool): Use the packed prompt of the base class instead
+
+        Returns:
+            List[str]: One response per message, in order
+        """
+        if packed or len(messages) <= 1:
+            return super().run_batch(messages, packed=packed)
+        try:
+            replies = self._generate([self._build_messages(message) for message in messages])
+        except Exception as e:
+            print(f"本地模型推理出错: {e}")
+            return [API_ERROR_OUTPUT] * len(messages)
+        return [reply or EMPTY_OUTPUT for reply in replies]
@@ -0,0 +1,150 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : llama_cpp_func.py
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ._base import API_ERROR_OUTPUT, EMPTY_OUTPUT, FuncBase
+from ._history import HistoryPolicy
+from ._usage import RunResult
+
+# Loaded GGUF models shared by all instances of this process, each with the
+# lock serializing its generations (a llama.cpp context serves one at a time)
+_MODEL_CACHE: Dict[Tuple, Tuple[Any, threading.Lock]] = {}
+_MODEL_LOCK = threading.Lock()
+
+
+def _load_model(model_id: str,
+                gguf_file: Optional[str],
+                n_ctx: int,
+                n_threads: Optional[int]) -> Tuple[Any, threading.Lock]:
+    """
+    Load a GGUF model once per process.
+
+    Args:
+        model_id (str): Path of a .gguf file, or a Hugging Face repo id when `gguf_file` is given
+        gguf_file (str): File name (or glob, e.g. "*q4_k_m.gguf") inside the repo
+        n_ctx (int): Context window in tokens
+        n_threads (int): CPU threads (llama.cpp default if None)
+
+    Returns:
+        Tuple[llama_cpp.Llama, threading.Lock]: Loaded model and its generation lock
+    """
+    key = (model_id, gguf_file, n_ctx, n_threads)
+    with _MODEL_LOCK:
+        cached = _MODEL_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            import llama_cpp
+        except ImportError as e:
+            raise ImportError(
+                "LlamaCppFunc requires the llama-cpp-python package: pip install city-parse[llama_cpp]"
+            ) from e
+        if gguf_file:
+            model = llama_cpp.Llama.from_pretrained(
+                repo_id=model_id, filename=gguf_file, n_ctx=n_ctx, n_threads=n_threads, verbose=False
+            )
+        else:
+            model = llama_cpp.Llama(model_path=model_id, n_ctx=n_ctx, n_threads=n_threads, verbose=False)
+
+        _MODEL_CACHE[key] = (model, threading.Lock())
+        return _MODEL_CACHE[key]
+
+
+class LlamaCppFunc(FuncBase):
+    """Quantized GGUF model function wrapper running on CPU through llama.cpp"""
+    # Generations are serialized by the model lock
+    concurrent_batch = False
+
+    def __init__(self,
+                 model_id: str,
+                 system_prompt: str = None,
+                 temperature: float = 0.1,
+                 gguf_file: Optional[str] = None,
+                 n_ctx: int = 2048,
+                 n_threads: Optional[int] = None,
+                 max_tokens: int = 32,
+                 json_mode: bool = False,
+                 history_policy: Optional[HistoryPolicy] = None,
+                 **kwargs) -> None:
+        """
+        Initialize llama.cpp model function.
+
+        Args:
+            model_id (str): Path of a .gguf file, or a Hugging Face repo id when `gguf_file` is given
+            system_prompt (str): System prompt for the model
+            temperature (float): Temperature parameter for generation
+            gguf_file (str): File name (or glob, e.g. "*q4_k_m.gguf") inside the repo
+            n_ctx (int): Context window in tokens
+            n_threads (int): CPU threads (llama.cpp default if None)
+            max_tokens (int): Maximum number of generated tokens
+            json_mode (bool): Constrain the model output to a JSON object
+            history_policy (HistoryPolicy): Bounds for conversation history (unbounded if None)
+            **kwargs: Additional arguments for create_chat_completion()
+        """
+        super().__init__(model_id, system_prompt, temperature, json_mode, history_policy)
+        self.gguf_file = gguf_file
+        self.n_ctx = n_ctx
+        self.n_threads = n_threads
+        self.max_tokens = max_tokens
+        self.kwargs = kwargs
+        self.model, self._lock = _load_model(model_id, gguf_file, n_ctx, n_threads)
+
+    def _endpoint(self) -> Tuple:
+        """GGUF file, part of the request identity."""
+        return (self.gguf_file,)
+
+    def _chat_completion(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Perform chat completion with the GGUF model.
+
+        Args:
+            messages (List[Dict[str, str]]): List of messages with role and content
+
+        Returns:
+            str: Model response
+        """
+        return self._chat_completion_detailed(messages).text
+
+    def _chat_completion_detailed(self, messages: List[Dict[str, str]]) -> RunResult:
+        """
+        Perform chat completion with the GGUF model, keeping the token usage.
+
+        Args:
+            messages (List[Dict[str, str]]): List of messages with role and content
+
+        Returns:
+            RunResult: Model response with token usage and latency
+        """
+        started = time.perf_counter()
+        try:
+            extra_args = {"response_format": {"type": "json_object"}} if self.json_mode else {}
+            with self._lock:
+                response = self.model.create_chat_completion(
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=self.max_tokens,
+                    **extra_args,
+                    **self.kwargs
+                )
+            content = response["choices"][0]["message"]["content"]
+            usage = response.get("usage") or {}
+            return RunResult(
+                content.strip() if content else EMPTY_OUTPUT,
+                latency_ms=(time.perf_counter() - started) * 1000,
+                prompt_tokens=usage.get("prompt_tokens"),
+                completion_tokens=usage.get("completion_tokens")
+            )
+
+        except Exception as e:
+            print(f"llama.cpp推理出错: {e}")
+            return RunResult(API_ERROR_OUTPUT, latency_ms=(time.perf_counter() - started) * 1000)
@@ -7,11 +7,14 @@
 # @Email  : sepinetam@gmail.com
 # @File   : ollama_func.py
 
-from typing import Any, Dict, List
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import ollama
 
-from ._base import FuncBase
+from ._base import API_ERROR_OUTPUT, EMPTY_OUTPUT, FuncBase
+from ._history import HistoryPolicy
+from ._usage import RunResult
 
 
 class OllamaFunc(FuncBase):
@@ -22,6 +25,9 @@ class OllamaFunc(FuncBase):
                  system_prompt: str = None,
                  temperature: float = 0.1,
                  host: str = "http://localhost:11434",
+                 json_mode: bool = False,
+                 history_policy: Optional[HistoryPolicy] = None,
+                 keep_alive: Optional[Union[str, float]] = None,
                  **kwargs) -> None:
         """
         Initialize Ollama model function.
@@ -31,12 +37,29 @@ class OllamaFunc(FuncBase):
             system_prompt (str): System prompt for the model
             temperature (float): Temperature parameter for generation
             host (str): Ollama server host
+            json_mode (bool): Constrain the model output to a JSON object
+            history_policy (HistoryPolicy): Bounds for conversation history (unbounded if None)
+            keep_alive (Union[str, float]): How long the server keeps the model loaded after a request,
+                e.g. "30m" or -1 for always (server default if None)
             **kwargs: Additional arguments
         """
-        super().__init__(model_id, system_prompt, temperature)
+        super().__init__(model_id, system_prompt, temperature, json_mode, history_policy)
         self.host = host
+        self.keep_alive = keep_alive
         self.kwargs = kwargs
 
+    def _keep_alive_args(self) -> Dict[str, Any]:
+        """keep_alive argument of API calls, omitted to use the server default."""
+        return {'keep_alive': self.keep_alive} if self.keep_alive is not None else {}
+
+    def preload(self) -> None:
+        """Load the model into the Ollama server; an empty prompt only loads it."""
+        ollama.generate(model=self.model_id, **self._keep_alive_args())
+
+    def _endpoint(self) -> Tuple:
+        """Ollama server address, part of the request identity."""
+        return (self.host,)
+
     def _chat_completion(self, messages: List[Dict[str, str]]) -> str:
         """
         Perform chat completion using Ollama API.
@@ -47,22 +70,64 @@ class OllamaFunc(FuncBase):
         Returns:
             str: Model response
         """
+        return self._chat_completion_detailed(messages).text
+
+    def _chat_completion_detailed(self, messages: List[Dict[str, str]]) -> RunResult:
+        """
+        Perform chat completion using Ollama API, keeping token counts and server timings.
+
+        Args:
+            messages (List[Dict[str, str]]): List of messages with role and content
+
+        Returns:
+            RunResult: Model response with usage and timings
+        """
+        started = time.perf_counter()
         try:
             # Call Ollama API
+            extra_args = {'format': 'json'} if self.json_mode else {}
+            extra_args.update(self._keep_alive_args())
             response = ollama.chat(
                 model=self.model_id,
                 messages=messages,
                 options={
                     'temperature': self.temperature
-                }
+                },
+                **extra_args
             )
 
             # Extract and return the response content
-            if response and 'message' in response and 'content' in response['message']:
-                return response['message']['content'].strip()
-            else:
-                return "未能提取到城市名称"
+            if not (response and 'message' in response and 'content' in response['message']):
+                return RunResult(EMPTY_OUTPUT, latency_ms=(time.perf_counter() - started) * 1000)
+
+            # Durations are reported in nanoseconds
+            def milliseconds(key: str) -> Optional[float]:
+                value = response.get(key)
+                return value / 1e6 if value is not None else None
+
+            return RunResult(
+                response['message']['content'].strip(),
+                latency_ms=(time.perf_counter() - started) * 1000,
+                prompt_tokens=response.get('prompt_eval_count'),
+                completion_tokens=response.get('eval_count'),
+                prompt_eval_ms=milliseconds('prompt_eval_duration'),
+                eval_ms=milliseconds('eval_duration'),
+                load_ms=milliseconds('load_duration')
+            )
 
         except Exception as e:
             print(f"Ollama API调用出错: {e}")
-            return "API调用失败"
+            return RunResult(API_ERROR_OUTPUT, latency_ms=(time.perf_counter() - started) * 1000)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Compute embedding vectors using Ollama API.
+
+        Args:
+            texts (List[str]): Input texts
+
+        Returns:
+            List[List[float]]: One embedding vector per text
+        """
+        response = ollama.embed(model=self.model_id, input=texts, **self._keep_alive_args())
+        return [list(vector) for vector in response['embeddings']]
@@ -8,11 +8,15 @@
 # @File   : openai_func.py
 
 import os
-from typing import Dict, List
+import time
+from typing import Dict, List, Optional, Tuple
 
 from openai import OpenAI
 
 from ._base import FuncBase
+from ._history import HistoryPolicy, estimate_tokens
+from ._ratelimit import RateLimiter
+from ._usage import RunResult
 
 
 class OpenAIFunc(FuncBase):
@@ -24,6 +28,9 @@ class OpenAIFunc(FuncBase):
                  temperature: float = 0.1,
                  api_key: str = None,
                  base_url: str = "https://api.openai.com/v1",
+                 json_mode: bool = False,
+                 history_policy: Optional[HistoryPolicy] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
                  **kwargs) -> None:
         """
         Initialize OpenAI model function.
@@ -34,15 +41,24 @@ class OpenAIFunc(FuncBase):
             temperature (float): Temperature parameter for generation
             api_key (str): OpenAI API key (defaults to OPENAI_API_KEY env var)
             base_url (str): OpenAI API base URL
+            json_mode (bool): Constrain the model output to a JSON object
+            history_policy (HistoryPolicy): Bounds for conversation history (unbounded if None)
+            rate_limiter (RateLimiter): Limits and cost budget shared with other instances (unlimited if None)
             **kwargs: Additional arguments
         """
-        super().__init__(model_id, system_prompt, temperature)
+        super().__init__(model_id, system_prompt, temperature, json_mode, history_policy)
+        self.base_url = base_url
         self.client: OpenAI = OpenAI(
             api_key=api_key or os.getenv("OPENAI_API_KEY"),
             base_url=base_url
         )
+        self.rate_limiter = rate_limiter
         self.kwargs = kwargs
 
+    def _endpoint(self) -> Tuple:
+        """API base URL, part of the request identity."""
+        return (self.base_url,)
+
     def _chat_completion(self, messages: List[Dict[str, str]]) -> str:
         """
         Perform chat completion using OpenAI API.
@@ -53,10 +69,57 @@ class OpenAIFunc(FuncBase):
         Returns:
             str: Model response
         """
-        resp = self.client.chat.completions.create(
-            model=self.model_id,
-            temperature=self.temperature,
-            messages=messages
+        return self._chat_completion_detailed(messages).text
+
+    def _chat_completion_detailed(self, messages: List[Dict[str, str]]) -> RunResult:
+        """
+        Perform chat completion using OpenAI API, keeping the reported usage.
+
+        Args:
+            messages (List[Dict[str, str]]): List of messages with role and content
+
+        Returns:
+            RunResult: Model response with token usage and latency
+        """
+        extra_args = {"response_format": {"type": "json_object"}} if self.json_mode else {}
+        limiter = self.rate_limiter
+        if limiter is not None:
+            estimated = sum(estimate_tokens(message["content"]) for message in messages)
+            reserved = limiter.acquire(estimated)
+            usage = (0, 0)
+        started = time.perf_counter()
+        try:
+            resp = self.client.chat.completions.create(
+                model=self.model_id,
+                temperature=self.temperature,
+                messages=messages,
+                **extra_args
+            )
+            if limiter is not None:
+                # Some compatible endpoints omit usage; keep the estimate then
+                usage = ((resp.usage.prompt_tokens, resp.usage.completion_tokens) if resp.usage is not None
+                         else (estimated, limiter.completion_allowance))
+        finally:
+            if limiter is not None:
+                limiter.record(reserved, *usage)
+
+        reported = getattr(resp, "usage", None)
+        return RunResult(
+            resp.choices[0].message.content.strip(),
+            latency_ms=(time.perf_counter() - started) * 1000,
+            prompt_tokens=getattr(reported, "prompt_tokens", None),
+            completion_tokens=getattr(reported, "completion_tokens", None)
         )
 
-        return resp.choices[0].message.content.strip()
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Compute embedding vectors using OpenAI embeddings API.
+
+        Args:
+            texts (List[str]): Input texts
+
+        Returns:
+            List[List[float]]: One embedding vector per text
+        """
+        resp = self.client.embeddings.create(model=self.model_id, input=texts)
+        return [item.embedding for item in sorted(resp.data, key=lambda item: item.index)]
@@ -0,0 +1,25 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : conftest.py
+
+"""Shared pytest fixtures"""
+
+import pytest
+from unittest.mock import patch
+
+
+def _fake_chat(model, messages, options, **kwargs):
+    """Fake ollama.chat returning the first three characters of the input"""
+    return {'message': {'content': messages[-1]['content'][:3]}}
+
+
+@pytest.fixture
+def fake_chat():
+    """Patch ollama.chat with a fake answering the first three characters of the input"""
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat', side_effect=_fake_chat) as mock_chat:
+        yield mock_chat
@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_batching.py
+
+"""Pytest tests for the microbatching aggregator"""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from unittest.mock import patch
+from city_parse.core import MicroBatcher, ModelSource, Parse
+
+
+def test_concurrent_submits_are_batched():
+    """Test that concurrent callers share one batch call and get their own results"""
+    calls = []
+
+    def batch_func(texts):
+        calls.append(list(texts))
+        return [text.upper() for text in texts]
+
+    with MicroBatcher(batch_func, max_batch_size=4, max_wait_ms=200) as batcher:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(batcher, ["a", "b", "c", "d"]))
+
+    assert results == ["A", "B", "C", "D"]
+    assert len(calls) == 1
+    assert sorted(calls[0]) == ["a", "b", "c", "d"]
+
+
+def test_batch_size_limit():
+    """Test that a batch never exceeds max_batch_size"""
+    sizes = []
+
+    def batch_func(texts):
+        sizes.append(len(texts))
+        return texts
+
+    with MicroBatcher(batch_func, max_batch_size=2, max_wait_ms=50) as batcher:
+        futures = [batcher.submit(str(i)) for i in range(5)]
+        assert [f.result(timeout=5) for f in futures] == ["0", "1", "2", "3", "4"]
+
+    assert max(sizes) <= 2
+    assert sum(sizes) == 5
+
+
+def test_batch_errors_reach_every_caller():
+    """Test that a failing batch raises in each waiting caller"""
+    def batch_func(texts):
+        raise RuntimeError("backend down")
+
+    with MicroBatcher(batch_func, max_wait_ms=20) as batcher:
+        futures = [batcher.submit("x"), batcher.submit("y")]
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result(timeout=5)
+
+
+def test_closed_batcher_rejects_submits():
+    """Test that submitting after close fails"""
+    batcher = MicroBatcher(lambda texts: texts)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit("x")
+
+
+def test_chat_batches_run_concurrently():
+    """Test that an unpacked batch sends its texts to a chat backend at the same time"""
+    # Both requests must be in flight together to pass the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fake_chat(model, messages, options, **kwargs):
+        barrier.wait()
+        return {'message': {'content': messages[-1]['content'][:3]}}
+
+    parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat', side_effect=fake_chat):
+        with parser.create_batcher(max_batch_size=2, max_wait_ms=200) as batcher:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                results = list(pool.map(batcher, ["北京市人民政府", "上海市人民政府"]))
+
+    assert results == ["北京市", "上海市"]
+    assert batcher.batches == 1
+
+
+def test_packed_batch_parses_json_results():
+    """Test that a packed batch is sent as one request and split back"""
+    def chat(model, messages, options, **kwargs):
+        assert kwargs.get('format') == 'json'
+        return {'message': {'content': json.dumps({'results': ["北京市", "上海市"]}, ensure_ascii=False)}}
+
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat', side_effect=chat) as mock_chat:
+        parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+        instance = parser.create_model()
+        results = instance.run_batch(["北京市人民政府", "上海市人民政府"], packed=True)
+
+    assert results == ["北京市", "上海市"]
+    assert mock_chat.call_count == 1
+    assert not instance.json_mode
+
+
+def test_packed_batch_falls_back_on_malformed_answer():
+    """Test that a malformed packed answer falls back to one request per text"""
+    def chat(model, messages, options, **kwargs):
+        if 'format' in kwargs:
+            return {'message': {'content': '{"results": ["北京市"]}'}}
+        return {'message': {'content': messages[-1]['content'][:3]}}
+
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat', side_effect=chat) as mock_chat:
+        parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+        with parser.create_batcher(max_batch_size=2, max_wait_ms=200, packed=True) as batcher:
+            futures = [batcher.submit("北京市人民政府"), batcher.submit("上海市人民政府")]
+            results = [f.result(timeout=5) for f in futures]
+
+    assert results == ["北京市", "上海市"]
+    assert mock_chat.call_count == 3
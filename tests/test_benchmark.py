@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_benchmark.py
+
+"""Pytest tests for the prompt / model benchmark harness"""
+
+import pytest
+from unittest.mock import patch
+from city_parse import main
+from city_parse.core import Benchmark, BenchmarkResult, FewShotSelector, ModelSource, Parse
+
+
+def _fake_chat(model, messages, options, **kwargs):
+    """Fake ollama.chat: the long prompt answers correctly, the short one drops the suffix"""
+    text = messages[-1]['content']
+    city = text[:text.index("市") + 1]
+    return {'message': {'content': city if "<examples>" in messages[0]['content'] else city[:-1]}}
+
+
+def _result(accuracy, tokens, latency):
+    return BenchmarkResult(model="m", prompt="p", rows=1, accuracy=accuracy, prompt_tokens=tokens,
+                           tokens_per_row=tokens, latency_ms=latency, p95_latency_ms=latency, rows_per_sec=1.0)
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.chat', side_effect=_fake_chat)
+def test_grid_reports_accuracy_and_tokens(mock_chat):
+    """Test that every combination is measured and normalization is applied"""
+    benchmark = Benchmark(["六盘水市人民政府通知", "商丘市人民政府通知"], ["六盘水市", "商丘市"])
+    results = benchmark.run_grid(["model-a", "model-b"], {"default": None, "short": "只输出城市名称。"})
+
+    assert len(results) == 4
+    assert mock_chat.call_count == 8
+    short = next(result for result in results if result.prompt == "short")
+    default = next(result for result in results if result.prompt == "default")
+    # "六盘水" and "商丘" still canonicalize to the labeled cities
+    assert short.accuracy == default.accuracy == 1.0
+    assert short.prompt_tokens < default.prompt_tokens
+    assert benchmark.cheapest(0.9).prompt == "short"
+    assert set(benchmark.to_frame()["model"]) == {"model-a", "model-b"}
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.chat', side_effect=_fake_chat)
+def test_exact_comparison_without_normalization(mock_chat):
+    """Test that exact matching penalizes the short prompt"""
+    benchmark = Benchmark(["商丘市人民政府通知"], ["商丘市"], normalize=False)
+    results = benchmark.run_grid(["model-a"], {"default": None, "short": "只输出城市名称。"})
+    assert [result.accuracy for result in results] == [1.0, 0.0]
+    assert benchmark.cheapest(0.9).prompt == "default"
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.chat', side_effect=RuntimeError("connection refused"))
+def test_failed_calls_count_as_errors(mock_chat):
+    """Test that backend error outputs are counted as errors, not as wrong answers only"""
+    benchmark = Benchmark(["商丘市人民政府通知", "六盘水市人民政府通知"], ["商丘市", "六盘水市"])
+    result = benchmark.run(Parse(model_id="model-a", source=ModelSource.OLLAMA))
+    assert result.errors == 2
+    assert result.accuracy == 0.0
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.chat', side_effect=_fake_chat)
+def test_prompt_tokens_include_selected_examples(mock_chat):
+    """Test that examples added per row by a selector are counted in the prompt size"""
+    benchmark = Benchmark(["商丘市人民政府通知"], ["商丘市"])
+    parser = Parse(model_id="model-a", source=ModelSource.OLLAMA, system_prompt="只输出城市名称。",
+                   example_selector=FewShotSelector(Parse.DEFAULT_EXAMPLES, k=2))
+    result = benchmark.run(parser)
+    assert result.prompt_tokens == parser.prompt_for("商丘市人民政府通知").token_count
+    assert result.prompt_tokens > parser.prompt.token_count
+
+
+def test_pareto_front():
+    """Test that dominated combinations are excluded"""
+    benchmark = Benchmark(["a"], ["a"])
+    benchmark.results = [_result(0.9, 100, 10), _result(0.8, 200, 20), _result(0.95, 500, 15), _result(0.7, 50, 30)]
+    benchmark._mark_pareto()
+    assert [(r.accuracy, r.prompt_tokens) for r in benchmark.pareto_front()] == [(0.7, 50), (0.9, 100), (0.95, 500)]
+
+
+def test_mismatched_dataset_is_rejected():
+    """Test that texts and labels must line up"""
+    with pytest.raises(ValueError):
+        Benchmark(["a", "b"], ["a"])
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.chat', side_effect=_fake_chat)
+def test_bench_command(mock_chat, tmp_path, capsys):
+    """Test the bench subcommand on a labeled CSV"""
+    data = tmp_path / "labeled.csv"
+    data.write_text("id,city\n商丘市人民政府通知,商丘市\n", encoding="utf-8")
+    output = tmp_path / "results.csv"
+
+    main(["bench", "--data", str(data), "--models", "model-a", "--min-accuracy", "0.5", "--output", str(output)])
+
+    printed = capsys.readouterr().out
+    assert "Pareto front" in printed
+    assert "model-a / default" in printed
+    assert output.exists()
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_candidates.py
+
+"""Pytest tests for ranked multi-city extraction"""
+
+import pytest
+from unittest.mock import patch
+from city_parse import CityCandidate, Parse
+from city_parse.core import ModelSource
+from city_parse.core.model_func import HuggingFaceFunc
+
+
+def _reply(content):
+    return {'message': {'content': content}}
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.chat')
+def test_candidates_from_one_call(mock_chat):
+    """Test that several places are ranked from a single JSON answer"""
+    mock_chat.return_value = _reply(
+        '{"candidates": [{"city": "深圳市", "score": 0.4}, {"city": "上海市", "score": 0.6}, '
+        '{"city": "上海", "score": 0.3}]}'
+    )
+    parser = Parse(model_id="qwen3:0.6b")
+    candidates = parser.parse_candidates("上海与深圳经济对比分析报告", k=3)
+
+    assert mock_chat.call_count == 1
+    assert mock_chat.call_args.kwargs['format'] == 'json'
+    assert mock_chat.call_args.kwargs['messages'][0]['content'] == Parse.CANDIDATES_SYSTEM_PROMPT
+    # "上海" and "上海市" are the same division
+    assert [candidate.name for candidate in candidates] == ["上海市", "深圳市"]
+    assert candidates[0].score == 0.6
+    assert candidates[0].division.code == "310000"
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.chat')
+def test_candidates_without_scores_use_order(mock_chat):
+    """Test that a plain list is ranked in the listed order and truncated to k"""
+    mock_chat.return_value = _reply('{"candidates": ["绍兴市", "上虞区", "浙江省"]}')
+    candidates = Parse(model_id="qwen3:0.6b").parse_candidates("绍兴市上虞区人民政府办公室通知", k=2)
+    assert candidates == [CityCandidate("绍兴市", 1.0, candidates[0].division),
+                          CityCandidate("上虞区", 0.5, candidates[1].division)]
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.chat', return_value=_reply("无法判断"))
+def test_malformed_answer_gives_no_candidates(mock_chat):
+    """Test that non-JSON output yields an empty list"""
+    assert Parse(model_id="qwen3:0.6b").parse_candidates("今日天气") == []
+
+
+def test_span_candidates_are_probabilities():
+    """Test that span extraction ranks the spans found in the text by softmax score"""
+    with patch('city_parse.core.model_func.huggingface_func._load_model', return_value=(None, None)), \
+            patch.object(HuggingFaceFunc, "score", return_value=[-2.0, -0.5]) as mock_score:
+        parser = Parse(model_id="qwen", source=ModelSource.HUGGINGFACE, span_extraction=True)
+        candidates = parser.parse_candidates("绍兴市上虞区人民政府办公室通知")
+
+    mock_score.assert_called_once()
+    assert [candidate.name for candidate in candidates] == ["上虞区", "绍兴市"]
+    assert sum(candidate.score for candidate in candidates) == pytest.approx(1.0)
+    assert candidates[0].score > 0.8
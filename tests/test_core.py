@@ -631,4 +631,67 @@ def test_parse_integration():
 @pytest.mark.integration
 def test_classify_integration():
     """Integration test for Classify class (requires actual model)"""
-    pytest.skip("Integration test requires local model or API key")
\ No newline at end of file
+    pytest.skip("Integration test requires local model or API key")
+
+
+def test_classify_hierarchical():
+    """Test coarse-to-fine classification with a category tree"""
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat') as mock_chat:
+        mock_chat.side_effect = [
+            {'message': {'content': '人才'}},
+            {'message': {'content': '引进'}},
+            {'message': {'content': '落户'}},
+        ]
+
+        categories = ["财政", "金融", "落户", "住房补贴", "职称评定", "其他"]
+        tree = {
+            "经济": ["财政", "金融"],
+            "人才": {"引进": ["落户", "住房补贴"], "培养": ["职称评定"]},
+        }
+        classifier = Classify(
+            model_id="test-model",
+            categories=categories,
+            category_tree=tree,
+            examples={"落户": ["人才落户实施细则"], "财政": ["财政预算报告"]},
+            source=ModelSource.OLLAMA
+        )
+
+        result = classifier.classify("关于人才落户的实施细则")
+        assert result == "落户"
+        assert mock_chat.call_count == 3
+
+        # Each level only lists its own options
+        prompts = [c[1]['messages'][0]['content'] for c in mock_chat.call_args_list]
+        assert "- 经济" in prompts[0] and "- 其他" in prompts[0] and "- 落户" not in prompts[0]
+        assert "- 引进" in prompts[1] and "- 财政" not in prompts[1]
+        assert "- 落户" in prompts[2] and "- 职称评定" not in prompts[2]
+        assert "人才落户实施细则" in prompts[0]
+
+
+def test_classify_hierarchical_prompt_cache_and_single_option():
+    """Test level prompts are cached and single-option levels skip the model"""
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat') as mock_chat:
+        mock_chat.return_value = {'message': {'content': '培养'}}
+
+        classifier = Classify(
+            model_id="test-model",
+            categories=["落户", "职称评定"],
+            category_tree={"引进": ["落户"], "培养": ["职称评定"]},
+            source=ModelSource.OLLAMA
+        )
+
+        assert classifier.classify("职称评定办法") == "职称评定"
+        assert classifier.classify("职称评审") == "职称评定"
+        assert mock_chat.call_count == 2
+        assert list(classifier._level_prompts) == [()]
+
+
+def test_classify_hierarchical_unknown_category():
+    """Test that trees referencing unknown categories are rejected"""
+    with pytest.raises(ValueError, match="unknown categories"):
+        Classify(
+            model_id="test-model",
+            categories=["技术"],
+            category_tree={"组": ["技术", "不存在"]},
+            source=ModelSource.OLLAMA
+        )
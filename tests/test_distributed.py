@@ -0,0 +1,232 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_distributed.py
+
+"""Pytest tests for the coordinator / worker queue mode"""
+
+import threading
+import time
+from collections import defaultdict
+
+import pytest
+from unittest.mock import patch
+from city_parse.core import Coordinator, ModelSource, Parse, RedisQueue, SQLiteQueue, Worker
+
+
+class UpperEngine:
+    """Engine returning the first three characters of each title"""
+
+    def parse_batch(self, texts):
+        return [text[:3] for text in texts]
+
+
+def _bytes(value):
+    return value if isinstance(value, bytes) else str(value).encode("utf-8")
+
+
+class FakeRedis:
+    """In-memory stand-in for redis.Redis running the queue scripts in Python"""
+
+    def __init__(self):
+        self.hashes = defaultdict(dict)
+        self.lists = defaultdict(list)
+        self.zsets = defaultdict(dict)
+
+    def hsetnx(self, key, field, value):
+        if _bytes(field) in self.hashes[key]:
+            return 0
+        self.hashes[key][_bytes(field)] = _bytes(value)
+        return 1
+
+    def hget(self, key, field):
+        return self.hashes[key].get(_bytes(field))
+
+    def hlen(self, key):
+        return len(self.hashes[key])
+
+    def hgetall(self, key):
+        return dict(self.hashes[key])
+
+    def zrem(self, key, member):
+        return int(self.zsets[key].pop(_bytes(member), None) is not None)
+
+    def pipeline(self):
+        client = self
+
+        class Pipeline:
+            def __init__(self):
+                self.calls = []
+
+            def __getattr__(self, name):
+                return lambda *args: self.calls.append((name, args))
+
+            def execute(self):
+                return [getattr(client, name)(*args) for name, args in self.calls]
+
+        return Pipeline()
+
+    def register_script(self, script):
+        run = {RedisQueue._LEASE_SCRIPT: self._lease, RedisQueue._SUBMIT_SCRIPT: self._submit}[script]
+        return lambda keys, args: run(keys, args)
+
+    def _submit(self, keys, args):
+        added = 0
+        for field, value in zip(args[::2], args[1::2]):
+            if self.hsetnx(keys[0], field, value):
+                self.lists[keys[1]].append(_bytes(field))
+                added += 1
+        return added
+
+    def _lease(self, keys, args):
+        pending, leases, results = keys
+        now, expires = args
+        for chunk_id, score in list(self.zsets[leases].items()):
+            if score <= now:
+                del self.zsets[leases][chunk_id]
+                if chunk_id not in self.hashes[results]:
+                    self.lists[pending].append(chunk_id)
+        if not self.lists[pending]:
+            return None
+        chunk_id = self.lists[pending].pop(0)
+        self.zsets[leases][chunk_id] = expires
+        return chunk_id
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteQueue(str(tmp_path / "queue.db"))
+
+
+@pytest.fixture
+def redis_queue():
+    return RedisQueue(client=FakeRedis())
+
+
+def test_coordinator_and_workers_merge_in_order(queue):
+    """Test that several workers process all chunks and results merge in order"""
+    titles = [f"{i:03d}号文件" for i in range(95)]
+    coordinator = Coordinator(queue, job_id="job-1")
+    assert coordinator.submit(titles, chunk_size=10) == 10
+
+    workers = [Worker(queue, "job-1", UpperEngine(), worker_id=f"w{i}") for i in range(3)]
+    threads = [threading.Thread(target=worker.run, kwargs={"poll_interval": 0.01}) for worker in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    coordinator.wait(poll_interval=0.01, timeout=5)
+    assert coordinator.collect() == [title[:3] for title in titles]
+
+
+def test_expired_lease_is_requeued(queue):
+    """Test that a chunk leased by a dead worker is handed out again"""
+    coordinator = Coordinator(queue, job_id="job-2")
+    coordinator.submit(["北京市报告", "上海市规划"], chunk_size=1)
+
+    # Worker leases a chunk, then dies without completing it
+    dead = queue.lease("job-2", "dead-worker", lease_seconds=-1)
+    assert dead.chunk_id == 0
+
+    worker = Worker(queue, "job-2", UpperEngine(), worker_id="alive")
+    assert worker.run(poll_interval=0.01) == 2
+    assert coordinator.collect() == ["北京市", "上海市"]
+
+
+def test_active_lease_is_not_stolen(queue):
+    """Test that unexpired leases are not handed to another worker"""
+    Coordinator(queue, job_id="job-3").submit(["a"], chunk_size=1)
+    assert queue.lease("job-3", "w1", lease_seconds=60) is not None
+    assert queue.lease("job-3", "w2", lease_seconds=60) is None
+
+
+def test_collect_before_done_raises(queue):
+    """Test collecting an unfinished job"""
+    coordinator = Coordinator(queue, job_id="job-4")
+    coordinator.submit(["a", "b"], chunk_size=1)
+    with pytest.raises(RuntimeError, match="not finished"):
+        coordinator.collect()
+    with pytest.raises(TimeoutError):
+        coordinator.wait(poll_interval=0.01, timeout=0.05)
+
+
+def test_worker_with_parse(queue):
+    """Test a worker driving Parse.parse_batch"""
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat') as mock_chat:
+        mock_chat.return_value = {'message': {'content': '北京市'}}
+
+        coordinator = Coordinator(queue, job_id="job-5")
+        coordinator.submit(["北京市人民政府工作报告"] * 3, chunk_size=2)
+
+        parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+        Worker(queue, "job-5", parser).run(poll_interval=0.01)
+
+        assert coordinator.collect() == ["北京市"] * 3
+        assert mock_chat.call_count == 3
+
+
+def test_worker_started_before_submit_waits(queue):
+    """Test that a worker started ahead of the coordinator waits for the job"""
+    worker = Worker(queue, "job-6", UpperEngine(), worker_id="early")
+    processed = []
+    thread = threading.Thread(target=lambda: processed.append(worker.run(poll_interval=0.01)))
+    thread.start()
+    time.sleep(0.05)
+    assert thread.is_alive()
+
+    coordinator = Coordinator(queue, job_id="job-6")
+    coordinator.submit(["北京市报告", "上海市规划"], chunk_size=1)
+    thread.join(timeout=5)
+    assert processed == [2]
+    assert coordinator.collect() == ["北京市", "上海市"]
+
+
+def test_redis_queue_round_trip(redis_queue):
+    """Test leasing, completing and merging through the Redis queue"""
+    coordinator = Coordinator(redis_queue, job_id="job-r1")
+    titles = [f"{i:02d}号文件" for i in range(25)]
+    assert coordinator.submit(titles, chunk_size=10) == 3
+
+    assert Worker(redis_queue, "job-r1", UpperEngine()).run(poll_interval=0.01) == 3
+    assert coordinator.collect() == [title[:3] for title in titles]
+
+
+def test_redis_expired_lease_is_requeued(redis_queue):
+    """Test that a chunk leased by a dead worker is handed out again"""
+    Coordinator(redis_queue, job_id="job-r2").submit(["北京市报告", "上海市规划"], chunk_size=1)
+    assert redis_queue.lease("job-r2", "dead-worker", lease_seconds=-1).chunk_id == 0
+    assert redis_queue.lease("job-r2", "w1", lease_seconds=60).chunk_id == 1
+    # Only the expired lease comes back
+    assert redis_queue.lease("job-r2", "w2", lease_seconds=60).chunk_id == 0
+    assert redis_queue.lease("job-r2", "w3", lease_seconds=60) is None
+
+
+def test_redis_first_completion_wins(redis_queue):
+    """Test that a late duplicate completion does not overwrite results"""
+    coordinator = Coordinator(redis_queue, job_id="job-r3")
+    coordinator.submit(["北京市报告"], chunk_size=1)
+    chunk = redis_queue.lease("job-r3", "slow", lease_seconds=-1)
+    redis_queue.complete("job-r3", chunk.chunk_id, ["北京市"])
+    redis_queue.complete("job-r3", chunk.chunk_id, ["错误"])
+
+    assert redis_queue.lease("job-r3", "w2", lease_seconds=60) is None
+    assert coordinator.collect() == ["北京市"]
+
+
+@pytest.mark.parametrize("queue_fixture", ["queue", "redis_queue"])
+def test_resubmit_is_idempotent(queue_fixture, request):
+    """Test that submitting the same job again, e.g. after a coordinator restart, adds no chunks"""
+    work_queue = request.getfixturevalue(queue_fixture)
+    titles = ["北京市报告", "上海市规划", "天津市方案"]
+    Coordinator(work_queue, job_id="job-7").submit(titles, chunk_size=1)
+    restarted = Coordinator(work_queue, job_id="job-7")
+    restarted.submit(titles, chunk_size=1)
+
+    assert work_queue.progress("job-7") == {"total": 3, "done": 0}
+    assert Worker(work_queue, "job-7", UpperEngine()).run(poll_interval=0.01) == 3
+    assert restarted.collect() == ["北京市", "上海市", "天津市"]
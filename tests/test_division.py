@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_division.py
+
+"""Pytest tests for administrative division validation and canonicalization"""
+
+import pytest
+from unittest.mock import patch
+from city_parse.core import Division, DivisionTable, ModelSource, Parse
+from city_parse.core._division import clean_output, short_name
+
+
+@pytest.fixture
+def table():
+    """Bundled division table"""
+    return DivisionTable.default()
+
+
+def test_default_table_loaded_once(table):
+    """Test that the bundled table is shared and non-empty"""
+    assert DivisionTable.default() is table
+    assert len(table) > 3000
+
+
+@pytest.mark.parametrize("raw,expected", [
+    ("<think>标题里提到了北京</think>\n北京市", "北京市"),
+    ("“上海市”。", "上海市"),
+    ("<output>龙州县</output>", "龙州县"),
+    ("未能提取到城市名称", ""),
+    ("API调用失败", ""),
+    ("", ""),
+])
+def test_clean_output(raw, expected):
+    """Test cleaning of raw model outputs"""
+    assert clean_output(raw) == expected
+
+
+@pytest.mark.parametrize("name,expected", [
+    ("广西壮族自治区", "广西"),
+    ("黔东南苗族侗族自治州", "黔东南"),
+    ("六盘水市", "六盘水"),
+    ("香港特别行政区", "香港"),
+])
+def test_short_name(name, expected):
+    """Test suffix and ethnic group stripping"""
+    assert short_name(name) == expected
+
+
+@pytest.mark.parametrize("raw,code,name", [
+    ("北京市", "110000", "北京市"),
+    ("六盘水", "520200", "六盘水市"),
+    ("内蒙古", "150000", "内蒙古自治区"),
+    ("上海市徐汇区", "310000", "上海市"),
+    ("上海徐汇区", "310000", "上海市"),
+    ("龙州县。", "451423", "龙州县"),
+])
+def test_canonicalize(table, raw, code, name):
+    """Test mapping of model outputs to canonical divisions"""
+    division = table.canonicalize(raw)
+    assert division == Division(code, name)
+
+
+@pytest.mark.parametrize("raw", [
+    "阿斯加德市", "API调用失败", "<think>不确定</think>", "中国", "北京大学", "中山大学", "南京路",
+])
+def test_canonicalize_rejects_unknown(table, raw):
+    """Test that hallucinated places and error sentinels are rejected"""
+    assert table.canonicalize(raw) is None
+
+
+def test_hierarchy(table):
+    """Test parent resolution including municipality districts"""
+    county = table.lookup("龙州县")
+    assert county.level == "county"
+    assert table.parent(county).name == "崇左市"
+    assert table.province(county).name == "广西壮族自治区"
+
+    district = table.lookup("徐汇区")
+    assert table.parent(district).name == "上海市"
+    assert table.parent(table.lookup("上海市")) is None
+
+
+def test_lookup_with_parent(table):
+    """Test disambiguation of duplicate names by ancestor"""
+    jilin = table.lookup("吉林省")
+    assert table.lookup("朝阳区", parent=jilin).code.startswith("22")
+    assert table.lookup("朝阳区", parent=table.lookup("北京市")).code.startswith("11")
+
+
+def test_parse_validated():
+    """Test Parse.parse_validated returns structured canonical results"""
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat') as mock_chat:
+        mock_chat.return_value = {
+            'message': {'content': '<think>...</think>六盘水'}
+        }
+
+        parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+        result = parser.parse_validated("六盘水市人民政府办公室关于印发计划的通知")
+
+        assert result.valid
+        assert result.name == "六盘水市"
+        assert result.code == "520200"
+        assert result.level == "prefecture"
+        assert result.raw == "<think>...</think>六盘水"
+
+
+def test_parse_validated_rejects_error_output():
+    """Test that backend errors produce invalid results instead of fake places"""
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat') as mock_chat:
+        mock_chat.side_effect = Exception("connection refused")
+
+        parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+        result = parser.parse_validated("某标题")
+
+        assert not result.valid
+        assert result.name is None
+        assert result.code is None
+
+
+def test_parse_structured_single_call():
+    """Test province / city / county extraction uses one JSON-mode call"""
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat') as mock_chat:
+        mock_chat.return_value = {
+            'message': {'content': '{"province": "广西壮族自治区", "city": "崇左市", "county": "龙州县"}'}
+        }
+
+        parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+        result = parser.parse_structured("中共龙州县委员会办公室关于印发行动计划的通知")
+
+        assert result.province.code == "450000"
+        assert result.city.code == "451400"
+        assert result.county.code == "451423"
+        assert result.finest.name == "龙州县"
+        mock_chat.assert_called_once()
+        assert mock_chat.call_args[1]['format'] == 'json'
+        system_message = mock_chat.call_args[1]['messages'][0]
+        assert system_message['content'] == Parse.STRUCTURED_SYSTEM_PROMPT
+
+
+@pytest.mark.parametrize("content,province,city,county", [
+    ('{"province": null, "city": null, "county": "龙州县"}', "广西壮族自治区", "崇左市", "龙州县"),
+    ('{"province": null, "city": "商丘", "county": null}', "河南省", "商丘市", None),
+    ('{"province": "上海市", "city": null, "county": "徐汇区"}', "上海市", "上海市", "徐汇区"),
+    ('{"province": "湖北省", "city": null, "county": "神农架林区"}', "湖北省", None, "神农架林区"),
+    ('{"province": "吉林省", "city": null, "county": "朝阳区"}', "吉林省", "长春市", "朝阳区"),
+    ('<think>嗯</think>{"city": "龙州县"}', "广西壮族自治区", "崇左市", "龙州县"),
+])
+def test_parse_structured_fills_parents(content, province, city, county):
+    """Test missing levels are filled from the local hierarchy without extra calls"""
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat') as mock_chat:
+        mock_chat.return_value = {'message': {'content': content}}
+
+        parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+        result = parser.parse_structured("测试标题")
+
+        assert (result.province.name if result.province else None) == province
+        assert (result.city.name if result.city else None) == city
+        assert (result.county.name if result.county else None) == county
+        assert mock_chat.call_count == 1
+
+
+def test_parse_structured_invalid_json():
+    """Test malformed output produces an empty result"""
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat') as mock_chat:
+        mock_chat.return_value = {'message': {'content': '无法确定'}}
+
+        parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+        result = parser.parse_structured("测试标题")
+
+        assert not result.valid
+        assert result.finest is None
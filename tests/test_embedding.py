@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_embedding.py
+
+"""Pytest tests for embedding-based nearest-neighbour classification"""
+
+import pytest
+from unittest.mock import Mock, patch
+from city_parse.core import EmbeddingClassify, ModelSource
+
+# Toy embedding space: one axis per topic keyword
+KEYWORDS = ["金融", "人才", "交通"]
+
+
+def fake_embed(model, input):
+    """Embed texts as keyword counts plus a small constant"""
+    return {'embeddings': [[text.count(word) + 0.01 for word in KEYWORDS] for text in input]}
+
+
+@pytest.fixture
+def mock_embed():
+    with patch('city_parse.core.model_func.ollama_func.ollama.embed', side_effect=fake_embed) as embed:
+        yield embed
+
+
+def test_embedding_classify_batch(mock_embed):
+    """Test batch classification uses one embedding call per batch"""
+    classifier = EmbeddingClassify(
+        model_id="bge-m3",
+        categories=["金融政策", "人才政策", "交通规划"],
+        examples={"人才政策": ["人才引进实施细则"]},
+        source=ModelSource.OLLAMA
+    )
+    assert mock_embed.call_count == 1
+
+    results = classifier.classify_batch(["金融改革方案", "高层次人才补贴", "城市交通建设"])
+
+    assert results == ["金融政策", "人才政策", "交通规划"]
+    assert mock_embed.call_count == 2
+
+
+def test_embedding_classify_top_k_and_confidence(mock_embed):
+    """Test scores double as confidence and top-k ordering"""
+    classifier = EmbeddingClassify(
+        model_id="bge-m3",
+        categories=["金融政策", "人才政策", "交通规划"],
+        source=ModelSource.OLLAMA
+    )
+
+    info = classifier.classify_with_confidence("金融人才金融")
+    assert info['category'] == "金融政策"
+    assert 0 < info['confidence'] <= 1
+    assert info['fallback'] is False
+
+    top = classifier.top_k(["金融人才金融"], k=2)[0]
+    assert [category for category, _ in top] == ["金融政策", "人才政策"]
+    assert top[0][1] >= top[1][1]
+
+
+def test_embedding_classify_low_margin_fallback(mock_embed):
+    """Test that low-margin items are sent to the generative fallback"""
+    fallback = Mock()
+    fallback.classify.return_value = "人才政策"
+
+    classifier = EmbeddingClassify(
+        model_id="bge-m3",
+        categories=["金融政策", "人才政策", "交通规划"],
+        source=ModelSource.OLLAMA,
+        fallback=fallback,
+        min_margin=0.1
+    )
+
+    results = classifier.classify_batch_with_confidence(["金融人才", "交通"])
+
+    assert results[0]['fallback'] is True
+    assert results[0]['category'] == "人才政策"
+    assert results[1]['fallback'] is False
+    assert results[1]['category'] == "交通规划"
+    fallback.classify.assert_called_once_with("金融人才")
+
+
+def test_embedding_classify_empty_input(mock_embed):
+    """Test empty inputs"""
+    classifier = EmbeddingClassify(model_id="bge-m3", categories=["金融政策"], source=ModelSource.OLLAMA)
+    assert classifier.classify_batch([]) == []
+    with pytest.raises(ValueError, match="Input text cannot be empty"):
+        classifier.classify("  ")
@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_fewshot.py
+
+"""Pytest tests for similarity-based few-shot selection"""
+
+import pickle
+
+import pytest
+from unittest.mock import patch
+from city_parse.core import Classify, Example, FewShotSelector, ModelSource, Parse
+from city_parse.core._parallel import run_batch
+
+
+BANK = [
+    ("中共龙州县委员会办公室关于印发工作方案的通知", "龙州县"),
+    ("商丘市人民政府办公室关于印发行动计划的通知", "商丘市"),
+    ("河北省数据和政务服务局对提案的答复", "河北省"),
+    ("内蒙古自治区人力资源和社会保障厅对建议的答复", "内蒙古自治区"),
+]
+
+
+def test_selects_most_similar_examples():
+    """Test that the nearest examples by character n-grams come first"""
+    selector = FewShotSelector(BANK, k=2)
+    selected = selector.select("中共凤山县委员会办公室关于印发实施方案的通知")
+
+    assert len(selected) == 2
+    assert selected[0] == Example(*BANK[0])
+
+
+def test_selection_is_cached_per_cluster():
+    """Test that inputs sharing their rarest n-grams reuse one selection"""
+    selector = FewShotSelector(BANK, k=1)
+    first = selector.select("河北省数据和政务服务局对提案的答复第一号")
+    second = selector.select("河北省数据和政务服务局对提案的答复第二号")
+
+    assert first == second
+    assert selector.misses == 1
+    assert selector.hits == 1
+
+
+def test_unrelated_input_falls_back_to_bank_order():
+    """Test that inputs without shared n-grams still get k examples"""
+    selector = FewShotSelector(BANK, k=2)
+    assert selector.select("xyz") == (Example(*BANK[0]), Example(*BANK[1]))
+
+
+class NearestEngine:
+    """Picklable engine answering with the output of the nearest example"""
+
+    def __init__(self, selector):
+        self.selector = selector
+
+    def create_model(self):
+        pass
+
+    def parse(self, text):
+        return self.selector.select(text, k=1)[0].output
+
+
+def test_selector_survives_process_workers():
+    """Test that a selector is picklable and usable in process workers"""
+    selector = FewShotSelector(BANK, k=1)
+    selector.select(BANK[0][0])
+    parser = Parse(model_id="test-model", source=ModelSource.OLLAMA, example_selector=selector)
+
+    restored = pickle.loads(pickle.dumps(parser))
+    assert restored.example_selector.select(BANK[1][0]) == (Example(*BANK[1]),)
+
+    texts = [text for text, _ in BANK] * 3
+    results = run_batch(NearestEngine(selector), "parse", texts, workers=2, executor="process", threads_per_worker=1)
+    assert results == [output for _, output in BANK] * 3
+
+
+def test_empty_bank_is_rejected():
+    """Test that a selector needs examples"""
+    with pytest.raises(ValueError):
+        FewShotSelector([])
+
+
+def test_default_prompt_lists_default_examples():
+    """Test that the default prompt is built from DEFAULT_EXAMPLES"""
+    assert len(Parse.DEFAULT_EXAMPLES) == 11
+    for example in Parse.DEFAULT_EXAMPLES:
+        assert f"<input>{example.input}</input>" in Parse.DEFAULT_SYSTEM_PROMPT
+    assert Parse.DEFAULT_SYSTEM_PROMPT.startswith(Parse.BASE_SYSTEM_PROMPT)
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.chat')
+def test_parse_sends_selected_examples_only(mock_chat):
+    """Test that Parse uses the selected examples instead of all defaults"""
+    mock_chat.return_value = {'message': {'content': '凤山县'}}
+    selector = FewShotSelector(Parse.DEFAULT_EXAMPLES, k=2)
+    parser = Parse(model_id="test-model", source=ModelSource.OLLAMA, example_selector=selector)
+
+    assert parser.parse("中共凤山县委员会办公室关于印发通知") == "凤山县"
+    system_prompt = mock_chat.call_args.kwargs['messages'][0]['content']
+    assert system_prompt.count("<example>") == 2
+    assert "龙州县" in system_prompt
+    assert len(system_prompt) < len(Parse.DEFAULT_SYSTEM_PROMPT)
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.chat')
+def test_classify_with_selector(mock_chat):
+    """Test that Classify lists only the selected examples"""
+    mock_chat.return_value = {'message': {'content': '财政'}}
+    bank = {"财政": ["财政预算报告", "政府债务管理办法"], "落户": ["人才落户实施细则", "户籍制度改革意见"]}
+    classifier = Classify(
+        model_id="test-model",
+        categories=["财政", "落户"],
+        source=ModelSource.OLLAMA,
+        example_selector=FewShotSelector.from_category_examples(bank, k=1)
+    )
+
+    assert "分类示例" not in classifier.system_prompt
+    assert classifier.classify("年度财政预算执行情况") == "财政"
+    system_prompt = mock_chat.call_args.kwargs['messages'][0]['content']
+    assert "财政预算报告" in system_prompt
+    assert "人才落户实施细则" not in system_prompt
@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_history.py
+
+"""Pytest tests for bounded conversation history"""
+
+import pytest
+from unittest.mock import Mock, patch
+from city_parse.core import HistoryPolicy, Model, ModelConfig, ModelSource
+from city_parse.core.model_func import estimate_tokens
+from city_parse.core.model_func.openai_func import OpenAIFunc
+
+
+@pytest.fixture
+def mock_client():
+    """Mocked OpenAI client returning a fixed answer"""
+    with patch('city_parse.core.model_func.openai_func.OpenAI') as mock_openai:
+        client = Mock()
+        mock_openai.return_value = client
+        response = Mock()
+        response.choices = [Mock()]
+        response.choices[0].message.content = "上海市"
+        client.chat.completions.create.return_value = response
+        yield client
+
+
+def test_estimate_tokens():
+    """Test the fallback token estimator"""
+    assert estimate_tokens("北京市") == 3
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("") == 0
+
+
+def test_max_turns_sliding_window(mock_client):
+    """Test that only the most recent turns are kept"""
+    func = OpenAIFunc(model_id="gpt-3.5-turbo", api_key="test-key",
+                      history_policy=HistoryPolicy(max_turns=2))
+
+    for i in range(10):
+        func.run(f"标题{i}", save_to_history=True)
+
+    history = func.get_history()
+    assert len(history) == 4
+    assert history[0] == {"role": "user", "content": "标题8"}
+    assert history[2] == {"role": "user", "content": "标题9"}
+
+
+def test_pinned_messages_survive_trimming(mock_client):
+    """Test that pinned few-shot turns are never dropped"""
+    func = OpenAIFunc(model_id="gpt-3.5-turbo", api_key="test-key",
+                      history_policy=HistoryPolicy(max_turns=1))
+    func.add_history("user", "武汉市长江大桥正式通车", pinned=True)
+    func.add_history("assistant", "武汉市", pinned=True)
+
+    for i in range(5):
+        func.run(f"标题{i}", save_to_history=True)
+
+    history = func.get_history()
+    assert [msg["content"] for msg in history] == ["武汉市长江大桥正式通车", "武汉市", "标题4", "上海市"]
+
+    # Request size stays constant: system prompt + pinned + one turn + new message
+    func.run("新标题", save_to_history=True)
+    messages = mock_client.chat.completions.create.call_args[1]['messages']
+    assert len(messages) == 5
+
+    func.clear_history(keep_pinned=True)
+    assert len(func.get_history()) == 2
+
+
+def test_max_tokens_budget(mock_client):
+    """Test that history is trimmed to the token budget with a custom tokenizer"""
+    policy = HistoryPolicy(max_tokens=10, tokenizer=len)
+    func = OpenAIFunc(model_id="gpt-3.5-turbo", api_key="test-key", history_policy=policy)
+
+    for i in range(20):
+        func.run(f"标题{i:02d}", save_to_history=True)
+
+    history = func.get_history()
+    assert sum(len(msg["content"]) for msg in history) <= 10
+    assert history[-1]["content"] == "上海市"
+    assert history[-2]["content"] == "标题19"
+
+
+def test_unbounded_by_default(mock_client):
+    """Test that history is unbounded without a policy"""
+    func = OpenAIFunc(model_id="gpt-3.5-turbo", api_key="test-key")
+    for i in range(10):
+        func.run(f"标题{i}", save_to_history=True)
+    assert len(func.get_history()) == 20
+
+
+def test_policy_from_model_config(mock_client):
+    """Test that ModelConfig passes the history policy to instances"""
+    config = ModelConfig(model_id="gpt-3.5-turbo", source=ModelSource.OPENAI, api_key="test-key",
+                         history_policy=HistoryPolicy(max_turns=3))
+    instance = Model(config).create_instance()
+    assert instance.history_policy.max_turns == 3
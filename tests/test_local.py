@@ -0,0 +1,255 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_local.py
+
+"""Pytest tests for the local transformers and llama.cpp backends"""
+
+import contextlib
+import sys
+import types
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from city_parse.core import Benchmark, ModelSource, Parse
+from city_parse.core.model_func import HuggingFaceFunc, huggingface_func, llama_cpp_func
+
+
+@pytest.fixture(autouse=True)
+def clear_model_caches():
+    """Every test loads its own fake models"""
+    huggingface_func._MODEL_CACHE.clear()
+    llama_cpp_func._MODEL_CACHE.clear()
+    yield
+    huggingface_func._MODEL_CACHE.clear()
+    llama_cpp_func._MODEL_CACHE.clear()
+
+
+def _fake_llama_cpp(answer="商丘市"):
+    """Fake llama_cpp module whose models always give the same answer"""
+    model = MagicMock()
+    model.create_chat_completion.return_value = {"choices": [{"message": {"content": f" {answer} "}}]}
+    module = types.ModuleType("llama_cpp")
+    module.Llama = MagicMock(return_value=model)
+    module.Llama.from_pretrained = MagicMock(return_value=model)
+    return module, model
+
+
+class _Encoding(dict):
+    """Tokenizer output that can be moved to a device"""
+
+    def to(self, device):
+        return self
+
+
+class _Tokenizer:
+    """Character-level tokenizer over a fixed alphabet"""
+    pad_token = None
+    eos_token = "<eos>"
+    pad_token_id = 0
+    eos_token_id = 1
+
+    def __init__(self):
+        self.alphabet = ["<pad>", "<eos>"]
+
+    def _id(self, char):
+        if char not in self.alphabet:
+            self.alphabet.append(char)
+        return self.alphabet.index(char)
+
+    def apply_chat_template(self, messages, tokenize=False, add_generation_prompt=True):
+        return messages[-1]["content"]
+
+    def __call__(self, prompts, return_tensors="pt", padding=True, add_special_tokens=True):
+        if isinstance(prompts, str):
+            return {"input_ids": [self._id(char) for char in prompts]}
+        width = max(len(prompt) for prompt in prompts)
+        rows = [[0] * (width - len(prompt)) + [self._id(char) for char in prompt] for prompt in prompts]
+        return _Encoding(input_ids=np.array(rows))
+
+    def batch_decode(self, rows, skip_special_tokens=True):
+        return ["".join(self.alphabet[i] for i in row if i) for row in rows]
+
+
+class _Model:
+    """Causal LM answering with the input up to and including the first 市"""
+    device = "cpu"
+    # Answer preferred when scoring candidates
+    answer = "临沂市"
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.generate_args = []
+
+    def to(self, device):
+        return self
+
+    def eval(self):
+        return self
+
+    def __call__(self, input_ids, attention_mask):
+        """Logits favoring every next token that belongs to the expected answer or ends it"""
+        favored = {self.tokenizer._id(char) for char in self.answer} | {self.tokenizer.eos_token_id}
+        logits = np.zeros(input_ids.shape + (64,))
+        for row, position in np.ndindex(input_ids.shape[0], input_ids.shape[1] - 1):
+            token = input_ids[row, position + 1]
+            if token in favored:
+                logits[row, position, token] = 10.0
+        return types.SimpleNamespace(logits=logits)
+
+    def generate(self, input_ids, **kwargs):
+        self.generate_args.append(kwargs)
+        answers = []
+        for row in input_ids:
+            text = "".join(self.tokenizer.alphabet[i] for i in row if i)
+            answers.append([self.tokenizer._id(char) for char in text[:text.index("市") + 1]])
+        width = max(len(answer) for answer in answers)
+        answers = [answer + [0] * (width - len(answer)) for answer in answers]
+        return np.concatenate([input_ids, np.array(answers)], axis=1)
+
+
+def _fake_transformers():
+    """Fake torch and transformers modules"""
+    tokenizer = _Tokenizer()
+    model = _Model(tokenizer)
+    torch = types.ModuleType("torch")
+    torch.float32 = "float32"
+    torch.qint8 = "qint8"
+    torch.nn = types.SimpleNamespace(Linear=object)
+    torch.inference_mode = contextlib.nullcontext
+    torch.tensor = lambda data, device=None: np.array(data)
+    torch.log_softmax = lambda logits, dim: logits - np.log(np.exp(logits).sum(axis=dim, keepdims=True))
+    torch.ao = types.SimpleNamespace(quantization=types.SimpleNamespace(
+        quantize_dynamic=MagicMock(side_effect=lambda model, layers, dtype: model)
+    ))
+    transformers = types.ModuleType("transformers")
+    transformers.AutoTokenizer = MagicMock()
+    transformers.AutoTokenizer.from_pretrained.return_value = tokenizer
+    transformers.AutoModelForCausalLM = MagicMock()
+    transformers.AutoModelForCausalLM.from_pretrained.return_value = model
+    transformers.BitsAndBytesConfig = MagicMock()
+    transformers.StoppingCriteria = object
+    transformers.StoppingCriteriaList = list
+    return {"torch": torch, "transformers": transformers}, model
+
+
+def test_llama_cpp_source_loads_gguf_once():
+    """Test that GGUF models are selected in ModelConfig and shared across instances"""
+    module, model = _fake_llama_cpp()
+    with patch.dict(sys.modules, {"llama_cpp": module}):
+        parser = Parse(model_id="Qwen/Qwen2.5-1.5B-Instruct-GGUF", source=ModelSource.LLAMA_CPP,
+                       gguf_file="*q4_k_m.gguf", n_threads=4)
+        assert parser.parse("商丘市人民政府关于印发…") == "商丘市"
+        parser.parse("商丘市人民政府办公室通知")
+
+    module.Llama.from_pretrained.assert_called_once()
+    assert module.Llama.from_pretrained.call_args.kwargs["filename"] == "*q4_k_m.gguf"
+    assert module.Llama.from_pretrained.call_args.kwargs["n_threads"] == 4
+    messages = model.create_chat_completion.call_args.kwargs["messages"]
+    assert messages[0]["role"] == "system"
+
+
+def test_llama_cpp_requires_package():
+    """Test that a missing llama-cpp-python raises a helpful ImportError"""
+    with patch.dict(sys.modules, {"llama_cpp": None}):
+        with pytest.raises(ImportError, match="llama-cpp-python"):
+            Parse(model_id="model.gguf", source=ModelSource.LLAMA_CPP).parse("商丘市人民政府通知")
+
+
+def test_huggingface_int8_quantizes_linear_layers():
+    """Test that int8 on CPU applies dynamic quantization and batches generation"""
+    modules, model = _fake_transformers()
+    with patch.dict(sys.modules, modules):
+        func = HuggingFaceFunc("Qwen/Qwen2.5-1.5B-Instruct", quantization="int8", temperature=0,
+                               prompt_lookup_num_tokens=None)
+        again = HuggingFaceFunc("Qwen/Qwen2.5-1.5B-Instruct", quantization="int8")
+        assert func.run_batch(["商丘市人民政府通知", "六盘水市人民政府通知"]) == ["商丘市", "六盘水市"]
+
+    assert again.model is func.model
+    modules["torch"].ao.quantization.quantize_dynamic.assert_called_once()
+    modules["transformers"].BitsAndBytesConfig.assert_not_called()
+    # One generate() call for the whole batch, greedy at temperature 0
+    assert len(model.generate_args) == 1
+    assert model.generate_args[0]["do_sample"] is False
+
+
+def test_huggingface_prompt_lookup_keeps_batches():
+    """Test that drafts are copied from the input for single calls while batches stay batched"""
+    modules, model = _fake_transformers()
+    with patch.dict(sys.modules, modules):
+        func = HuggingFaceFunc("Qwen/Qwen2.5-1.5B-Instruct")
+        assert func.run("商丘市人民政府通知") == "商丘市"
+        assert func.run_batch(["商丘市人民政府通知", "六盘水市人民政府通知"]) == ["商丘市", "六盘水市"]
+
+    single, batch = model.generate_args
+    assert single["prompt_lookup_num_tokens"] == 10
+    assert "prompt_lookup_num_tokens" not in batch
+    # Early exit is off unless Parse enables it
+    assert "stopping_criteria" not in single
+
+
+def test_parse_early_exit_stops_on_complete_division_names():
+    """Test that Parse stops local generation only once the answer is a full division name"""
+    modules, model = _fake_transformers()
+    with patch.dict(sys.modules, modules):
+        parser = Parse(model_id="qwen", source=ModelSource.HUGGINGFACE)
+        assert parser.parse("商丘市人民政府通知") == "商丘市"
+        func = parser.model.create_instance(json_mode=True)
+        func.run("商丘市人民政府通知")
+        tokenizer = func.tokenizer
+        replies = ["市", "沙市", "沙市区", "城市", "市中区"]
+        width = max(len(reply) for reply in replies)
+        rows = np.array([[0] * (width - len(reply)) + [tokenizer._id(char) for char in reply] for reply in replies])
+        criteria = huggingface_func._complete_answer_criteria(tokenizer, 0, parser.config.early_exit)
+        stops = criteria[0](rows, None)
+
+    assert "stopping_criteria" in model.generate_args[0]
+    assert "stopping_criteria" not in model.generate_args[1]
+    assert list(stops) == [False, False, True, False, True]
+    assert Parse(model_id="qwen", source=ModelSource.HUGGINGFACE, early_exit=False).config.early_exit is None
+
+
+def test_huggingface_scores_candidates_in_one_pass():
+    """Test that span candidates are ranked by log-probability without generation"""
+    modules, model = _fake_transformers()
+    with patch.dict(sys.modules, modules):
+        parser = Parse(model_id="qwen", source=ModelSource.HUGGINGFACE, span_extraction=True)
+        title = "山西省临沂市人民政府办公厅关于印发临沂市金融业发展规划的通知"
+        scores = parser.model.create_instance().score(title, ["山西省", "临沂市"])
+        assert scores[1] > scores[0]
+        assert parser.parse(title) == "临沂市"
+
+    assert model.generate_args == []
+
+
+def test_span_extraction_requires_local_model():
+    """Test that chat APIs without scoring are rejected up front"""
+    with pytest.raises(ValueError, match="Span extraction"):
+        Parse(model_id="qwen3:0.6b", source=ModelSource.OLLAMA, span_extraction=True)
+
+
+def test_huggingface_rejects_unknown_quantization():
+    """Test that only the documented quantization modes are accepted"""
+    with pytest.raises(ValueError, match="quantization"):
+        HuggingFaceFunc("Qwen/Qwen2.5-1.5B-Instruct", quantization="int3")
+
+
+def test_benchmark_labels_quantization_variants():
+    """Test that benchmark grids compare quantized variants of one model"""
+    modules, _ = _fake_transformers()
+    benchmark = Benchmark(["商丘市人民政府通知"], ["商丘市"])
+    with patch.dict(sys.modules, modules):
+        results = benchmark.run_grid(
+            [("qwen", ModelSource.HUGGINGFACE, {"quantization": None}),
+             ("qwen", ModelSource.HUGGINGFACE, {"quantization": "int8"})],
+            {"default": None}
+        )
+
+    assert [result.model for result in results] == ["qwen (quantization=None)", "qwen (quantization=int8)"]
+    assert all(result.accuracy == 1.0 for result in results)
@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_parallel.py
+
+"""Pytest tests for thread and process batch execution"""
+
+import os
+
+import pytest
+from unittest.mock import patch
+from city_parse.core import ModelSource, Parse
+from city_parse.core._parallel import _shards, run_batch
+
+
+class EchoEngine:
+    """Picklable engine that reports which process handled each row"""
+
+    def __init__(self):
+        self.loaded = 0
+
+    def create_model(self):
+        self.loaded += 1
+
+    def parse(self, text):
+        return f"{text}|{os.getpid()}|{self.loaded}|{os.environ.get('OMP_NUM_THREADS')}"
+
+
+def test_shards_are_contiguous():
+    """Test row-range sharding covers all rows in order"""
+    texts = [str(i) for i in range(10)]
+    shards = _shards(texts, 4)
+    assert [row for shard in shards for row in shard] == texts
+    assert len(shards) == 4
+
+
+def test_parse_batch_threads_preserves_order():
+    """Test thread execution keeps input order"""
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat') as mock_chat:
+        mock_chat.side_effect = lambda model, messages, options: {
+            'message': {'content': messages[-1]['content'][:3]}
+        }
+
+        parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+        # Distinct titles, so single-flight coalescing cannot merge concurrent calls
+        titles = [f"{city}第{i}号" for i, city in enumerate(["北京市报告", "上海市规划", "深圳市政策", "杭州市方案"] * 5)]
+        results = parser.parse_batch(titles, workers=4)
+
+        assert results == [title[:3] for title in titles]
+        assert mock_chat.call_count == len(titles)
+
+
+def test_run_batch_processes_preserve_order():
+    """Test process execution loads the engine once per worker and pins threads"""
+    texts = [f"标题{i}" for i in range(40)]
+    results = run_batch(EchoEngine(), "parse", texts, workers=2, executor="process", threads_per_worker=1)
+
+    assert [result.split("|")[0] for result in results] == texts
+    assert {result.split("|")[2] for result in results} == {"1"}
+    assert {result.split("|")[3] for result in results} == {"1"}
+    assert len({result.split("|")[1] for result in results} - {str(os.getpid())}) >= 1
+
+
+def test_run_batch_unknown_executor():
+    """Test invalid executor names are rejected"""
+    with pytest.raises(ValueError, match="Unknown executor"):
+        run_batch(EchoEngine(), "parse", ["a", "b"], workers=2, executor="gpu")
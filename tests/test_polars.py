@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_polars.py
+
+"""Pytest tests for the Polars streaming integration"""
+
+import pytest
+from city_parse.core import ModelSource, Parse, StreamingExtractor, parse_expr
+
+pl = pytest.importorskip("polars")
+
+
+def test_parse_expr_in_lazy_query(fake_chat):
+    """Test extraction fused into a lazy scan -> filter -> extract query"""
+    parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+    lf = pl.LazyFrame({
+        "id": [1, 2, 3, 4, 5],
+        "title": ["北京市报告", "上海市报告", "北京市报告", None, "天津市报告"],
+    })
+
+    df = (lf.filter(pl.col("id") < 5)
+            .with_columns(parse_expr("title", parser).alias("city"))
+            .collect(engine="streaming"))
+
+    assert df["city"].to_list() == ["北京市", "上海市", "北京市", None]
+    assert fake_chat.call_count == 2
+
+
+def test_cache_is_shared_across_batches(fake_chat):
+    """Test that later batches reuse results of earlier ones"""
+    parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+    extractor = StreamingExtractor(parser, cache_size=1)
+
+    assert extractor(pl.Series("t", ["北京市a", "北京市a"])).to_list() == ["北京市", "北京市"]
+    assert extractor(pl.Series("t", ["北京市a", "上海市b"])).to_list() == ["北京市", "上海市"]
+
+    assert fake_chat.call_count == 2
+    assert extractor.hits == 1
+    # Only the most recent result is kept
+    assert extractor(pl.Series("t", ["北京市a"])).to_list() == ["北京市"]
+    assert fake_chat.call_count == 3
@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_prompt.py
+
+"""Pytest tests for compiled system prompts"""
+
+from unittest.mock import patch
+from city_parse.core import Classify, CompiledPrompt, ModelSource, Parse, compile_prompt
+
+
+def test_compile_prompt_is_cached():
+    """Test that identical prompt texts share one compiled object"""
+    first = compile_prompt("提取城市名称")
+    second = compile_prompt("提取" + "城市名称")
+
+    assert first is second
+    assert first.token_count == 6
+    assert len(first.cache_key) == 16
+    assert compile_prompt(first) is first
+    assert compile_prompt("提取城市名称", tokenizer=len).token_count == 6
+    assert compile_prompt("其他提示词").cache_key != first.cache_key
+
+
+def test_compiled_prompt_is_immutable():
+    """Test that compiled prompts cannot be modified"""
+    prompt = compile_prompt("提取城市名称")
+    try:
+        prompt.text = "其他"
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("CompiledPrompt should be frozen")
+
+
+def test_parse_accepts_compiled_prompt():
+    """Test Parse with a pre-compiled prompt sends the identical text"""
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat') as mock_chat:
+        mock_chat.return_value = {'message': {'content': '北京市'}}
+
+        prompt = compile_prompt("自定义提示词")
+        parser = Parse(model_id="test-model", source=ModelSource.OLLAMA, system_prompt=prompt)
+        parser.parse("北京市人民政府工作报告")
+
+        assert parser.prompt is prompt
+        assert parser.create_model().prompt is prompt
+        messages = mock_chat.call_args[1]['messages']
+        assert messages[0]['content'] == "自定义提示词"
+
+
+def test_classify_prompt_stable_across_instances():
+    """Test that Classify builds byte-identical prompts for the same configuration"""
+    kwargs = dict(model_id="test-model", categories=["正面", "负面"],
+                  examples={"正面": ["很好"]}, source=ModelSource.OLLAMA)
+    first = Classify(**kwargs)
+    second = Classify(**kwargs)
+
+    assert isinstance(first.prompt, CompiledPrompt)
+    assert first.prompt is second.prompt
+    assert first.system_prompt == first.prompt.text
+
+
+def test_classify_add_category_keeps_model_and_custom_prompt():
+    """Test add_category recompiles the prompt without recreating the model"""
+    classifier = Classify(model_id="test-model", categories=["技术", "市场"],
+                          source=ModelSource.OLLAMA, system_prompt="自定义分类提示词")
+    model = classifier.model
+    old_key = classifier.prompt.cache_key
+
+    classifier.add_category("政策")
+
+    assert classifier.model is model
+    assert classifier.prompt.cache_key != old_key
+    assert "自定义分类提示词" in classifier.system_prompt
+    assert classifier.create_model().system_prompt == classifier.system_prompt
@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_ratelimit.py
+
+"""Pytest tests for the shared rate limiter and cost budget"""
+
+import pytest
+from unittest.mock import Mock, patch
+from city_parse import BudgetExceeded, Parse, RateLimiter
+from city_parse.core import ModelSource
+
+
+class FakeClock:
+    """Clock advanced by the limiter's waits instead of sleeping"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.waits = []
+
+    def __call__(self):
+        return self.now
+
+    def wait(self, seconds):
+        self.waits.append(seconds)
+        self.now += seconds
+
+
+def _limiter(**kwargs):
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock, **kwargs)
+    limiter._cond.wait = clock.wait
+    return limiter, clock
+
+
+def test_requests_per_minute():
+    """Test that requests beyond the bucket wait for the refill"""
+    limiter, clock = _limiter(requests_per_minute=2)
+    limiter.acquire(0)
+    limiter.acquire(0)
+    assert clock.waits == []
+    limiter.acquire(0)
+    assert clock.waits == [pytest.approx(30.0)]
+
+
+def test_tokens_per_minute_settled_from_usage():
+    """Test that reservations use the estimate and are corrected by the actual usage"""
+    limiter, clock = _limiter(tokens_per_minute=100, completion_allowance=10)
+    reserved = limiter.acquire(50)
+    assert reserved == 60
+    # The prompt was shorter than estimated: 40 of the reserved tokens come back
+    limiter.record(reserved, 18, 2)
+    limiter.acquire(70)
+    assert clock.waits == []
+    assert (limiter.prompt_tokens, limiter.completion_tokens, limiter.requests) == (18, 2, 2)
+
+
+def test_budget_stops_before_overspending():
+    """Test that the budget counts in-flight requests and refuses the one that could exceed it"""
+    limiter, _ = _limiter(budget=1.0, prompt_price=10_000, completion_price=10_000, completion_allowance=10)
+    # Each reservation may cost up to (45 + 10) * 0.01
+    first = limiter.acquire(45)
+    with pytest.raises(BudgetExceeded):
+        limiter.acquire(45)
+    limiter.record(first, 30, 5)
+    assert limiter.spent == pytest.approx(0.35)
+    assert limiter.remaining_budget == pytest.approx(0.65)
+    limiter.acquire(45)
+
+
+def _openai_client(prompt_tokens=120, completion_tokens=3):
+    client = Mock()
+    response = Mock()
+    response.choices = [Mock()]
+    response.choices[0].message.content = "商丘市"
+    response.usage.prompt_tokens = prompt_tokens
+    response.usage.completion_tokens = completion_tokens
+    client.chat.completions.create.return_value = response
+    return client
+
+
+def test_openai_records_usage_across_instances():
+    """Test that instances created from one config share the limiter and report exact usage"""
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=100_000,
+                          prompt_price=2.0, completion_price=8.0)
+    with patch('city_parse.core.model_func.openai_func.OpenAI', return_value=_openai_client()):
+        parser = Parse(model_id="gpt-4o-mini", source=ModelSource.OPENAI, api_key="sk-test", rate_limiter=limiter)
+        assert parser.parse_batch(["商丘市人民政府通知", "商丘市人民政府办公室通知"]) == ["商丘市", "商丘市"]
+
+    assert limiter.requests == 2
+    assert (limiter.prompt_tokens, limiter.completion_tokens) == (240, 6)
+    assert limiter.spent == pytest.approx((240 * 2.0 + 6 * 8.0) / 1_000_000)
+
+
+def test_budget_stops_batch():
+    """Test that an exhausted budget stops a batch with BudgetExceeded instead of sending more"""
+    limiter = RateLimiter(budget=0.01, prompt_price=2.0, completion_price=8.0)
+    client = _openai_client(prompt_tokens=400, completion_tokens=10)
+    with patch('city_parse.core.model_func.openai_func.OpenAI', return_value=client):
+        parser = Parse(model_id="gpt-4o-mini", source=ModelSource.OPENAI, api_key="sk-test", rate_limiter=limiter)
+        with pytest.raises(BudgetExceeded):
+            parser.parse_batch([f"第{i}号通知" for i in range(10)])
+
+    assert 0 < client.chat.completions.create.call_count < 10
+    assert limiter.spent <= limiter.budget
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_rules.py
+
+"""Pytest tests for the title template rule pre-pass"""
+
+import pytest
+from unittest.mock import patch
+from city_parse.core import DivisionTable, ModelSource, Parse, Rule, RuleEngine
+
+
+@pytest.mark.parametrize("text, place, rule_id", [
+    ("商丘市人民政府办公室关于印发商丘市科技创新跨越发展行动计划的通知", "商丘市", "government"),
+    ("中共龙州县委员会办公室、龙州县人民政府办公室关于印发工作方案的通知", "龙州县", "party_committee"),
+    ("山西省临沂市人民政府办公厅关于印发临沂市金融业发展规划的通知", "临沂市", "government"),
+    ("上海市徐汇区人民政府关于印发实施方案的通知", "上海市", "government"),
+    ("内蒙古自治区人力资源和社会保障厅对建议的答复", "内蒙古自治区", "department"),
+    ("龙州县财政局关于预算的报告", "龙州县", "department"),
+    ("延边朝鲜族自治州人民政府通知", "延边朝鲜族自治州", "government"),
+    ("湘西州人民政府关于印发方案的通知", "湘西州", "government"),
+    ("北京市西城区人民政府通知", "北京市", "government"),
+    ("梁园区人民政府关于印发方案的通知", "梁园区", "government"),
+    ("深圳市市场监督管理局关于开展专项检查的通知", "深圳市", "department"),
+    ("北京市市场监督管理局关于印发工作要点的通知", "北京市", "department"),
+    ("龙州县县委办公室关于印发工作方案的通知", "龙州县", "department"),
+    ("中共杭州市委办公厅关于印发实施意见的通知", "杭州市", "party_committee"),
+    ("广东省深圳市市场监督管理局关于公开征求意见的通知", "深圳市", "department"),
+])
+def test_default_rules(text, place, rule_id):
+    """Test the issuing-authority templates"""
+    match = RuleEngine().match(text)
+    assert (match.place, match.rule_id) == (place, rule_id)
+    assert text[match.span[0]:match.span[1]] == place
+
+
+@pytest.mark.parametrize("text", [
+    "武汉市长江大桥正式通车",
+    "关于六盘水人民政府的众多问题多方协商会议",
+    "关于加快推进市场监督管理局改革的通知",
+    "全市人民政府工作会议",
+    "城市管理委员会关于开展市容整治的通知",
+    "社区居委会办公室关于疫苗接种的通知",
+    "开发区人民政府关于招商引资的报告",
+    "高新区管委会办公室关于印发实施细则的通知",
+    "示范区建设领导小组办公室关于工作安排的通知",
+    "苏州工业园区管理委员会关于印发规划的通知",
+    "中共中央办公厅关于印发意见的通知",
+])
+def test_unmatched_titles(text):
+    """Test that free-form titles are left to the model"""
+    assert RuleEngine().match(text) is None
+
+
+def test_division_table_rejects_unknown_stems():
+    """Test that a unit with a suffix inside its stem is checked against the division table"""
+    title = "市场区人民政府关于印发方案的通知"
+    assert RuleEngine().match(title).place == "市场区"
+    assert RuleEngine(division_table=DivisionTable.default()).match(title) is None
+
+
+def test_custom_rules_and_validation():
+    """Test rule priority and the required place group"""
+    engine = RuleEngine([Rule("a", r"(?P<place>北京市)"), Rule("b", r"(?P<place>北京)")])
+    assert engine.match("北京市通知").rule_id == "a"
+    with pytest.raises(ValueError):
+        RuleEngine([Rule("broken", r"北京市")])
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.chat')
+def test_parse_only_sends_unmatched_rows(mock_chat):
+    """Test that rule matches skip the model"""
+    mock_chat.return_value = {'message': {'content': '武汉市'}}
+    parser = Parse(model_id="test-model", source=ModelSource.OLLAMA, rules=True)
+
+    assert parser.parse_with_rule("商丘市人民政府通知") == ("商丘市", "government")
+    assert parser.parse_with_rule("武汉市长江大桥正式通车") == ("武汉市", None)
+    assert parser.parse_batch(["九江市人民政府通知", "武汉市长江大桥正式通车"], workers=2) == ["九江市", "武汉市"]
+    assert mock_chat.call_count == 2
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.chat')
+def test_rules_are_opt_in(mock_chat):
+    """Test that Parse sends everything to the model by default"""
+    mock_chat.return_value = {'message': {'content': '商丘市'}}
+    parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+    assert parser.parse_with_rule("商丘市人民政府通知") == ("商丘市", None)
+    assert mock_chat.call_count == 1
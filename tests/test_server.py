@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_server.py
+
+"""Pytest tests for the HTTP serving mode"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+from unittest.mock import patch
+from city_parse import main
+from city_parse.core import Classify, InferenceServer, ModelSource, Parse
+
+
+async def _request(port, method, path, payload=None, content_length=None):
+    """Send one HTTP request and return status and body"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else b""
+    content_length = len(body) if content_length is None else content_length
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {content_length}\r\n"
+        f"Connection: close\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, data = response.partition(b"\r\n\r\n")
+    status = int(head.split()[1])
+    return status, data.decode("utf-8")
+
+
+def _serve(server, requests):
+    """Start the server, run request coroutines against it and shut down"""
+    async def run():
+        listener = await server.start("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            return [await request(port) for request in requests]
+        finally:
+            server.close()
+    return asyncio.run(run())
+
+
+def test_parse_endpoints_and_cache(fake_chat):
+    """Test single and batch parse endpoints and result caching"""
+    server = InferenceServer(parser=Parse(model_id="test-model", source=ModelSource.OLLAMA))
+    single, batch, metrics = _serve(server, [
+        lambda port: _request(port, "POST", "/parse", {"text": "北京市人民政府"}),
+        lambda port: _request(port, "POST", "/parse", {"texts": ["北京市人民政府", "上海市报告", "上海市报告"]}),
+        lambda port: _request(port, "GET", "/metrics"),
+    ])
+
+    assert single == (200, json.dumps({"result": "北京市"}, ensure_ascii=False))
+    assert batch[0] == 200
+    assert json.loads(batch[1]) == {"results": ["北京市", "上海市", "上海市"]}
+    assert fake_chat.call_count == 2
+    assert "city_parse_cache_hits_total 1" in metrics[1]
+    assert 'city_parse_requests_total{path="/parse",status="200"} 2' in metrics[1]
+
+
+def test_full_queue_answers_429():
+    """Test backpressure when a request exceeds the queue bound"""
+    release = threading.Event()
+
+    def slow_chat(model, messages, options, **kwargs):
+        release.wait(5)
+        return {'message': {'content': messages[-1]['content'][:3]}}
+
+    server = InferenceServer(parser=Parse(model_id="test-model", source=ModelSource.OLLAMA), max_queue=2)
+
+    async def both(port):
+        first = asyncio.ensure_future(_request(port, "POST", "/parse", {"texts": ["北京市a", "上海市b"]}))
+        while server.pending == 0:
+            await asyncio.sleep(0.01)
+        second = await _request(port, "POST", "/parse", {"text": "天津市c"})
+        release.set()
+        return await first, second
+
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat', side_effect=slow_chat):
+        (first, (status, body)), = _serve(server, [both])
+
+    assert first[0] == 200
+    assert status == 429
+    assert "error" in json.loads(body)
+    assert server.rejected == 1
+
+
+def test_batch_larger_than_queue_answers_413(fake_chat):
+    """Test that a batch no idle server could admit is not answered with a retryable 429"""
+    server = InferenceServer(parser=Parse(model_id="test-model", source=ModelSource.OLLAMA), max_queue=2)
+    (status, body), = _serve(server, [
+        lambda port: _request(port, "POST", "/parse", {"texts": ["北京市a", "上海市b", "天津市c"]}),
+    ])
+
+    assert status == 413
+    assert "split" in json.loads(body)["error"]
+    assert fake_chat.call_count == 0
+    assert server.rejected == 0
+
+
+def test_bad_requests(fake_chat):
+    """Test error statuses for invalid requests"""
+    server = InferenceServer(parser=Parse(model_id="test-model", source=ModelSource.OLLAMA))
+    results = _serve(server, [
+        lambda port: _request(port, "POST", "/parse", {"text": ""}),
+        lambda port: _request(port, "POST", "/classify", {"text": "北京市"}),
+        lambda port: _request(port, "GET", "/parse"),
+        lambda port: _request(port, "GET", "/unknown"),
+        lambda port: _request(port, "POST", "/parse", {"text": "北京市"}, content_length="abc"),
+    ])
+
+    assert [status for status, _ in results] == [400, 404, 405, 404, 400]
+
+
+def test_backend_failures_are_not_cached():
+    """Test that error outputs are answered but not served from the cache afterwards"""
+    server = InferenceServer(parser=Parse(model_id="test-model", source=ModelSource.OLLAMA))
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat',
+               side_effect=[ConnectionError("down"), {'message': {'content': '北京市'}}]) as mock_chat:
+        failed, retried = _serve(server, [
+            lambda port: _request(port, "POST", "/parse", {"text": "北京市人民政府"}),
+            lambda port: _request(port, "POST", "/parse", {"text": "北京市人民政府"}),
+        ])
+
+    assert json.loads(failed[1]) == {"result": "API调用失败"}
+    assert json.loads(retried[1]) == {"result": "北京市"}
+    assert mock_chat.call_count == 2
+    assert len(server.cache) == 1
+
+
+def test_classify_error_fails_only_its_caller():
+    """Test that an unmatched classification does not fail the other texts of its batch"""
+    def partial_chat(model, messages, options, **kwargs):
+        return {'message': {'content': '经济' if '经济' in messages[-1]['content'] else '天气'}}
+
+    classifier = Classify(model_id="test-model", categories=["经济", "交通"], source=ModelSource.OLLAMA)
+    server = InferenceServer(classifier=classifier, max_wait_ms=50)
+
+    async def both(port):
+        return await asyncio.gather(
+            _request(port, "POST", "/classify", {"text": "经济发展报告"}),
+            _request(port, "POST", "/classify", {"text": "明日多云"}),
+        )
+
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat', side_effect=partial_chat):
+        (ok, failed), = _serve(server, [both])
+
+    assert ok == (200, json.dumps({"result": "经济"}, ensure_ascii=False))
+    assert failed[0] == 500
+    assert server._batchers["classify"].batches == 1
+
+
+def test_classify_batch_reports_errors_per_text():
+    """Test that a failed text of a batch is reported without losing the other results"""
+    def partial_chat(model, messages, options, **kwargs):
+        return {'message': {'content': '经济' if '经济' in messages[-1]['content'] else '天气'}}
+
+    classifier = Classify(model_id="test-model", categories=["经济", "交通"], source=ModelSource.OLLAMA)
+    server = InferenceServer(classifier=classifier)
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat', side_effect=partial_chat):
+        (status, body), = _serve(server, [
+            lambda port: _request(port, "POST", "/classify", {"texts": ["经济报告", "xyz"]}),
+        ])
+
+    assert status == 200
+    response = json.loads(body)
+    assert response["results"] == ["经济", None]
+    assert [error["index"] for error in response["errors"]] == [1]
+
+
+def test_server_requires_an_engine():
+    """Test that a server without engines is rejected"""
+    with pytest.raises(ValueError):
+        InferenceServer()
+
+
+def test_cli_without_command_prints_help(capsys):
+    """Test that the CLI prints usage when no command is given"""
+    main([])
+    assert "serve" in capsys.readouterr().out
@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_singleflight.py
+
+"""Pytest tests for single-flight request coalescing"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from unittest.mock import patch
+from city_parse.core import ModelSource, Parse
+from city_parse.core.model_func import SingleFlight, default_flight
+
+
+def _blocking_chat(release, started):
+    """Build a fake ollama.chat that blocks until released"""
+    def chat(model, messages, options):
+        started.set()
+        release.wait(timeout=5)
+        return {'message': {'content': messages[-1]['content'][:3]}}
+    return chat
+
+
+def test_identical_concurrent_parses_share_one_call():
+    """Test that concurrent identical titles trigger a single backend call"""
+    release, started = threading.Event(), threading.Event()
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat',
+               side_effect=_blocking_chat(release, started)) as mock_chat:
+        parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+        coalesced = default_flight.coalesced
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(parser.parse, "北京市人民政府工作报告") for _ in range(8)]
+            started.wait(timeout=5)
+            # Wait until the other callers joined the in-flight call
+            while default_flight.coalesced - coalesced < 7:
+                pass
+            release.set()
+            results = [f.result() for f in futures]
+
+        assert results == ["北京市"] * 8
+        assert mock_chat.call_count == 1
+
+
+def test_different_inputs_are_not_coalesced():
+    """Test that distinct requests each reach the backend"""
+    release, started = threading.Event(), threading.Event()
+    release.set()
+    with patch('city_parse.core.model_func.ollama_func.ollama.chat',
+               side_effect=_blocking_chat(release, started)) as mock_chat:
+        first = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+        second = Parse(model_id="test-model", source=ModelSource.OLLAMA, temperature=0.5)
+
+        first.parse("北京市报告")
+        first.parse("上海市报告")
+        second.parse("北京市报告")
+
+        assert mock_chat.call_count == 3
+
+
+def test_singleflight_shares_errors():
+    """Test that waiters receive the leader's exception"""
+    group = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        release.wait(timeout=5)
+        raise RuntimeError("backend down")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(group.do, "key", failing) for _ in range(4)]
+        while group.coalesced < 3:
+            pass
+        release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError, match="backend down"):
+                future.result()
+
+    assert len(calls) == 1
+    assert group.in_flight() == 0
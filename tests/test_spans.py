@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_spans.py
+
+"""Pytest tests for span candidates and span-extraction parsing"""
+
+from unittest.mock import patch
+
+import pytest
+
+from city_parse import Parse, find_spans
+from city_parse.core import ModelSource
+from city_parse.core.model_func import HuggingFaceFunc
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("商丘市人民政府办公室关于印发商丘市科技创新跨越发展行动计划的通知", ["商丘市"]),
+    ("上海市徐汇区人民政府关于印发徐汇区深化医药卫生体制改革近期重点实施方案的通知", ["上海市", "徐汇区"]),
+    ("关于六盘水人民政府的众多问题多方协商会议", ["六盘水"]),
+    ("内蒙古自治区人力资源和社会保障厅", ["内蒙古自治区", "资源"]),
+])
+def test_find_spans(text, expected):
+    """Test that spans are verbatim known names, longest first at each position"""
+    assert find_spans(text) == expected
+
+
+def test_find_spans_limits_candidates():
+    """Test that only the first distinct spans are kept"""
+    assert find_spans("北京市天津市上海市重庆市", max_candidates=2) == ["北京市", "天津市"]
+    assert find_spans("没有地名") == []
+
+
+@pytest.fixture
+def span_parser():
+    """Span-extraction parser over a local model that is never loaded"""
+    with patch('city_parse.core.model_func.huggingface_func._load_model', return_value=(None, None)):
+        yield Parse(model_id="qwen", source=ModelSource.HUGGINGFACE, span_extraction=True)
+
+
+def test_single_candidate_skips_model(span_parser):
+    """Test that a title with one place name needs no model call"""
+    with patch.object(HuggingFaceFunc, "score") as mock_score, \
+            patch('city_parse.core.model_func.huggingface_func._load_model', return_value=(None, None)):
+        assert span_parser.parse("商丘市人民政府办公室关于印发…的通知") == "商丘市"
+    mock_score.assert_not_called()
+
+
+def test_argmax_of_scores(span_parser):
+    """Test that the best scored candidate is returned, also through the batcher"""
+    with patch.object(HuggingFaceFunc, "score", return_value=[-3.0, -0.5]) as mock_score, \
+            patch('city_parse.core.model_func.huggingface_func._load_model', return_value=(None, None)):
+        assert span_parser.parse("绍兴市上虞区人民政府办公室通知") == "上虞区"
+        with span_parser.create_batcher(max_wait_ms=1) as batcher:
+            assert batcher("绍兴市上虞区人民政府办公室通知") == "上虞区"
+    assert mock_score.call_args.args[1] == ["绍兴市", "上虞区"]
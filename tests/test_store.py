@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_store.py
+
+"""Pytest tests for the columnar results store"""
+
+import pytest
+from city_parse.core import ModelSource, Parse, ResultWriter, read_results
+
+pa = pytest.importorskip("pyarrow")
+
+
+@pytest.mark.parametrize("name", ["cities.arrow", "cities.parquet"])
+def test_parse_to_store_round_trip(fake_chat, tmp_path, name):
+    """Test that results are written in chunks and read back dictionary-encoded"""
+    parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+    texts = ["北京市报告", "上海市报告", "北京市报告", "天津市报告", "上海市报告"]
+
+    rows = parser.parse_to_store(iter(texts), tmp_path / name, chunk_size=3, include_text=True)
+    table = read_results(tmp_path / name)
+
+    assert rows == 5
+    assert fake_chat.call_count == 4  # duplicates are only skipped within a chunk
+    assert table.column("row").to_pylist() == [0, 1, 2, 3, 4]
+    assert table.column("text").to_pylist() == texts
+    assert pa.types.is_dictionary(table.schema.field("result").type)
+    assert table.column("result").to_pylist() == ["北京市", "上海市", "北京市", "天津市", "上海市"]
+
+
+def test_writer_keeps_one_growing_dictionary(tmp_path):
+    """Test that repeated values share codes across batches and nulls survive"""
+    path = tmp_path / "results.arrow"
+    with ResultWriter(path) as writer:
+        writer.write_batch(["a", "b"], ["北京市", "北京市"])
+        writer.write_batch(["c", "d", "e"], ["上海市", None, "北京市"])
+
+    table = read_results(path)
+    last = table.column("result").chunks[-1]
+    assert last.dictionary.to_pylist() == ["北京市", "上海市"]
+    assert last.indices.to_pylist() == [1, None, 0]
+
+
+def test_writer_rejects_misaligned_batches(tmp_path):
+    """Test that texts and results must line up"""
+    with ResultWriter(tmp_path / "results.arrow") as writer:
+        with pytest.raises(ValueError):
+            writer.write_batch(["a"], [])
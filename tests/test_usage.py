@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_usage.py
+
+"""Pytest tests for response usage and latency metadata"""
+
+import pytest
+from unittest.mock import Mock, patch
+from city_parse import RunResult
+from city_parse.core.model_func import API_ERROR_OUTPUT, FuncBase, OllamaFunc
+from city_parse.core.model_func.openai_func import OpenAIFunc
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.chat', return_value={
+    'message': {'content': ' 商丘市 '},
+    'prompt_eval_count': 420,
+    'eval_count': 4,
+    'prompt_eval_duration': 120_000_000,
+    'eval_duration': 40_000_000,
+    'load_duration': 2_500_000_000,
+})
+def test_ollama_durations(mock_chat):
+    """Test that Ollama token counts and nanosecond durations are kept"""
+    func = OllamaFunc("qwen3:0.6b", system_prompt="提取城市")
+    result = func.run_detailed("商丘市人民政府通知", save_to_history=True)
+
+    assert isinstance(result, RunResult)
+    assert str(result) == result.text == "商丘市"
+    assert (result.prompt_tokens, result.completion_tokens, result.total_tokens) == (420, 4, 424)
+    assert (result.prompt_eval_ms, result.eval_ms, result.load_ms) == (120.0, 40.0, 2500.0)
+    assert result.tokens_per_sec == pytest.approx(100.0)
+    assert result.latency_ms >= 0
+    assert func.get_history()[-1] == {"role": "assistant", "content": "商丘市"}
+    # The plain string API is unchanged
+    assert func.run("商丘市人民政府通知") == "商丘市"
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.chat', side_effect=ConnectionError("down"))
+def test_ollama_error_has_no_usage(mock_chat):
+    """Test that failed calls still return a result with the error sentinel"""
+    result = OllamaFunc("qwen3:0.6b").run_detailed("商丘市人民政府通知")
+    assert result.text == API_ERROR_OUTPUT
+    assert result.prompt_tokens is None and result.tokens_per_sec is None
+
+
+def test_openai_usage():
+    """Test that OpenAI usage is reported"""
+    with patch('city_parse.core.model_func.openai_func.OpenAI') as mock_openai:
+        response = Mock()
+        response.choices = [Mock()]
+        response.choices[0].message.content = "上海市"
+        response.usage.prompt_tokens = 300
+        response.usage.completion_tokens = 2
+        mock_openai.return_value.chat.completions.create.return_value = response
+        result = OpenAIFunc("gpt-4o-mini", api_key="sk-test").run_detailed("上海市经济报告")
+
+    assert result.text == "上海市"
+    assert (result.prompt_tokens, result.completion_tokens) == (300, 2)
+    assert result.eval_ms is None
+
+
+def test_default_backend_measures_latency():
+    """Test that backends without usage still report the latency"""
+    class EchoFunc(FuncBase):
+        def _chat_completion(self, messages):
+            return messages[-1]["content"]
+
+    result = EchoFunc("echo").run_detailed("北京市")
+    assert result.text == "北京市"
+    assert result.latency_ms >= 0
+    assert result.prompt_tokens is None and result.total_tokens is None
@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_vectorized.py
+
+"""Pytest tests for the pandas accessor and pyarrow function"""
+
+import pandas as pd
+import pytest
+from city_parse.core import ModelSource, Parse, parse_arrow
+
+
+def test_accessor_parses_each_distinct_value_once(fake_chat):
+    """Test that duplicates reach the model once and results follow the index"""
+    parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+    series = pd.Series(["北京市报告", "上海市报告", "北京市报告", None, "北京市报告"],
+                       index=[10, 11, 12, 13, 14], name="id")
+
+    result = series.city_parse.parse(parser)
+
+    assert fake_chat.call_count == 2
+    assert result.isna().tolist() == [False, False, False, True, False]
+    assert result.dropna().tolist() == ["北京市", "上海市", "北京市", "北京市"]
+    assert result.index.tolist() == [10, 11, 12, 13, 14]
+    assert result.name == "id"
+
+
+def test_accessor_apply_with_batch_function():
+    """Test apply with a custom batch function and an empty column"""
+    calls = []
+
+    def batch_func(texts):
+        calls.append(texts)
+        return [len(text) for text in texts]
+
+    assert pd.Series(["a", "bb", "a"]).city_parse.apply(batch_func).tolist() == [1, 2, 1]
+    assert calls == [["a", "bb"]]
+    assert pd.Series([], dtype=object).city_parse.apply(batch_func).tolist() == []
+
+
+def test_parse_arrow(fake_chat):
+    """Test the pyarrow function with nulls and chunked input"""
+    pa = pytest.importorskip("pyarrow")
+    parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+    array = pa.chunked_array([["北京市报告", None], ["北京市报告", "上海市报告"]])
+
+    result = parse_arrow(array, parser)
+
+    assert result.to_pylist() == ["北京市", None, "北京市", "上海市"]
+    assert fake_chat.call_count == 2
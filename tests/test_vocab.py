@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_vocab.py
+
+"""Pytest tests for the interned result vocabulary"""
+
+import pytest
+from city_parse.core import CodedResults, ModelSource, Parse, StreamingExtractor, Vocabulary
+from city_parse.core._server import ResultCache
+
+
+def test_vocabulary_interns_values():
+    """Test that equal values share one code and None is missing"""
+    vocab = Vocabulary(["北京市"])
+    assert vocab.code("北京市") == 0
+    assert vocab.code("上海市") == 1
+    assert vocab.code(None) == -1
+    assert vocab.encode(["上海市", None, "天津市", "上海市"]).tolist() == [1, -1, 2, 1]
+    assert vocab.decode([2, -1, 0]) == ["天津市", None, "北京市"]
+    assert len(vocab) == 3
+
+
+def test_coded_results_behave_like_a_list():
+    """Test sequence access, slicing and conversions"""
+    vocab = Vocabulary()
+    results = CodedResults.from_values(vocab, ["北京市", "上海市", "北京市"])
+    results.append(None)
+
+    assert len(results) == 4
+    assert results[0] == "北京市"
+    assert results[1:3] == ["上海市", "北京市"]
+    assert list(results) == ["北京市", "上海市", "北京市", None]
+    assert results.nbytes == 16
+    assert results.to_numpy().tolist() == [0, 1, 0, -1]
+
+    series = results.to_pandas(name="city")
+    assert series.dtype == "category"
+    assert series.isna().tolist() == [False, False, False, True]
+    assert list(series.cat.categories) == ["北京市", "上海市"]
+
+
+def test_parse_coded(fake_chat):
+    """Test that parse_coded parses distinct texts once and returns codes"""
+    parser = Parse(model_id="test-model", source=ModelSource.OLLAMA)
+    vocab = Vocabulary()
+
+    results = parser.parse_coded(["北京市报告", "上海市报告", "北京市报告"], vocab=vocab)
+
+    assert results == ["北京市", "上海市", "北京市"]
+    assert results.vocab is vocab
+    assert fake_chat.call_count == 2
+
+
+def test_to_arrow():
+    """Test conversion to a dictionary-encoded pyarrow array"""
+    pytest.importorskip("pyarrow")
+    results = CodedResults.from_values(Vocabulary(), ["北京市", None, "北京市"])
+    array = results.to_arrow()
+    assert array.to_pylist() == ["北京市", None, "北京市"]
+    assert array.dictionary.to_pylist() == ["北京市"]
+
+
+def test_result_cache_vocabulary_stays_bounded():
+    """Test that evicted results are released from the cache's own vocabulary"""
+    cache = ResultCache(max_size=2)
+    for i in range(100):
+        cache.put(("parse", str(i)), f"输出{i}")
+
+    assert len(cache) == 2
+    assert len(cache.vocab) <= 4
+    assert cache.get(("parse", "99")) == "输出99"
+    assert cache.get(("parse", "98")) == "输出98"
+
+
+def test_streaming_extractor_vocabulary_stays_bounded():
+    """Test that the extractor cache does not keep every distinct output"""
+    class Engine:
+        def parse_batch(self, texts, workers=1, executor="thread"):
+            return [text[:3] for text in texts]
+
+    extractor = StreamingExtractor(Engine(), cache_size=3)
+    for i in range(50):
+        extractor._lookup([f"{i:03d}号文件"])
+
+    assert len(extractor.vocab) <= 6
+    assert extractor._lookup(["049号文件"]) == {"049号文件": "049"}
+    assert extractor.hits == 1
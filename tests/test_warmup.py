@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) 2025 - Present Sepine Tam, Inc. All Rights Reserved
+#
+# @Author : Sepine Tam (谭淞)
+# @Email  : sepinetam@gmail.com
+# @File   : test_warmup.py
+
+"""Pytest tests for model preloading and warm-up"""
+
+from unittest.mock import patch
+from city_parse import Parse, WarmupReport
+from city_parse.core import Benchmark, Model, ModelConfig, ModelSource
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.generate')
+def test_preload_pins_ollama_model(mock_generate):
+    """Test that preloading loads the model with the configured keep_alive"""
+    model = Model(ModelConfig(model_id="qwen3:0.6b", keep_alive=-1))
+    load_ms = model.preload()
+
+    assert load_ms >= 0
+    mock_generate.assert_called_once_with(model="qwen3:0.6b", keep_alive=-1)
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.generate')
+@patch('city_parse.core.model_func.ollama_func.ollama.chat', return_value={'message': {'content': '临沂市'}})
+def test_warmup_uses_real_system_prompt(mock_chat, mock_generate):
+    """Test that warm-up runs dummy generations with the parser's system prompt, bypassing rules"""
+    parser = Parse(model_id="qwen3:0.6b", rules=True, keep_alive="30m")
+    report = parser.warmup()
+
+    assert isinstance(report, WarmupReport)
+    assert report.output == "临沂市"
+    assert report.load_ms >= 0 and report.first_ms >= 0 and report.warm_ms >= 0
+    mock_generate.assert_called_once()
+    assert mock_chat.call_count == 2
+    kwargs = mock_chat.call_args.kwargs
+    assert kwargs['messages'][0] == {"role": "system", "content": parser.prompt.text}
+    assert kwargs['keep_alive'] == "30m"
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.generate')
+@patch('city_parse.core.model_func.ollama_func.ollama.chat', return_value={'message': {'content': '商丘市'}})
+def test_warmup_pins_model_by_default(mock_chat, mock_generate):
+    """Test that warm-up pins the model and later requests keep it pinned"""
+    parser = Parse(model_id="qwen3:0.6b")
+    parser.warmup()
+    mock_generate.assert_called_once_with(model="qwen3:0.6b", keep_alive=-1)
+    assert mock_chat.call_args.kwargs['keep_alive'] == -1
+
+    parser.parse("商丘市人民政府通知")
+    assert mock_chat.call_args.kwargs['keep_alive'] == -1
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.generate')
+@patch('city_parse.core.model_func.ollama_func.ollama.chat', return_value={'message': {'content': '商丘市'}})
+def test_warmup_can_keep_server_default(mock_chat, mock_generate):
+    """Test that keep_alive=None leaves the server's unload timer alone"""
+    Parse(model_id="qwen3:0.6b").warmup(keep_alive=None)
+    mock_generate.assert_called_once_with(model="qwen3:0.6b")
+    assert 'keep_alive' not in mock_chat.call_args.kwargs
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.chat', return_value={'message': {'content': '商丘市'}})
+def test_keep_alive_omitted_by_default(mock_chat):
+    """Test that the server default applies unless keep_alive is configured"""
+    Parse(model_id="qwen3:0.6b").parse("商丘市人民政府通知")
+    assert 'keep_alive' not in mock_chat.call_args.kwargs
+
+
+def test_remote_preload_is_noop():
+    """Test that remote APIs have nothing to load"""
+    model = Model(ModelConfig(model_id="gpt-4o-mini", source=ModelSource.OPENAI, api_key="sk-test"))
+    assert model.preload() >= 0
+
+
+@patch('city_parse.core.model_func.ollama_func.ollama.generate')
+@patch('city_parse.core.model_func.ollama_func.ollama.chat', return_value={'message': {'content': '商丘市'}})
+def test_benchmark_warmup_is_not_measured(mock_chat, mock_generate):
+    """Test that benchmark warm-up runs before, and outside, the measured rows"""
+    benchmark = Benchmark(["商丘市人民政府通知"], ["商丘市"])
+    result = benchmark.run_grid(["model-a"], {"default": None}, warmup=True)[0]
+
+    assert mock_generate.call_count == 1
+    assert mock_chat.call_count == 3
+    assert result.rows == 1 and result.accuracy == 1.0